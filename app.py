@@ -1,12 +1,13 @@
 # app.py
 import streamlit as st
-import asyncio
 import json
-import traceback
 import uuid
 import time
-from blog_writer_agent.crew import BlogWriterCrew, process_crew_output
-from blog_writer_agent.utils import sanitize_filename, extract_blog_content
+from blog_writer_agent.chat_history import CHAT_HISTORY_PAGE_SIZE, ChatHistory
+from blog_writer_agent.jobs import DONE, QUEUED, JobRunner
+from blog_writer_agent.pipeline import PipelineOptions
+from blog_writer_agent.telemetry import STAGE_LABELS
+from blog_writer_agent.utils import sanitize_filename
 
 
 # Streamlit Page Configuration 
@@ -19,13 +20,16 @@ if "chat_sessions" not in st.session_state:
     st.session_state.chat_sessions = {}
 if "current_session_id" not in st.session_state:
     st.session_state.current_session_id = None
-if "crew_instance" not in st.session_state:
-    # Initialize crew instance lazily if needed, or keep one instance
-    try:
-        st.session_state.crew_instance = BlogWriterCrew()
-    except Exception as e:
-        st.error(f"Failed to initialize BlogWriterCrew: {e}")
-        st.stop()
+# The one post whose download buttons are shown (their payloads are built only for it)
+if "download_message_id" not in st.session_state:
+    st.session_state.download_message_id = None
+
+@st.cache_resource
+def get_chat_history():
+    """Messages of every chat live on disk; sessions only keep names, page sizes and pending job IDs."""
+    return ChatHistory()
+
+chat_history = get_chat_history()
 
 #  Helper Functions 
 def create_new_session():
@@ -33,22 +37,101 @@ def create_new_session():
     session_id = str(uuid.uuid4())
     timestamp = time.strftime("%H:%M:%S")
     session_name = f"Chat - {timestamp}"
-    st.session_state.chat_sessions[session_id] = {"name": session_name, "messages": []}
+    st.session_state.chat_sessions[session_id] = {"name": session_name, "job_ids": [], "visible": CHAT_HISTORY_PAGE_SIZE}
     st.session_state.current_session_id = session_id
     return session_id
 
 def get_session_messages():
-    """Gets messages for the current session."""
-    if st.session_state.current_session_id and st.session_state.current_session_id in st.session_state.chat_sessions:
-        return st.session_state.chat_sessions[st.session_state.current_session_id]["messages"]
-    return []
-
-def add_message(role: str, content: any):
-    """Adds a message to the current session."""
-    if st.session_state.current_session_id:
-        st.session_state.chat_sessions[st.session_state.current_session_id]["messages"].append(
-            {"role": role, "content": content}
-        )
+    """Gets the latest page of messages for the current session (posts without their markdown)."""
+    session = st.session_state.chat_sessions.get(st.session_state.current_session_id)
+    if session is None:
+        return []
+    return chat_history.recent(st.session_state.current_session_id, session.setdefault("visible", CHAT_HISTORY_PAGE_SIZE))
+
+def add_message(role: str, content: any, session_id=None):
+    """Adds a message to a session (the current one by default)."""
+    session_id = session_id or st.session_state.current_session_id
+    if session_id:
+        chat_history.add(session_id, role, content)
+
+def show_earlier_messages():
+    st.session_state.chat_sessions[st.session_state.current_session_id]["visible"] += CHAT_HISTORY_PAGE_SIZE
+
+def prepare_downloads(message_id):
+    st.session_state.download_message_id = message_id
+
+# --- Background Generation Jobs ---
+@st.cache_resource
+def get_job_runner():
+    """One bounded worker pool shared by every session and user of this server."""
+    return JobRunner()
+
+job_runner = get_job_runner()
+
+def submit_generation(topic, tone, writer_mode="single", force_regenerate=False):
+    """Adds the user message and queues the crew run; the result is collected on a later rerun."""
+    current_sid = st.session_state.current_session_id
+
+    # Name the session after its first topic
+    if current_sid and chat_history.count(current_sid) == 0:
+        new_session_name = f"{topic[:40]}" # Truncate topic for name
+        if len(topic) > 40:
+            new_session_name += "..."
+        st.session_state.chat_sessions[current_sid]["name"] = new_session_name
+        print(f"Renamed session {current_sid} to '{new_session_name}'") # Optional debug log
+
+    add_message("user", f"**{topic}** (Tone: {tone})")
+    options = PipelineOptions(writer_mode=writer_mode, force_regenerate=force_regenerate)
+    job = job_runner.submit(topic, tone, options, session_id=current_sid)
+    st.session_state.chat_sessions[current_sid].setdefault("job_ids", []).append(job.id)
+
+def collect_finished_jobs():
+    """Moves the results of finished jobs into the chat sessions they belong to."""
+    for session_id, session in st.session_state.chat_sessions.items():
+        for job_id in list(session.get("job_ids", [])):
+            job = job_runner.get(job_id)
+            if job is None:
+                session["job_ids"].remove(job_id)
+                add_message("assistant", "Sorry, this generation was lost (the server may have restarted).", session_id)
+                continue
+            if not job.finished:
+                continue
+            if job.result is not None and job.result.error_traceback:
+                print(job.result.error_traceback)
+            if job.status == DONE:
+                add_message(
+                    "assistant",
+                    {"markdown": job.result.blog_content, "metadata": job.result.metadata, "reused_from": job.result.reused_from},
+                    session_id,
+                )
+            else:
+                error = job.error or "Processing function failed."
+                resume_hint = f" (run `{job.result.run_id}`; resume with `python main.py --resume {job.result.run_id}`)" if job.result is not None and job.result.run_id else ""
+                add_message("assistant", f"Sorry, I encountered an error: {str(error)[:500]}...{resume_hint}", session_id) # Truncate long errors
+            session["job_ids"].remove(job_id)
+            job_runner.forget(job_id)
+
+def pending_jobs(session_id):
+    session = st.session_state.chat_sessions.get(session_id, {})
+    return [job for job in (job_runner.get(job_id) for job_id in session.get("job_ids", [])) if job is not None]
+
+@st.fragment(run_every=1.0)
+def render_pending_jobs():
+    """Polls the current session's jobs every second; a full rerun shows finished results."""
+    jobs = pending_jobs(st.session_state.current_session_id)
+    if any(job.finished for job in jobs):
+        st.rerun()
+    for job in jobs:
+        with st.chat_message("assistant"):
+            if job.status == QUEUED:
+                st.info(f"🕒 Waiting for a free worker (position {job_runner.queue_position(job.id)} in queue)...")
+                continue
+            stage_label = " · ".join(STAGE_LABELS.get(stage, stage) for stage in list(job.telemetry.active_stages)) or "⏳ Working..."
+            st.info(f"{stage_label} ({job.elapsed_seconds:.0f}s, {len(job.telemetry.completed_stages)} stages done)")
+            # Live view of the writer's output while it is generated
+            if job.stream.text:
+                st.markdown(job.stream.text + " ▌")
+
 
 # Sidebar for Session Management and Inputs
 with st.sidebar:
@@ -58,7 +141,10 @@ with st.sidebar:
     if not st.session_state.chat_sessions:
         create_new_session()
 
-    session_options = {sid: data["name"] for sid, data in st.session_state.chat_sessions.items()}
+    session_options = {
+        sid: ("⏳ " if data.get("job_ids") else "") + data["name"] # Mark sessions with generations in flight
+        for sid, data in st.session_state.chat_sessions.items()
+    }
     current_session_id = st.selectbox(
         "Select Chat",
         options=list(session_options.keys()),
@@ -81,6 +167,7 @@ with st.sidebar:
         if st.button("🗑️ Delete Chat", disabled=(len(st.session_state.chat_sessions) <= 1)):
             if st.session_state.current_session_id in st.session_state.chat_sessions:
                 del st.session_state.chat_sessions[st.session_state.current_session_id]
+                chat_history.delete_session(st.session_state.current_session_id)
                 # Select the first remaining session or create a new one
                 if st.session_state.chat_sessions:
                     st.session_state.current_session_id = list(st.session_state.chat_sessions.keys())[0]
@@ -99,21 +186,49 @@ with st.sidebar:
             key="tone_input",
             index=1 # Default to 'Professional'
         )
+        writer_mode_input = st.radio(
+            "Writer Mode:",
+            ["single", "sections"],
+            format_func=lambda mode: "Single-shot" if mode == "single" else "Parallel sections (faster)",
+            key="writer_mode_input",
+            horizontal=True,
+        )
+        force_regenerate_input = st.checkbox(
+            "Force regenerate",
+            key="force_regenerate_input",
+            help="Recent posts for the same topic and tone are reused; tick to run the crew again.",
+        )
         # Form submit button
         generate_button_form = st.form_submit_button("✨ Generate Blog Post", type="primary")
 
 
 # Main Chat Area
+collect_finished_jobs()
 st.header(f"Chat: {st.session_state.chat_sessions.get(st.session_state.current_session_id, {}).get('name', 'N/A')}")
 
-# Display existing messages for the currently selected session
+# Display the latest page of messages for the currently selected session. Only the
+# newest post is rendered in full; older ones load their markdown when expanded.
 messages = get_session_messages()
-for idx, message in enumerate(messages):
+hidden = chat_history.count(st.session_state.current_session_id) - len(messages) if st.session_state.current_session_id else 0
+if hidden > 0:
+    st.button(f"⬆️ Show earlier messages ({hidden} hidden)", on_click=show_earlier_messages)
+latest_post_id = max((message["id"] for message in messages if message["is_post"]), default=None)
+for message in messages:
     with st.chat_message(message["role"]):
-        if isinstance(message["content"], dict) and "markdown" in message["content"]:
+        if message["is_post"]:
             # Display Assistant response (Blog + Metadata + Buttons)
-            st.markdown(message["content"]["markdown"], unsafe_allow_html=True) # Allow basic HTML if needed in markdown
-            metadata = message["content"]["metadata"]
+            metadata = message["metadata"]
+            title = metadata.get("title", "Untitled Blog")
+            if message["id"] == latest_post_id:
+                st.markdown(chat_history.markdown(message["id"]), unsafe_allow_html=True) # Allow basic HTML if needed in markdown
+            else:
+                st.markdown(f"**{title}**")
+                st.caption(f"{message['word_count']} words · {metadata.get('meta_description', '')}")
+                if st.toggle("Show post", key=f"show_post_{message['id']}"):
+                    st.markdown(chat_history.markdown(message["id"]), unsafe_allow_html=True)
+            if message["reused_from"]:
+                generated = time.strftime("%Y-%m-%d %H:%M", time.localtime(message["reused_from"]))
+                st.caption(f"♻️ Reused the post generated on {generated}. Tick 'Force regenerate' for a new one.")
             # Use columns for better layout of JSON and buttons
             col_meta, col_buttons = st.columns([3, 1]) # Adjust ratio as needed
             with col_meta:
@@ -121,140 +236,45 @@ for idx, message in enumerate(messages):
 
             with col_buttons:
                 slug = metadata.get("slug", "blog_post")
-                title = metadata.get("title", "Untitled Blog")
                 # Use slug primarily, fallback to title for filename
                 safe_filename = sanitize_filename(slug if slug != "default-slug" and slug else title)
 
-                st.download_button(
-                    label="⬇️ Blog (.md)",
-                    data=message["content"]["markdown"],
-                    file_name=f"{safe_filename}.md",
-                    mime="text/markdown",
-                    key=f"md_dl_{st.session_state.current_session_id}_{idx}", # Unique key per message
-                    use_container_width=True
-                )
-                st.download_button(
-                    label="⬇️ Metadata (.json)",
-                    data=json.dumps(metadata, indent=2, ensure_ascii=False),
-                    file_name=f"{safe_filename}_metadata.json",
-                    mime="application/json",
-                    key=f"json_dl_{st.session_state.current_session_id}_{idx}", # Unique key per message
-                    use_container_width=True
-                )
-        elif isinstance(message["content"], str):
-            st.markdown(message["content"], unsafe_allow_html=True) # Allow bolding etc.
-
-# --- Handle New Input Submission ---
-async def handle_generation(topic, tone):
-    """Handles the asynchronous crew execution and updates the chat session."""
-
-    # <<< --- ADD RENAMING LOGIC HERE --- >>>
-    current_messages = get_session_messages()
-    is_first_user_message = len(current_messages) == 0 # Check if message list is empty *before* adding user msg
-    current_sid = st.session_state.current_session_id
-
-    if is_first_user_message and current_sid:
-        # Create a concise name from the topic
-        new_session_name = f"{topic[:40]}" # Truncate topic for name
-        if len(topic) > 40:
-            new_session_name += "..."
-        # Update the name in session state
-        st.session_state.chat_sessions[current_sid]["name"] = new_session_name
-        print(f"Renamed session {current_sid} to '{new_session_name}'") # Optional debug log
-    # <<< --- END RENAMING LOGIC --- >>>
-
-    # Add user message to state *after* checking if it was the first
-    add_message("user", f"**{topic}** (Tone: {tone})")
-
-    with st.chat_message("user"):
-       st.markdown(f"**{topic}** (Tone: {tone})")
-
-    # Prepare for assistant response and progress updates
-    with st.chat_message("assistant"):
-        # Placeholder for progress updates during generation
-        progress_placeholder = st.empty()
-        progress_placeholder.info("🔄 Initializing agents...")
-        await asyncio.sleep(0.3) # Short visual delay
-
-        inputs = {'topic': topic, 'tone': tone}
-        start_time = time.time()
-        crew_result = None
-        blog_content_output = None # Initialize
-
-        try:
-            crew_instance = st.session_state.crew_instance
-            progress_placeholder.info("🧠 Analyzing topic...")
-
-            # Kickoff crew asynchronously
-            progress_placeholder.info("▶️ Starting crew execution...")
-            crew_task = asyncio.create_task(crew_instance.crew().kickoff_async(inputs=inputs))
-
-            # Simulate progress updates while waiting
-            tasks_simulated = ["📚 Researching...", "✍️ Writing content...", "🔍 Optimizing for SEO..."]
-            while not crew_task.done():
-                idx = int(time.time() * 1.5) % len(tasks_simulated) # Cycle faster
-                progress_placeholder.info(tasks_simulated[idx])
-                await asyncio.sleep(0.6)
-
-            # Await final result
-            crew_result = await crew_task
-            end_time = time.time()
-            progress_placeholder.success(f"✅ Crew finished in {end_time - start_time:.2f} seconds!")
-            await asyncio.sleep(1.5) # Keep success message visible
-
-            # Process Results 
-            # Extract final task output (likely SEO metadata string)
-            seo_metadata_raw_output = getattr(crew_result, 'raw', str(crew_result))
-
-            # Extract intermediate writing task output (using helper if possible)
-            blog_content_output = extract_blog_content(crew_instance)
-
-            if not blog_content_output:
-                 # Fallback if helper fails: check tasks_output if available
-                 if hasattr(crew_result, 'tasks_output'):
-                      for task_output in crew_result.tasks_output:
-                          if "write a complete blog post" in task_output.task.config.get('description','').lower():
-                               blog_content_output = task_output.raw
-                               break
-                 if not blog_content_output:
-                      st.warning("Could not reliably extract blog content.")
-                      # Maybe raise error or use a placeholder? For now, continue processing SEO if possible.
-                      blog_content_output = "[Blog content extraction failed]" # Placeholder
-
-
-            # Call the processing function (now expects strings)
-            blog_content, seo_metadata = process_crew_output(
-                crew_result=seo_metadata_raw_output,
-                writing_task_output=blog_content_output
-            )
-
-            if blog_content != "[Blog content extraction failed]" and seo_metadata and "error" not in seo_metadata:
-                # Store structured result in session state
-                assistant_content = {
-                    "markdown": blog_content,
-                    "metadata": seo_metadata
-                }
-                add_message("assistant", assistant_content)
-            elif blog_content == "[Blog content extraction failed]" and seo_metadata and "error" not in seo_metadata:
-                # If only blog extraction failed, still add metadata info
-                add_message("assistant", f"Error extracting blog content. SEO Metadata: {json.dumps(seo_metadata)}")
-            else:
-                error_detail = seo_metadata.get('error', 'Unknown processing error.') if seo_metadata else 'Processing function failed.'
-                raise ValueError(f"Failed to process crew output: {error_detail}")
-
-        except Exception as e:
-            st.error(f"An error occurred during generation: {e}")
-            add_message("assistant", f"Sorry, I encountered an error: {str(e)[:500]}...") # Truncate long errors
-            traceback.print_exc() 
-
-        finally:
-            progress_placeholder.empty() 
-
+                # Download payloads are only built for the post whose downloads were requested
+                if st.session_state.download_message_id != message["id"]:
+                    st.button(
+                        "⬇️ Downloads",
+                        key=f"prepare_dl_{message['id']}",
+                        on_click=prepare_downloads,
+                        args=(message["id"],),
+                        use_container_width=True,
+                    )
+                else:
+                    st.download_button(
+                        label="⬇️ Blog (.md)",
+                        data=chat_history.markdown(message["id"]),
+                        file_name=f"{safe_filename}.md",
+                        mime="text/markdown",
+                        key=f"md_dl_{message['id']}", # Unique key per message
+                        use_container_width=True
+                    )
+                    st.download_button(
+                        label="⬇️ Metadata (.json)",
+                        data=json.dumps(metadata, indent=2, ensure_ascii=False),
+                        file_name=f"{safe_filename}_metadata.json",
+                        mime="application/json",
+                        key=f"json_dl_{message['id']}", # Unique key per message
+                        use_container_width=True
+                    )
+        else:
+            st.markdown(message["text"], unsafe_allow_html=True) # Allow bolding etc.
 
 # Trigger Generation
 if generate_button_form:
     if not topic_input:
         st.warning("Please enter a blog topic.")
     else:
-        asyncio.run(handle_generation(topic_input, tone_input))
-        st.rerun()
\ No newline at end of file
+        submit_generation(topic_input, tone_input, writer_mode_input, force_regenerate_input)
+        st.rerun()
+
+if pending_jobs(st.session_state.current_session_id):
+    render_pending_jobs()
@@ -0,0 +1,176 @@
+# benchmarks/fake_llm.py
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import litellm
+
+DEFAULT_HEADINGS = ["Why It Matters Now", "How It Works", "Practical Applications", "Common Pitfalls"]
+
+SENTENCES = [
+    "Teams that adopt {topic} early tend to ship faster and learn from real users sooner.",
+    "The core idea behind {topic} is simple, but the details decide whether it pays off.",
+    "Recent news shows that interest in {topic} keeps growing across industries.",
+    "A practical first step is to start small, measure the results and iterate.",
+    "Experts recommend pairing new tools with clear goals and honest feedback loops.",
+    "**Key point:** the benefits compound when the whole team shares the same vocabulary.",
+    "Many beginners underestimate how much planning up front saves later on.",
+    "Good documentation and examples make {topic} far easier to adopt.",
+    "Costs matter, so compare the options before committing to a single approach.",
+    "In short, {topic} rewards curiosity, patience and steady practice.",
+]
+
+
+def _paragraph(rng: random.Random, topic: str, sentences: int = 5) -> str:
+    return " ".join(rng.choice(SENTENCES).format(topic=topic) for _ in range(sentences))
+
+
+def _topic_of(text: str) -> str:
+    match = re.search(r"(?:topic: | for | about | on )'([^']+)'", text) or re.search(r"Blog topic: (.+)", text)
+    return match.group(1).strip() if match else "the topic"
+
+
+def _headings_of(text: str) -> list:
+    match = re.search(r'"outline_headings"\s*:\s*(\[[^\]]*\])', text)
+    if match:
+        try:
+            return json.loads(match.group(1))
+        except json.JSONDecodeError:
+            pass
+    return DEFAULT_HEADINGS
+
+
+def blog_post(topic: str, headings: list, words_per_section: int = 300) -> str:
+    """A deterministic Markdown post with an H1, intro, one section per heading and a conclusion."""
+    rng = random.Random(topic)
+    sentences_per_section = max(3, words_per_section // 15)
+    parts = [f"# {topic.title()}: A Practical Guide", _paragraph(rng, topic, 6)]
+    for heading in headings:
+        parts.append(f"## {heading}")
+        for _ in range(3):
+            parts.append(_paragraph(rng, topic, sentences_per_section // 3))
+        parts.append(f"- First idea about {heading.lower()}\n- Second idea about {heading.lower()}")
+    parts.append("## Conclusion")
+    parts.append(_paragraph(rng, topic, 4) + " Start experimenting today and share what you learn!")
+    return "\n\n".join(parts)
+
+
+def fake_answer(text: str, words_per_section: int = 300) -> str:
+    """Returns the canned response for the prompt, keyed on the task/brief wording it contains."""
+    topic = _topic_of(text)
+    if "Perform a strategic analysis" in text:
+        return json.dumps({
+            "target_audience": "Curious professionals",
+            "key_takeaway": f"{topic} is easier to adopt than it looks.",
+            "outline_headings": DEFAULT_HEADINGS,
+        })
+    if "Conduct targeted research" in text:
+        return (
+            "### News Highlights\n"
+            f"- **{topic} adoption grows (2025):** Surveys show steady growth.\n"
+            f"- **New tooling for {topic} (2025):** Vendors release simpler tools.\n\n"
+            "### Relevant Keywords\n- best practices, getting started, tools, benefits, examples"
+        )
+    if "Draft its SEO metadata ahead of time" in text:
+        slug = re.sub(r'[^a-z0-9]+', '-', topic.lower()).strip('-')
+        return json.dumps({
+            "title": f"{topic.title()}: A Practical Guide",
+            "meta_description": f"Learn how {topic} works, where it helps and how to get started today.",
+            "tags": [topic.lower(), "guide", "tools", "benefits", "documentation"],
+            "slug": slug or "blog-post",
+        })
+    if "Analyze the final blog post" in text:
+        slug = re.sub(r'[^a-z0-9]+', '-', topic.lower()).strip('-')
+        return "```json\n" + json.dumps({
+            "title": f"{topic.title()}: A Practical Guide",
+            "meta_description": f"Learn how {topic} works, where it helps and how to get started today.",
+            "tags": ["guide", "best practices", "getting started", "tools", "examples"],
+            "slug": slug or "blog-post",
+        }) + "\n```"
+    if "Return ONLY a JSON list of" in text:
+        return json.dumps(["Building on that, here is the next part." for _ in range(text.count("Boundary "))])
+    if "Write ONLY the introduction" in text:
+        return f"# {topic.title()}: A Practical Guide\n\n" + _paragraph(random.Random(topic), topic, 6)
+    if "Update ONLY the section '## " in text:
+        heading = text.split("Update ONLY the section '## ", 1)[1].split("'", 1)[0]
+        current = text.split("Current section of the published post:\n", 1)[1].split("\n\nNews published since", 1)[0]
+        return current + "\n\n" + f"**Update:** recent news adds new tools and benefits for {heading.lower()}."
+    if "Write ONLY the section '## " in text:
+        heading = text.split("Write ONLY the section '## ", 1)[1].split("'", 1)[0]
+        rng = random.Random(topic + heading)
+        return f"## {heading}\n\n" + "\n\n".join(_paragraph(rng, topic, max(3, words_per_section // 45)) for _ in range(3))
+    if "Write ONLY the conclusion" in text:
+        return "## Conclusion\n\n" + _paragraph(random.Random(topic), topic, 4) + " Start experimenting today!"
+    return blog_post(topic, _headings_of(text), words_per_section)
+
+
+class FakeLLM:
+    """
+    Deterministic stand-in for `litellm.completion`.
+
+    Every call sleeps for `latency` seconds (spread over the chunks when streaming)
+    and returns a canned response chosen from the prompt, in the ReAct "Final Answer"
+    format when the prompt asks for it. Token usage is reported as word counts.
+
+    With `rpm_quota`, calls beyond that many in any 60-second window fail with a
+    429 RateLimitError, like a provider enforcing its quota.
+    """
+
+    def __init__(self, latency: float = 0.0, words_per_section: int = 300, chunk_chars: int = 40, rpm_quota: int = 0):
+        self.latency = latency
+        self.words_per_section = words_per_section
+        self.chunk_chars = chunk_chars
+        self.rpm_quota = rpm_quota
+        self.calls = 0
+        self.rejected = 0
+        self._accepted = deque()
+        self._lock = threading.Lock()
+        self._original = None
+
+    def install(self):
+        self._original = litellm.completion
+        litellm.completion = self.completion
+        return self
+
+    def uninstall(self):
+        if self._original is not None:
+            litellm.completion = self._original
+            self._original = None
+
+    def completion(self, **params):
+        with self._lock:
+            if self.rpm_quota:
+                now = time.monotonic()
+                while self._accepted and now - self._accepted[0] >= 60:
+                    self._accepted.popleft()
+                if len(self._accepted) >= self.rpm_quota:
+                    self.rejected += 1
+                    raise litellm.RateLimitError(message="Quota exceeded", llm_provider="gemini", model=params.get("model", ""))
+                self._accepted.append(now)
+            self.calls += 1
+        prompt = "\n".join(str(m.get("content", "")) for m in params.get("messages", []))
+        answer = fake_answer(prompt, self.words_per_section)
+        if "Final Answer:" in prompt:
+            answer = f"Thought: I now can give a great answer\nFinal Answer: {answer}"
+        usage = SimpleNamespace(
+            prompt_tokens=len(prompt.split()),
+            completion_tokens=len(answer.split()),
+            total_tokens=len(prompt.split()) + len(answer.split()),
+        )
+        if params.get("stream"):
+            return self._stream(answer, usage)
+        time.sleep(self.latency)
+        message = SimpleNamespace(content=answer, tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    def _stream(self, answer: str, usage):
+        pieces = [answer[i:i + self.chunk_chars] for i in range(0, len(answer), self.chunk_chars)]
+        delay = self.latency / max(1, len(pieces))
+        for piece in pieces:
+            time.sleep(delay)
+            yield {"choices": [{"delta": {"content": piece}}]}
+        yield {"choices": [], "usage": usage}
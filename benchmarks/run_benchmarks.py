@@ -0,0 +1,447 @@
+# benchmarks/run_benchmarks.py
+"""
+Offline benchmarks for the blog pipeline.
+
+Runs the full staged pipeline against a deterministic fake LLM (benchmarks/fake_llm.py)
+and local stub NewsData/Datamuse servers (benchmarks/stub_servers.py), so no network
+access or API quota is needed. Reports end-to-end latency, framework overhead,
+batch throughput at several concurrency levels, HTTP service throughput, microbenchmarks of the
+post-processing and save helpers, and the startup cost of fresh processes
+(package imports and `main.py --help`).
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmarks --llm-latency 0.5 --concurrency 1 2 4
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json --max-regression 0.2
+    python -m benchmarks.run_benchmarks --skip-e2e --skip-micro   # startup only
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from .fake_llm import FakeLLM, blog_post, fake_answer, DEFAULT_HEADINGS
+from .stub_servers import StubAPIServer, news_response
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+TOPICS = [
+    "Edge computing for small teams",
+    "Sustainable home gardening",
+    "Async programming in Python",
+    "Remote work best practices",
+    "Electric vehicles in cities",
+    "Learning a second language",
+    "Personal finance for students",
+    "Open source maintenance",
+]
+
+# Modules timed in a fresh interpreter. blog_writer_agent.crew is the full cost a
+# generation pays on first use; the others must stay light.
+STARTUP_IMPORTS = ("blog_writer_agent.pipeline", "blog_writer_agent.jobs", "main", "blog_writer_agent.crew")
+# Must not be loaded by importing the CLI, the pipeline or the job runner.
+HEAVY_MODULES = ("crewai", "litellm", "textstat", "httpx", "chromadb", "openai")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Offline end-to-end and micro benchmarks for the blog writer pipeline",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Simulated seconds per LLM call.")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="Simulated seconds per NewsData/Datamuse request.")
+    parser.add_argument("--runs", type=int, default=3, help="Sequential end-to-end runs used for the latency figures.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4], help="Batch concurrency levels to measure throughput at.")
+    parser.add_argument("--batch-size", type=int, default=8, help="Posts generated per throughput measurement.")
+    parser.add_argument("--llm-rpm-quota", type=int, default=0, help="Make the fake LLM reject calls beyond this many per minute with a 429, and give the Gemini rate limiter the same budget (0 = no quota, limiter budgets off).")
+    parser.add_argument("--words-per-section", type=int, default=300, help="Approximate length of each fake section.")
+    parser.add_argument("--writer-mode", choices=("single", "sections"), default="single")
+    parser.add_argument("--seo-mode", choices=("llm", "fast", "speculative"), default="llm")
+    parser.add_argument("--no-prefetch", action="store_true")
+    parser.add_argument("--skip-e2e", action="store_true", help="Skip the end-to-end latency and throughput benchmarks.")
+    parser.add_argument("--skip-micro", action="store_true", help="Skip the microbenchmarks.")
+    parser.add_argument("--skip-startup", action="store_true", help="Skip the fresh-process import/startup benchmarks.")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Fresh processes timed per startup figure (median reported).")
+    parser.add_argument("--output", type=str, help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", type=str, help="Earlier --output file to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed slowdown vs. the baseline (0.25 = 25%%) before exiting with status 1.")
+    return parser.parse_args()
+
+
+def configure_environment(stub: StubAPIServer, workdir: Path, llm_rpm_quota: int = 0):
+    """Points the tools at the stub server and keeps caches/outputs in a throwaway directory."""
+    os.environ.update({
+        # The limiters stay in the path (their overhead is measured) but only enforce the simulated quota.
+        "GEMINI_RPM": str(llm_rpm_quota),
+        "GEMINI_TPM": "0",
+        "GEMINI_MAX_CONCURRENCY": "64",
+        "NEWSDATA_RPM": "0",
+        "NEWSDATA_MAX_CONCURRENCY": "64",
+        "DATAMUSE_RPM": "0",
+        "DATAMUSE_MAX_CONCURRENCY": "64",
+        "NEWSDATA_BASE_URL": stub.news_url,
+        "DATAMUSE_BASE_URL": stub.datamuse_url,
+        "NEWSDATA_API_KEY": "benchmark",
+        "GOOGLE_API_KEY": "benchmark",
+        "BLOG_CACHE_DIR": str(workdir / "cache"),
+        "API_CACHE_ENABLED": "false",
+        "LLM_CACHE": "false",
+        "RESULT_CACHE_ENABLED": "false",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+        "NO_PROXY": "127.0.0.1,localhost",
+    })
+    os.chdir(workdir)
+
+
+def _summary(values):
+    return {
+        "mean": round(statistics.mean(values), 4),
+        "p50": round(statistics.median(values), 4),
+        "max": round(max(values), 4),
+    }
+
+
+def _model_wall_seconds(events) -> float:
+    """Wall time during which at least one LLM call was in flight (parallel section calls overlap)."""
+    intervals = sorted(
+        (event["elapsed_seconds"] - event["seconds"], event["elapsed_seconds"])
+        for event in events if event["event"] == "llm_call" and not event["cached"]
+    )
+    total, current_start, current_end = 0.0, None, None
+    for start, end in intervals:
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+async def bench_latency(args, fake: FakeLLM) -> dict:
+    """Sequential end-to-end runs: wall time, time spent inside the fake LLM, and everything else."""
+    from blog_writer_agent.pipeline import PipelineOptions, generate_blog, warm_up
+    from blog_writer_agent.telemetry import RunTelemetry
+
+    options = PipelineOptions(prefetch=not args.no_prefetch, writer_mode=args.writer_mode, seo_mode=args.seo_mode)
+    # Startup cost is measured separately (bench_startup); keep it out of the first run.
+    warm_up()
+    durations, model_seconds, overheads, calls = [], [], [], []
+    for i in range(args.runs):
+        calls_before = fake.calls
+        telemetry = RunTelemetry()
+        with redirect_stdout(io.StringIO()):
+            result = await generate_blog(TOPICS[i % len(TOPICS)], "Educational", options, telemetry=telemetry)
+        if not result.ok:
+            raise RuntimeError(f"Benchmark run failed: {result.error}")
+        model_wall = _model_wall_seconds(telemetry.events)
+        durations.append(result.duration_seconds)
+        model_seconds.append(model_wall)
+        overheads.append(result.duration_seconds - model_wall)
+        calls.append(fake.calls - calls_before)
+    return {
+        "runs": args.runs,
+        "llm_calls_per_run": max(calls),
+        "end_to_end_seconds": _summary(durations),
+        "model_seconds": _summary(model_seconds),
+        # Wall time not spent waiting on the model: crew setup, prompt building, parsing,
+        # tool calls not hidden by the prefetch, and post-processing.
+        "framework_overhead_seconds": _summary(overheads),
+        "stage_seconds": result.timing["stages"],
+        "context_tokens_saved": result.timing["context"]["tokens_saved"],
+    }
+
+
+async def bench_throughput(args, fake: FakeLLM) -> list:
+    from blog_writer_agent.batch import run_batch
+    from blog_writer_agent.pipeline import PipelineOptions, generate_blog
+
+    options = PipelineOptions(prefetch=not args.no_prefetch, writer_mode=args.writer_mode, seo_mode=args.seo_mode)
+
+    async def runner(topic, tone):
+        return await generate_blog(topic, tone, options)
+
+    levels = []
+    for concurrency in args.concurrency:
+        items = [{"topic": TOPICS[i % len(TOPICS)], "tone": "Educational"} for i in range(args.batch_size)]
+        rejected_before = fake.rejected
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            results = await run_batch(items, concurrency=concurrency, runner=runner)
+        wall_time = time.perf_counter() - start
+        failed = sum(1 for r in results if not r.ok)
+        levels.append({
+            "concurrency": concurrency,
+            "posts": len(items),
+            "failed": failed,
+            "wall_time_seconds": round(wall_time, 3),
+            "posts_per_minute": round((len(items) - failed) / wall_time * 60, 2),
+            # LLM calls the simulated quota rejected with a 429 (see --llm-rpm-quota)
+            "llm_calls_rejected": fake.rejected - rejected_before,
+        })
+    return levels
+
+
+async def bench_service(args) -> dict:
+    """
+    Posts submitted over HTTP to an in-process service (server.py) with as many workers
+    as the highest --concurrency level, followed to completion through one event stream each.
+    """
+    import aiohttp
+    from aiohttp import web
+    from blog_writer_agent.job_queue import JobQueue
+    from blog_writer_agent.service import BlogService, create_app
+
+    workers = max(args.concurrency)
+    options = {"prefetch": not args.no_prefetch, "writer_mode": args.writer_mode, "seo_mode": args.seo_mode}
+    runner = web.AppRunner(create_app(BlogService(JobQueue(Path("service-jobs.sqlite3")), workers=workers)))
+    with redirect_stdout(io.StringIO()):
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+    base_url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+    async def follow(session, job_id: str) -> int:
+        events = 0
+        async with session.get(f"{base_url}/jobs/{job_id}/events") as response:
+            async for line in response.content:
+                events += line.startswith(b"event:")
+        return events
+
+    try:
+        with redirect_stdout(io.StringIO()):
+            async with aiohttp.ClientSession() as session:
+                start = time.perf_counter()
+                submit_seconds, job_ids = [], []
+                for i in range(args.batch_size):
+                    submitted = time.perf_counter()
+                    async with session.post(f"{base_url}/jobs", json={"topic": TOPICS[i % len(TOPICS)], "options": options}) as response:
+                        job_ids.append((await response.json())["id"])
+                    submit_seconds.append(time.perf_counter() - submitted)
+                events = await asyncio.gather(*(follow(session, job_id) for job_id in job_ids))
+                wall_time = time.perf_counter() - start
+                statuses = []
+                for job_id in job_ids:
+                    async with session.get(f"{base_url}/jobs/{job_id}/result") as response:
+                        statuses.append((await response.json())["status"])
+    finally:
+        with redirect_stdout(io.StringIO()):
+            await runner.cleanup()
+    failed = sum(1 for status in statuses if status != "done")
+    return {
+        "workers": workers,
+        "posts": args.batch_size,
+        "failed": failed,
+        "wall_time_seconds": round(wall_time, 3),
+        "posts_per_minute": round((args.batch_size - failed) / wall_time * 60, 2),
+        "submit_ms": _summary([seconds * 1000 for seconds in submit_seconds]),
+        "events_per_job": round(statistics.mean(events), 1),
+    }
+
+
+def _per_call_microseconds(func, number: int, repeat: int = 5) -> float:
+    return round(min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6, 2)
+
+
+def bench_micro(args) -> dict:
+    """Per-call timings (best of 5) of the post-processing and save helpers."""
+    from blog_writer_agent import utils
+    from blog_writer_agent.analytics import analyze, analyze_many
+    from blog_writer_agent.context_budget import compact_context, count_tokens
+    from blog_writer_agent.crew import process_crew_output
+    from blog_writer_agent.research import merge_articles, rank_articles
+    from blog_writer_agent.store import OutputStore
+
+    blog = blog_post("Async programming in Python", DEFAULT_HEADINGS, args.words_per_section)
+    seo_output = '```json\n{"title": "T", "meta_description": "D", "tags": ["a", "b"], "slug": "t"}\n```'
+    metadata = {"title": "T", "meta_description": "D", "tags": ["a", "b"], "slug": "t", "estimated_reading_time_minutes": 7}
+    # One topic query plus one per heading, as the news fan-out sends them.
+    news_queries = ["Async programming in Python", *(heading.lower() for heading in DEFAULT_HEADINGS)]
+    news_results = {query: news_response(query)["results"] for query in news_queries}
+    seo_context = [("writing_task", blog), ("research_task", fake_answer("Conduct targeted research for the blog post on 'Async programming in Python'"))]
+
+    # Every timed scoring call gets a distinct post, so no call is answered from a cache keyed on the text.
+    variants = iter([f"{blog}\n\nRevision {i}." for i in range(4 * 5 * 50)])
+
+    store = OutputStore(root=Path("store"))
+    with redirect_stdout(io.StringIO()):
+        for i in range(500):
+            store.save_post(f"Indexed topic {i}", "Educational", blog, {**metadata, "slug": f"post-{i}", "tags": ["guide", f"tag-{i % 10}"]})
+        compacted = compact_context("seo_optimization_task", seo_context, 600)
+        return {
+            "blog_words": len(blog.split()),
+            # SEO task context before and after compaction to a 600-token budget
+            "seo_context_tokens": count_tokens("\n\n----------\n\n".join(raw for _, raw in seo_context)),
+            "seo_context_compacted_tokens": count_tokens(compacted),
+            "compact_context_us": _per_call_microseconds(lambda: compact_context("seo_optimization_task", seo_context, 600), 50),
+            "news_fanout_merge_rank_us": _per_call_microseconds(
+                lambda: rank_articles(merge_articles(news_results), news_queries[0], news_queries), 50
+            ),
+            "process_crew_output_us": _per_call_microseconds(lambda: process_crew_output(seo_output, f"```markdown\n{next(variants)}\n```"), 50),
+            "process_crew_output_fast_seo_us": _per_call_microseconds(
+                lambda: process_crew_output(None, next(variants), fast_seo=True, topic="Async programming in Python", keywords=["python", "asyncio"]), 50
+            ),
+            "calculate_readability_score_us": _per_call_microseconds(lambda: utils.calculate_readability_score(next(variants)), 50),
+            "calculate_reading_time_us": _per_call_microseconds(lambda: utils.calculate_reading_time(blog), 200),
+            "analyze_us": _per_call_microseconds(lambda: analyze(next(variants), keywords=["python", "event loop"]), 50),
+            # Per post, over a 500-post archive in one process
+            "analyze_many_per_post_us": round(_per_call_microseconds(lambda: analyze_many([blog] * 500, workers=1), 1, repeat=3) / 500, 2),
+            "store_rescore_per_post_us": round(_per_call_microseconds(lambda: store.rescore(workers=1), 1, repeat=3) / 500, 2),
+            "save_markdown_us": _per_call_microseconds(lambda: utils.save_markdown("benchmark_blog", blog), 100),
+            "save_json_us": _per_call_microseconds(lambda: utils.save_json("benchmark_metadata", metadata), 100),
+            "store_save_post_us": _per_call_microseconds(lambda: store.save_post("Async programming in Python", "Educational", blog, metadata), 50),
+            "store_find_by_tag_us": _per_call_microseconds(lambda: store.find(tag="tag-3", limit=None), 200),
+            "store_get_by_slug_us": _per_call_microseconds(lambda: store.get_by_slug("post-250"), 200),
+        }
+
+
+def _run_python(code: str, *args: str) -> str:
+    env = {**os.environ, "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true"}
+    completed = subprocess.run(
+        [sys.executable, *(("-c", code) if code else ()), *args],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return completed.stdout
+
+
+def _import_seconds(module: str) -> float:
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    return float(_run_python(code).strip().splitlines()[-1])
+
+
+def _process_seconds(*args: str) -> float:
+    start = time.perf_counter()
+    _run_python("", *args)
+    return time.perf_counter() - start
+
+
+def bench_startup(args) -> dict:
+    """Median import times and `main.py --help` wall time in fresh interpreters, plus heavy modules loaded by the light entry points."""
+    runs = max(1, args.startup_runs)
+    results = {}
+    for module in STARTUP_IMPORTS:
+        results[f"import_{module.replace('.', '_')}_seconds"] = round(statistics.median(_import_seconds(module) for _ in range(runs)), 4)
+    results["interpreter_seconds"] = round(statistics.median(_process_seconds("-c", "pass") for _ in range(runs)), 4)
+    results["main_help_seconds"] = round(statistics.median(_process_seconds("main.py", "--help") for _ in range(runs)), 4)
+    code = (
+        "import sys, main, blog_writer_agent.jobs; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    loaded = _run_python(code).strip().splitlines()
+    results["heavy_modules_loaded"] = [m for m in (loaded[-1] if loaded else "").split(",") if m]
+    return results
+
+
+def compare_to_baseline(results: dict, baseline: dict, max_regression: float) -> list:
+    """Returns a description of every tracked figure that got slower than the baseline allows."""
+    tracked = []
+    if "latency" in results and "latency" in baseline:
+        tracked.append(("end-to-end mean", results["latency"]["end_to_end_seconds"]["mean"], baseline["latency"]["end_to_end_seconds"]["mean"]))
+        tracked.append(("framework overhead mean", results["latency"]["framework_overhead_seconds"]["mean"], baseline["latency"]["framework_overhead_seconds"]["mean"]))
+    for name, value in results.get("micro", {}).items():
+        if name.endswith("_us") and name in baseline.get("micro", {}):
+            tracked.append((name, value, baseline["micro"][name]))
+    for name, value in results.get("startup", {}).items():
+        if name.endswith("_seconds") and name in baseline.get("startup", {}):
+            tracked.append((name, value, baseline["startup"][name]))
+    regressions = []
+    for name, value, previous in tracked:
+        if previous and value > previous * (1 + max_regression):
+            regressions.append(f"{name}: {value} vs. baseline {previous} (+{(value / previous - 1):.0%})")
+    return regressions
+
+
+def print_results(results: dict):
+    print("\n--- Benchmark Results ---")
+    config = results["config"]
+    print(f"   LLM latency: {config['llm_latency']}s/call, API latency: {config['api_latency']}s/request, writer: {config['writer_mode']}, SEO: {config['seo_mode']}")
+    if "latency" in results:
+        latency = results["latency"]
+        print(f"   End-to-end: mean {latency['end_to_end_seconds']['mean']}s, p50 {latency['end_to_end_seconds']['p50']}s, max {latency['end_to_end_seconds']['max']}s ({latency['llm_calls_per_run']} LLM calls/run)")
+        print(f"   Model time: mean {latency['model_seconds']['mean']}s; framework overhead: mean {latency['framework_overhead_seconds']['mean']}s")
+        print(f"   Stages (last run): {', '.join(f'{k} {v}s' for k, v in latency['stage_seconds'].items())}")
+        print(f"   Context compaction (last run): ~{latency['context_tokens_saved']} input tokens saved")
+    for level in results.get("throughput", []):
+        print(f"   Concurrency {level['concurrency']}: {level['posts']} posts in {level['wall_time_seconds']}s -> {level['posts_per_minute']} posts/minute ({level['failed']} failed, {level['llm_calls_rejected']} LLM calls rejected by the quota)")
+    if "service" in results:
+        service = results["service"]
+        print(f"   HTTP service ({service['workers']} workers): {service['posts']} posts in {service['wall_time_seconds']}s -> {service['posts_per_minute']} posts/minute ({service['failed']} failed), submit p50 {service['submit_ms']['p50']}ms, {service['events_per_job']} events streamed per job")
+    for name, value in results.get("micro", {}).items():
+        print(f"   {name}: {value}")
+    for name, value in results.get("startup", {}).items():
+        print(f"   {name}: {value}")
+    print("-------------------------")
+
+
+def main():
+    args = parse_args()
+    results = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "llm_latency": args.llm_latency,
+            "api_latency": args.api_latency,
+            "writer_mode": args.writer_mode,
+            "seo_mode": args.seo_mode,
+            "prefetch": not args.no_prefetch,
+            "words_per_section": args.words_per_section,
+            "llm_rpm_quota": args.llm_rpm_quota,
+        },
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    output_path = Path(args.output).resolve() if args.output else None
+
+    with tempfile.TemporaryDirectory(prefix="blog-bench-") as workdir, StubAPIServer(latency=args.api_latency) as stub:
+        cwd = os.getcwd()
+        configure_environment(stub, Path(workdir), args.llm_rpm_quota)
+        fake = FakeLLM(latency=args.llm_latency, words_per_section=args.words_per_section, rpm_quota=args.llm_rpm_quota).install()
+        try:
+            if not args.skip_e2e:
+                results["latency"] = asyncio.run(bench_latency(args, fake))
+                results["throughput"] = asyncio.run(bench_throughput(args, fake))
+                results["service"] = asyncio.run(bench_service(args))
+            if not args.skip_micro:
+                results["micro"] = bench_micro(args)
+        finally:
+            fake.uninstall()
+            os.chdir(cwd)
+
+    if not args.skip_startup:
+        results["startup"] = bench_startup(args)
+
+    print_results(results)
+    if output_path:
+        output_path.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"✅ Benchmark results saved to: {output_path}")
+    status = 0
+    heavy = results.get("startup", {}).get("heavy_modules_loaded")
+    if heavy:
+        print(f"❌ Importing main/pipeline/jobs loaded heavy modules: {', '.join(heavy)}")
+        status = 1
+    if baseline is not None:
+        regressions = compare_to_baseline(results, baseline, args.max_regression)
+        if regressions:
+            print("❌ Performance regressions vs. baseline:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print("✅ No regressions vs. baseline.")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+# benchmarks/serve_stubbed.py
+"""
+Runs the HTTP service (server.py) against the fake LLM and local stub
+NewsData/Datamuse servers, to try the API without keys, network or quota.
+
+Usage (from the repository root):
+    python -m benchmarks.serve_stubbed --port 8080 --llm-latency 0.5
+    python -m benchmarks.serve_stubbed --workdir /tmp/blog-service   # keep the queue across restarts
+
+    curl -s -X POST localhost:8080/jobs -d '{"topic": "Edge computing"}'
+    curl -N localhost:8080/jobs/<id>/events
+    curl -s localhost:8080/jobs/<id>/result
+"""
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+from .fake_llm import FakeLLM
+from .run_benchmarks import configure_environment
+from .stub_servers import StubAPIServer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Serve the blog writer HTTP API with a fake LLM and stub APIs",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=4, help="Maximum number of posts generated at once.")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Simulated seconds per LLM call.")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="Simulated seconds per NewsData/Datamuse request.")
+    parser.add_argument("--workdir", type=str, help="Directory for the job queue, checkpoints and outputs (default: a temporary one).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="blog-service-") as tmp, StubAPIServer(latency=args.api_latency) as stub:
+        workdir = Path(args.workdir or tmp).resolve()
+        workdir.mkdir(parents=True, exist_ok=True)
+        cwd = os.getcwd()
+        configure_environment(stub, workdir)
+        fake = FakeLLM(latency=args.llm_latency).install()
+        print(f"🧪 Fake LLM ({args.llm_latency}s/call) and stub APIs at {stub.base_url}; state in {workdir}")
+        try:
+            # Imported after configure_environment, which sets the cache and queue locations.
+            from blog_writer_agent.service import run_service
+            run_service(host=args.host, port=args.port, workers=args.workers)
+        finally:
+            fake.uninstall()
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/stub_servers.py
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+NEWS_PATH = "/api/1/news"
+DATAMUSE_PATH = "/words"
+
+
+def news_response(query: str, size: int = 5) -> dict:
+    """A NewsData.io-shaped success response with `size` articles about `query`."""
+    return {
+        "status": "success",
+        "totalResults": size,
+        "results": [
+            {
+                "title": f"{query.title()} update #{i + 1}",
+                "link": f"https://news.example.com/{'-'.join(query.lower().split())}/{i + 1}",
+                "description": f"Article {i + 1} explains what changed for {query} this week and why readers should care. " * 2,
+                "content": None,
+                "pubDate": "2025-01-0%d 08:00:00" % (i + 1),
+                "source_id": "example",
+            }
+            for i in range(size)
+        ],
+    }
+
+
+def datamuse_response(query: str, count: int = 15) -> list:
+    """A Datamuse-shaped list of related words for `query`."""
+    base = query.lower().split()[0] if query.strip() else "topic"
+    return [{"word": f"{base} keyword {i + 1}", "score": 1000 - i * 10} for i in range(count)]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        time.sleep(self.latency)
+        if url.path == NEWS_PATH:
+            body = news_response(params.get("q", ""), int(params.get("size", 5)))
+        elif url.path == DATAMUSE_PATH:
+            body = datamuse_response(params.get("ml", ""), int(params.get("max", 15)))
+        else:
+            self.send_error(404)
+            return
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubAPIServer:
+    """
+    Local HTTP server answering both the NewsData.io (`/api/1/news`) and Datamuse
+    (`/words`) endpoints after `latency` seconds. Runs in a daemon thread.
+    """
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        handler = type("StubHandler", (_StubHandler,), {"latency": latency})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def news_url(self) -> str:
+        return self.base_url + NEWS_PATH
+
+    @property
+    def datamuse_url(self) -> str:
+        return self.base_url + DATAMUSE_PATH
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,257 @@
+# src/blog_writer/analytics.py
+import os
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+
+WORDS_PER_MINUTE = 200
+# Below this many texts, starting a process pool costs more than it saves.
+PARALLEL_MIN_TEXTS = 256
+
+_FENCE_RE = re.compile(r'^\s{0,3}(```|~~~)')
+_HEADING_RE = re.compile(r'^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$')
+_LIST_ITEM_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+_QUOTE_RE = re.compile(r'^\s*(?:>\s?)+')
+_RULE_RE = re.compile(r'^\s{0,3}(?:[-*_]\s*){3,}$|^\s*\|?\s*:?-{3,}:?\s*(?:\|\s*:?-{3,}:?\s*)*\|?\s*$')
+# Images and links keep their text, inline code keeps its content, HTML tags and emphasis markers go.
+# (The lookahead lets the scan skip plain characters without trying every alternative.)
+_INLINE_RE = re.compile(r'(?=[!\[`<*_~])(?:(!?)\[([^\]]*)\]\([^)]*\)|`([^`]*)`|<[^>\n]+>|[*_~]+)')
+_WORD_RE = re.compile(r"[^\W_]+(?:[-'’][^\W_]+)*")
+_SENTENCE_END_RE = re.compile(r'[.!?]+(?=[\s"\')\]]|$)')
+_VOWEL_GROUP_RE = re.compile(r'[aeiouy]+')
+
+_textstat = None
+
+
+def _syllable_heuristic(word: str) -> int:
+    """
+    Syllables of a lowercase word textstat does not know, estimated as its vowel
+    groups. Silent endings are over-counted, which is acceptable for the rare
+    words (mostly jargon and names) that reach this fallback.
+    """
+    return max(1, len(_VOWEL_GROUP_RE.findall(word)))
+
+
+@lru_cache(maxsize=65536)
+def count_syllables(word: str) -> int:
+    """
+    Syllables of a lowercase word from textstat's pronouncing dictionary, or from
+    the spelling for words it does not know (e.g. "async"). Hyphenated parts are
+    counted separately.
+    """
+    global _textstat
+    if "-" in word:
+        return sum(count_syllables(part) for part in word.split("-") if part)
+    if _textstat is None:
+        # textstat loads its syllable dictionaries on import (~1.5s), so only pay for it when scoring
+        import textstat
+        _textstat = textstat
+    try:
+        return _textstat.syllable_count(word) or _syllable_heuristic(word)
+    except KeyError:
+        return _syllable_heuristic(word)
+
+
+def _inline_text(match) -> str:
+    """The text an _INLINE_RE match stands for: a link's or image's text, inline code's content, else nothing."""
+    if match.group(2) is not None:
+        return match.group(2)
+    return match.group(3) or ""
+
+
+def strip_markdown(text: str) -> str:
+    """
+    The prose of a Markdown text, as `analyze` reads it: code blocks and rules are
+    dropped, quote, heading and list markers and table pipes removed, and inline
+    syntax stripped (link targets, HTML tags, emphasis). Line breaks are kept.
+    """
+    lines = []
+    in_code = False
+    for line in (text or "").splitlines():
+        if _FENCE_RE.match(line):
+            in_code = not in_code
+            continue
+        if in_code:
+            continue
+        line = _QUOTE_RE.sub("", line, count=1)
+        if line.strip() and _RULE_RE.match(line):
+            continue
+        heading = _HEADING_RE.match(line)
+        if heading:
+            line = heading.group(2)
+        elif _LIST_ITEM_RE.match(line):
+            line = _LIST_ITEM_RE.sub("", line, count=1)
+        elif "|" in line.strip()[:1]:
+            line = line.replace("|", " ")
+        lines.append(line)
+    return _INLINE_RE.sub(_inline_text, "\n".join(lines))
+
+
+@dataclass
+class TextStats:
+    word_count: int = 0
+    sentence_count: int = 0
+    syllable_count: int = 0
+    paragraph_count: int = 0
+    list_item_count: int = 0
+    link_count: int = 0
+    image_count: int = 0
+    code_block_count: int = 0
+    # Number of headings per level (1-6) and the words of each section (its heading included), preamble first.
+    heading_counts: Dict[int, int] = field(default_factory=dict)
+    section_word_counts: List[int] = field(default_factory=list)
+    # Share of the words (in percent) taken by each keyword, keyed by the lowercased keyword.
+    keyword_density: Dict[str, float] = field(default_factory=dict)
+    flesch_reading_ease: float = 0.0
+    reading_time_minutes: int = 0
+
+    def as_metadata(self) -> dict:
+        """The fields saved in a post's _metadata.json."""
+        return {
+            "estimated_reading_time_minutes": self.reading_time_minutes,
+            "flesch_reading_ease_score": self.flesch_reading_ease,
+            "word_count": self.word_count,
+            "keyword_density": self.keyword_density,
+        }
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def analyze(text: str, keywords: Optional[Iterable[str]] = None) -> TextStats:
+    """
+    Computes the text metrics of a Markdown post in a single pass over its lines.
+
+    Code blocks, link targets, HTML tags and Markdown syntax are not counted as
+    prose; headings, list items and table rows end a sentence even without
+    punctuation, so outlines do not read as one giant sentence. Reading time is
+    based on the prose words at WORDS_PER_MINUTE.
+    """
+    stats = TextStats()
+    tokens = []
+    sections = [0]
+    unit = []
+    in_code = False
+
+    def inline(match):
+        if match.group(2) is not None:
+            if match.group(1):
+                stats.image_count += 1
+            else:
+                stats.link_count += 1
+        return _inline_text(match)
+
+    def flush():
+        # Counts the words, syllables and sentences of one prose unit (paragraph, heading, list item or table row).
+        if not unit:
+            return
+        plain = _INLINE_RE.sub(inline, " ".join(unit)).lower()
+        unit.clear()
+        words = _WORD_RE.findall(plain)
+        if not words:
+            return
+        tokens.extend(words)
+        stats.word_count += len(words)
+        stats.syllable_count += sum(map(count_syllables, words))
+        sections[-1] += len(words)
+        ends = list(_SENTENCE_END_RE.finditer(plain))
+        stats.sentence_count += len(ends) + (1 if not ends or _WORD_RE.search(plain, ends[-1].end()) else 0)
+
+    in_paragraph = False
+    for line in (text or "").splitlines():
+        if _FENCE_RE.match(line):
+            if not in_code:
+                flush()
+                in_paragraph = False
+                stats.code_block_count += 1
+            in_code = not in_code
+            continue
+        if in_code:
+            continue
+        line = _QUOTE_RE.sub("", line, count=1)
+        if not line.strip() or _RULE_RE.match(line):
+            flush()
+            in_paragraph = False
+            continue
+        heading = _HEADING_RE.match(line)
+        if heading:
+            flush()
+            in_paragraph = False
+            level = len(heading.group(1))
+            stats.heading_counts[level] = stats.heading_counts.get(level, 0) + 1
+            sections.append(0)
+            unit.append(heading.group(2))
+            flush()
+            continue
+        item = _LIST_ITEM_RE.match(line)
+        if item or "|" in line.strip()[:1]:
+            flush()
+            in_paragraph = False
+            if item:
+                stats.list_item_count += 1
+                line = line[item.end():]
+            unit.append(line.replace("|", " "))
+            continue
+        if not in_paragraph and not unit:
+            stats.paragraph_count += 1
+            in_paragraph = True
+        unit.append(line)
+    flush()
+
+    if sections[0] == 0 and len(sections) > 1:
+        sections.pop(0)
+    stats.section_word_counts = sections
+    if stats.word_count:
+        stats.flesch_reading_ease = round(
+            206.835 - 1.015 * (stats.word_count / max(1, stats.sentence_count)) - 84.6 * (stats.syllable_count / stats.word_count), 2
+        )
+        stats.reading_time_minutes = max(1, round(stats.word_count / WORDS_PER_MINUTE))
+        stats.keyword_density = _keyword_density(tokens, keywords)
+    return stats
+
+
+def _keyword_density(tokens: List[str], keywords: Optional[Iterable[str]]) -> Dict[str, float]:
+    density = {}
+    counts = None
+    joined = None
+    for keyword in keywords or []:
+        phrase = [word.lower() for word in _WORD_RE.findall(str(keyword))]
+        key = " ".join(phrase)
+        if not phrase or key in density:
+            continue
+        if len(phrase) == 1:
+            counts = counts if counts is not None else Counter(tokens)
+            occurrences = counts[key]
+        else:
+            joined = joined if joined is not None else f" {' '.join(tokens)} "
+            occurrences = joined.count(f" {key} ")
+        density[key] = round(occurrences * len(phrase) / len(tokens) * 100, 2)
+    return density
+
+
+def _analyze_pair(pair) -> TextStats:
+    return analyze(*pair)
+
+
+def analyze_many(texts: Iterable[str], keywords: Optional[Sequence[Optional[Iterable[str]]]] = None, workers: Optional[int] = None) -> List[TextStats]:
+    """
+    Analyzes many posts, returning their stats in order. `keywords` holds one keyword
+    list (or None) per text. Large batches are split across `workers` processes
+    (default: one per CPU, up to 8, from PARALLEL_MIN_TEXTS texts up); each process
+    memoizes syllable counts, so the shared vocabulary of an archive is counted once
+    per worker rather than once per post.
+    """
+    texts = list(texts)
+    pairs = list(zip(texts, keywords if keywords is not None else [None] * len(texts)))
+    if workers is None:
+        workers = min(os.cpu_count() or 1, 8) if len(pairs) >= PARALLEL_MIN_TEXTS else 1
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(_analyze_pair, pairs, chunksize=max(1, len(pairs) // (workers * 4))))
+        except (OSError, RuntimeError) as e:
+            print(f"Warning: Could not analyze in parallel, falling back to one process. Error: {e}")
+    return [_analyze_pair(pair) for pair in pairs]
@@ -0,0 +1,132 @@
+# src/blog_writer/batch.py
+import asyncio
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+from .pipeline import BlogRunResult, generate_blog
+from .utils import run_in_thread, thread_pool
+
+DEFAULT_TONE = "Educational"
+# Worker threads reserved per concurrent run: one per crew stage, plus one per
+# section when the writer drafts sections in parallel.
+THREADS_PER_RUN = 8
+
+
+def load_batch_items(path: str, default_tone: str = DEFAULT_TONE) -> List[dict]:
+    """
+    Loads (topic, tone) pairs from a JSONL or CSV file.
+
+    JSONL files hold one object per line with a "topic" and optional "tone" key.
+    CSV files need a header row with a "topic" column and an optional "tone" column.
+    Rows without a topic are skipped.
+    """
+    filepath = Path(path)
+    if not filepath.exists():
+        raise FileNotFoundError(f"Batch file not found: {filepath}")
+
+    rows = []
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        if filepath.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(f))
+        else:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {line_no} of {filepath}: {e}") from e
+
+    items = []
+    for row in rows:
+        topic = (row.get("topic") or "").strip()
+        if not topic:
+            print(f"Warning: Skipping batch row without a topic: {row}")
+            continue
+        tone = (row.get("tone") or "").strip() or default_tone
+        items.append({"topic": topic, "tone": tone})
+    return items
+
+
+async def run_batch(
+    items: List[dict],
+    concurrency: int = 4,
+    on_result: Optional[Callable[[int, BlogRunResult], None]] = None,
+    runner: Callable[[str, str], Awaitable[BlogRunResult]] = generate_blog,
+) -> List[BlogRunResult]:
+    """
+    Runs every item through the crew with at most `concurrency` runs in flight.
+
+    Results are returned in input order. `on_result` is called with the item index
+    and its result as soon as each run finishes, in a worker thread (it usually saves files).
+    """
+    concurrency = max(1, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(index: int, item: dict) -> BlogRunResult:
+        async with semaphore:
+            print(f"▶️ [{index + 1}/{len(items)}] Starting: '{item['topic']}' (Tone: {item['tone']})")
+            result = await runner(item["topic"], item["tone"])
+        if on_result:
+            await run_in_thread(on_result, index, result)
+        return result
+
+    # Crew kickoffs (and section drafting) run in worker threads, so the batch gets a
+    # pool wide enough for every run in flight, shut down when the batch ends.
+    with thread_pool(concurrency * THREADS_PER_RUN, "blog-batch"):
+        return await asyncio.gather(*(run_one(i, item) for i, item in enumerate(items)))
+
+
+def build_batch_report(results: List[BlogRunResult], wall_time_seconds: float, concurrency: int) -> dict:
+    """Builds a JSON-serializable summary of a batch run, including throughput."""
+    succeeded = [r for r in results if r.ok]
+    durations = [r.duration_seconds for r in results]
+    minutes = wall_time_seconds / 60 if wall_time_seconds > 0 else 0
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "concurrency": concurrency,
+        "total": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "wall_time_seconds": round(wall_time_seconds, 2),
+        "avg_run_seconds": round(sum(durations) / len(durations), 2) if durations else 0.0,
+        "max_run_seconds": round(max(durations), 2) if durations else 0.0,
+        "throughput_posts_per_minute": round(len(succeeded) / minutes, 2) if minutes else 0.0,
+        "llm_cache_saved_calls": sum(r.llm_cache.get("saved_calls", 0) for r in results),
+        "llm_cache_saved_seconds": round(sum(r.llm_cache.get("saved_seconds", 0.0) for r in results), 2),
+        "reused_results": sum(1 for r in results if r.from_cache),
+        "items": [
+            {
+                "topic": r.topic,
+                "tone": r.tone,
+                "status": "success" if r.ok else "failed",
+                "duration_seconds": round(r.duration_seconds, 2),
+                "slug": r.metadata.get("slug") if r.ok else None,
+                "error": r.error,
+                "run_id": r.run_id if not r.ok else None,
+                "llm_cache": r.llm_cache,
+                "reused": r.from_cache,
+                "stage_seconds": r.timing.get("stages", {}),
+            }
+            for r in results
+        ],
+    }
+
+
+def print_batch_summary(report: dict):
+    print("\n--- Batch Summary ---")
+    print(f"   Items: {report['total']}  ✅ Succeeded: {report['succeeded']}  ❌ Failed: {report['failed']}")
+    print(f"   Concurrency: {report['concurrency']}")
+    print(f"   Wall time: {report['wall_time_seconds']}s  (avg per post: {report['avg_run_seconds']}s, slowest: {report['max_run_seconds']}s)")
+    print(f"   Throughput: {report['throughput_posts_per_minute']} posts/minute")
+    if report["llm_cache_saved_calls"]:
+        print(f"   LLM cache: {report['llm_cache_saved_calls']} calls saved (~{report['llm_cache_saved_seconds']}s)")
+    if report["reused_results"]:
+        print(f"   Reused results: {report['reused_results']} posts served from the result cache")
+    for item in report["items"]:
+        if item["status"] != "success":
+            print(f"   ❌ '{item['topic']}': {item['error']}" + (f" (resume: --resume {item['run_id']})" if item.get("run_id") else ""))
+    print("---------------------")
@@ -0,0 +1,145 @@
+# src/blog_writer/cache.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_DIR = Path(os.getenv("BLOG_CACHE_DIR", Path().cwd() / ".cache"))
+CACHE_DB_PATH = CACHE_DIR / "cache.sqlite3"
+
+
+def normalize_query(query: str) -> str:
+    """Lowercases a query and collapses whitespace so trivially different topics share a cache entry."""
+    return re.sub(r'\s+', ' ', (query or "").strip().lower())
+
+
+def make_cache_key(*parts: Any, **params: Any) -> str:
+    """Builds a stable hash from positional parts and keyword parameters (order-independent)."""
+    payload = json.dumps({"parts": parts, "params": params}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TTLCache:
+    """
+    SQLite-backed key/value cache with a per-namespace TTL and LRU eviction.
+
+    Entries older than `ttl_seconds` are treated as misses. Once a namespace holds
+    more than `max_entries` rows, the least recently accessed ones are evicted.
+    The connection is opened lazily and shared across threads behind a lock, so one
+    instance can serve concurrent crew runs.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: float, max_entries: int = 1000, db_path: Optional[Path] = None):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.db_path = Path(db_path) if db_path else CACHE_DB_PATH
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache_entries (namespace, accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Returns the cached value for `key`, or `default` on a miss, expiry or when disabled."""
+        if not self.enabled:
+            return default
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                if row is None or now - row[1] > self.ttl_seconds:
+                    if row is not None:
+                        conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+                        conn.commit()
+                    self.misses += 1
+                    return default
+                conn.execute(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key),
+                )
+                conn.commit()
+                self.hits += 1
+            return json.loads(row[0])
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            print(f"Warning: Cache read failed for '{self.namespace}': {e}")
+            return default
+
+    def set(self, key: str, value: Any):
+        """Stores a JSON-serializable value and evicts the least recently used entries beyond `max_entries`."""
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, payload, now, now),
+                )
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                    " SELECT key FROM cache_entries WHERE namespace = ?"
+                    " ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.namespace, self.max_entries),
+                )
+                conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Warning: Cache write failed for '{self.namespace}': {e}")
+
+    def clear(self) -> int:
+        """Deletes every entry in this namespace and returns how many were removed."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                deleted = conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,)).rowcount
+                conn.commit()
+            return deleted
+        except sqlite3.Error as e:
+            print(f"Warning: Could not clear cache '{self.namespace}': {e}")
+            return 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process."""
+        total = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,133 @@
+# src/blog_writer/chat_history.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Union
+from dotenv import load_dotenv
+from .cache import CACHE_DIR
+
+load_dotenv()
+
+CHAT_HISTORY_PATH = Path(os.getenv("CHAT_HISTORY_PATH") or CACHE_DIR / "chat_history.sqlite3")
+# Messages of chats not touched for this long (e.g. browser tabs closed without deleting the chat) are removed.
+CHAT_HISTORY_RETENTION_SECONDS = float(os.getenv("CHAT_HISTORY_RETENTION_SECONDS", 7 * 24 * 60 * 60))
+# Full posts kept in memory, across all chats and users of the process.
+CHAT_HISTORY_CACHE_POSTS = int(os.getenv("CHAT_HISTORY_CACHE_POSTS", "16"))
+# Messages shown per page of a chat; older ones are behind a "show earlier messages" button.
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "10"))
+
+_COLUMNS = ("id", "session_id", "role", "text", "metadata", "reused_from", "word_count", "created_at")
+
+
+class ChatHistory:
+    """
+    Chat messages of the Streamlit app in SQLite, so a user's session state only
+    holds chat names and pending job IDs.
+
+    A message is either text (the user's request, an error) or a generated post.
+    Listing a chat returns its messages without the posts' markdown, which is
+    loaded one post at a time with `markdown` through a small in-memory LRU
+    shared by every chat, so memory stays bounded however many posts a user
+    generates.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, cache_size: int = CHAT_HISTORY_CACHE_POSTS,
+                 retention_seconds: float = CHAT_HISTORY_RETENTION_SECONDS):
+        self.db_path = Path(db_path or CHAT_HISTORY_PATH)
+        self.cache_size = cache_size
+        self.retention_seconds = retention_seconds
+        self._markdown: "OrderedDict[int, str]" = OrderedDict()
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                " id INTEGER PRIMARY KEY, session_id TEXT NOT NULL, role TEXT NOT NULL, text TEXT,"
+                " markdown TEXT, metadata TEXT, reused_from REAL, word_count INTEGER, created_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id);"
+                "CREATE INDEX IF NOT EXISTS idx_messages_created ON messages (created_at);"
+            )
+            self._conn.execute(
+                "DELETE FROM messages WHERE session_id IN"
+                " (SELECT session_id FROM messages GROUP BY session_id HAVING MAX(created_at) < ?)",
+                (time.time() - self.retention_seconds,),
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _row_to_message(self, row) -> dict:
+        message = dict(zip(_COLUMNS, row))
+        message["metadata"] = json.loads(message["metadata"]) if message["metadata"] is not None else None
+        message["is_post"] = message["metadata"] is not None
+        return message
+
+    def add(self, session_id: str, role: str, content: Union[str, dict]) -> int:
+        """
+        Appends a message: a string, or a post as {"markdown", "metadata", "reused_from"}.
+        Returns its ID.
+        """
+        if isinstance(content, dict):
+            markdown = content.get("markdown") or ""
+            values = (None, markdown, json.dumps(content.get("metadata") or {}, ensure_ascii=False, default=str),
+                      content.get("reused_from"), len(markdown.split()))
+        else:
+            values = (str(content), None, None, None, None)
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "INSERT INTO messages (session_id, role, text, markdown, metadata, reused_from, word_count, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (session_id, role, *values, time.time()),
+            )
+            conn.commit()
+            return cursor.lastrowid
+
+    def count(self, session_id: str) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM messages WHERE session_id = ?", (session_id,)).fetchone()[0]
+
+    def recent(self, session_id: str, limit: int = CHAT_HISTORY_PAGE_SIZE) -> List[dict]:
+        """The last `limit` messages of a chat, oldest first, without the posts' markdown."""
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?", (session_id, limit)
+            ).fetchall()
+        return [self._row_to_message(row) for row in reversed(rows)]
+
+    def markdown(self, message_id: int) -> str:
+        """The markdown of a post message, from the LRU or the database."""
+        with self._lock:
+            markdown = self._markdown.get(message_id)
+            if markdown is not None:
+                self._markdown.move_to_end(message_id)
+                return markdown
+            row = self._connect().execute("SELECT markdown FROM messages WHERE id = ?", (message_id,)).fetchone()
+            markdown = row[0] if row and row[0] is not None else ""
+            self._markdown[message_id] = markdown
+            while len(self._markdown) > self.cache_size:
+                self._markdown.popitem(last=False)
+            return markdown
+
+    def delete_session(self, session_id: str):
+        with self._lock:
+            conn = self._connect()
+            ids = [row[0] for row in conn.execute("SELECT id FROM messages WHERE session_id = ?", (session_id,))]
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.commit()
+            for message_id in ids:
+                self._markdown.pop(message_id, None)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
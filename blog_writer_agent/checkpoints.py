@@ -0,0 +1,95 @@
+# src/blog_writer/checkpoints.py
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from .cache import CACHE_DIR
+from .utils import atomic_write_text
+
+load_dotenv()
+
+CHECKPOINT_DIR = Path(os.getenv("CHECKPOINT_DIR") or CACHE_DIR / "runs")
+CHECKPOINTS_ENABLED = os.getenv("CHECKPOINTS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+RUNNING, FAILED = "running", "failed"
+
+
+def _checkpoint_path(run_id: str) -> Path:
+    if not re.fullmatch(r"[\w-]+", run_id or ""):
+        raise ValueError(f"Invalid run ID: {run_id!r}")
+    return CHECKPOINT_DIR / f"{run_id}.json"
+
+
+@dataclass
+class RunCheckpoint:
+    """
+    The completed task outputs of one run, written to CHECKPOINT_DIR/<run_id>.json as
+    soon as each stage finishes. A run that fails or dies keeps its checkpoint, and
+    resuming it restores those outputs verbatim and runs only the missing stages.
+    Successful runs delete their checkpoint.
+    """
+    run_id: str
+    topic: str
+    tone: str
+    options: dict = field(default_factory=dict)
+    # Raw outputs keyed by task name (topic_analysis_task, research_task, writing_task, seo_optimization_task)
+    task_outputs: Dict[str, str] = field(default_factory=dict)
+    status: str = RUNNING
+    error: Optional[str] = None
+    resumed: int = 0
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def path(self) -> Path:
+        return _checkpoint_path(self.run_id)
+
+    def save(self):
+        self.updated_at = time.time()
+        try:
+            atomic_write_text(self.path, json.dumps(asdict(self), indent=2, ensure_ascii=False))
+        except OSError as e:
+            print(f"Warning: Could not write checkpoint for run {self.run_id}: {e}")
+
+    def record_task(self, task_name: str, raw_output: Optional[str]):
+        if raw_output:
+            self.task_outputs[task_name] = raw_output
+            self.save()
+
+    def fail(self, error: Optional[str]):
+        self.status, self.error = FAILED, error
+        self.save()
+
+    def delete(self):
+        try:
+            self.path.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"Warning: Could not delete checkpoint for run {self.run_id}: {e}")
+
+
+def load_checkpoint(run_id: str) -> Optional[RunCheckpoint]:
+    """The saved checkpoint of `run_id`, or None if there is none (or it is unreadable)."""
+    path = _checkpoint_path(run_id)
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not read checkpoint {path}: {e}")
+        return None
+    known = {f.name for f in fields(RunCheckpoint)}
+    return RunCheckpoint(**{key: value for key, value in data.items() if key in known})
+
+
+def list_checkpoints() -> List[RunCheckpoint]:
+    """Resumable runs, most recently updated first."""
+    checkpoints = []
+    for path in CHECKPOINT_DIR.glob("*.json") if CHECKPOINT_DIR.exists() else []:
+        checkpoint = load_checkpoint(path.stem)
+        if checkpoint is not None:
+            checkpoints.append(checkpoint)
+    return sorted(checkpoints, key=lambda checkpoint: checkpoint.updated_at, reverse=True)
@@ -0,0 +1,181 @@
+# src/blog_writer/context_budget.py
+import json
+import os
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+from .analytics import strip_markdown
+from .seo import parse_research_keywords
+from .telemetry import current_telemetry
+from .utils import strip_code_fences
+
+load_dotenv()
+
+CONTEXT_BUDGETS_ENABLED = os.getenv("CONTEXT_BUDGETS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Gemini and GPT tokenizers both average about four characters per token on English prose.
+CHARS_PER_TOKEN = 4
+# crewAI joins the outputs of a task's context tasks with this separator.
+CONTEXT_SEPARATOR = "\n\n----------\n\n"
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+(?=\S)')
+_BOLD_RE = re.compile(r'\*\*([^*\n]+?)\*\*|__([^_\n]+?)__')
+_BULLET_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+# A "sentence" without punctuation (e.g. a run-on list line) is cut after this many characters.
+LEAD_MAX_CHARS = 400
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """Approximate token count of `text` (CHARS_PER_TOKEN characters per token, rounded up)."""
+    return -(-len(text or "") // CHARS_PER_TOKEN)
+
+
+def _lead(text: str, sentences: int) -> str:
+    """The first `sentences` sentences of `text`, at most LEAD_MAX_CHARS long."""
+    lead = " ".join(_SENTENCE_RE.split(text.strip())[:sentences])
+    return lead if len(lead) <= LEAD_MAX_CHARS else lead[:LEAD_MAX_CHARS].rsplit(" ", 1)[0] + "…"
+
+
+def _headline(item: str) -> str:
+    """The bold title of a news bullet ('**Title (Date):** summary'), else its first sentence."""
+    bold = _BOLD_RE.match(item)
+    return (bold.group(1) or bold.group(2)).rstrip(":") if bold else _lead(item, 1)
+
+
+def compact_research(report: str, sentences: Optional[int] = 2, max_items: Optional[int] = None) -> str:
+    """
+    The research report with each news item cut to its first `sentences` sentences
+    (or to its headline when `sentences` is None), at most `max_items` items per
+    section, and the keyword bullets folded into one comma-separated line.
+    """
+    keywords = parse_research_keywords(report)
+    lines = []
+    in_keywords = False
+    items = 0
+    for line in (report or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            in_keywords = bool(keywords) and "keyword" in line.lower()
+            lines.append(line)
+            if in_keywords:
+                lines.append(", ".join(keywords))
+            items = 0
+            continue
+        if in_keywords:
+            continue
+        items += 1
+        if max_items is not None and items > max_items:
+            continue
+        bullet = _BULLET_RE.match(line)
+        text = line[bullet.end():] if bullet else line
+        lines.append(("- " if bullet else "") + (_headline(text) if sentences is None else _lead(text, sentences)))
+    return "\n".join(lines)
+
+
+def research_keywords_only(report: str) -> str:
+    keywords = parse_research_keywords(report)
+    return f"### Relevant Keywords\n{', '.join(keywords)}" if keywords else compact_research(report, None, 3)
+
+
+def outline_post(post: str, sentences: int = 2, key_passages: bool = True) -> str:
+    """
+    The skeleton of a Markdown post: every heading, the first `sentences` sentences
+    of each section's opening paragraph (0 for headings only) and, with
+    `key_passages`, the bold phrases of each section.
+    """
+    lines, bold = [], []
+    needs_lead = True
+
+    def flush_bold():
+        if bold:
+            lines.append(f"Key points: {'; '.join(dict.fromkeys(bold))}")
+            bold.clear()
+
+    for block in re.split(r'\n\s*\n', strip_code_fences(post or "")):
+        block = block.strip()
+        if block.startswith("#"):
+            flush_bold()
+            heading, _, block = block.partition("\n")
+            lines.append(heading.strip())
+            needs_lead = True
+            block = block.strip()
+        if not block or block.startswith("```"):
+            continue
+        if key_passages:
+            bold.extend((match.group(1) or match.group(2)).strip() for match in _BOLD_RE.finditer(block))
+        if needs_lead and sentences and not block.startswith(("|", "!")):
+            lead = _lead(re.sub(r'\s+', ' ', strip_markdown(block)), sentences)
+            if lead:
+                lines.append(lead)
+                needs_lead = False
+    flush_bold()
+    return "\n".join(lines)
+
+
+def _minified_json(raw: str) -> str:
+    try:
+        return json.dumps(json.loads(strip_code_fences(raw)), ensure_ascii=False, separators=(",", ":"))
+    except (json.JSONDecodeError, TypeError):
+        return raw
+
+
+# Progressively smaller renderings of each task's output, tried in order until the context fits.
+COMPACTORS: Dict[str, Tuple[Callable[[str], str], ...]] = {
+    "topic_analysis_task": (_minified_json,),
+    "research_task": (
+        compact_research,
+        lambda report: compact_research(report, sentences=None, max_items=3),
+        research_keywords_only,
+    ),
+    "writing_task": (
+        outline_post,
+        lambda post: outline_post(post, sentences=1, key_passages=False),
+        lambda post: outline_post(post, sentences=0, key_passages=False),
+    ),
+}
+
+
+def _truncate_tokens(text: str, budget: int) -> str:
+    """Cuts `text` at a line (else word) boundary to at most `budget` tokens."""
+    max_chars = budget * CHARS_PER_TOKEN - 1
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundary = cut.rfind("\n")
+    if boundary < max_chars // 2:
+        boundary = cut.rfind(" ")
+    return cut[:boundary if boundary > 0 else max_chars].rstrip() + "…"
+
+
+def compact_context(task_name: str, sources: Sequence[Tuple[str, str]], budget: Optional[int]) -> str:
+    """
+    The context of `task_name`, built from the (task name, raw output) pairs of its
+    context tasks, joined as crewAI joins them and compacted to at most `budget`
+    tokens. Each step renders every source one level smaller (see COMPACTORS), and
+    text that still does not fit is cut. Compaction is recorded on the run's telemetry.
+    """
+    full = CONTEXT_SEPARATOR.join(raw for _, raw in sources)
+    tokens_before = count_tokens(full)
+    if not budget or tokens_before <= budget:
+        return full
+    renderings: List[List[str]] = [[raw] for _, raw in sources]
+    text, level = full, 0
+    depth = max(len(COMPACTORS.get(name, ())) for name, _ in sources)
+    while level < depth and count_tokens(text) > budget:
+        level += 1
+        for (name, raw), rendered in zip(sources, renderings):
+            compactors = COMPACTORS.get(name, ())
+            if level <= len(compactors):
+                rendered.append(compactors[level - 1](raw))
+        text = CONTEXT_SEPARATOR.join(rendered[-1] for rendered in renderings)
+    text = _truncate_tokens(text, budget)
+    tokens_after = count_tokens(text)
+    print(f"🗜️ Compacted {task_name} context from ~{tokens_before} to ~{tokens_after} tokens (budget {budget})")
+    telemetry = current_telemetry()
+    if telemetry is not None:
+        telemetry.emit(
+            "context_compacted", stage=telemetry.current_stage, task=task_name, budget=budget,
+            level=level, tokens_before=tokens_before, tokens_after=tokens_after,
+        )
+    return text
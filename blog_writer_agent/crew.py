@@ -1,103 +1,295 @@
 # src/blog_writer/crew.py
 import os
 import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import yaml
 from crewai import Agent, Task, Crew, Process
-from crewai.project import CrewBase, agent, task, crew
-from crewai import LLM
+from crewai.tasks.task_output import TaskOutput
+from pydantic import Field
+from .context_budget import CONTEXT_BUDGETS_ENABLED, compact_context
+from .llm import CachedLLM
 from .tools import search_news, find_keywords 
-from .utils import calculate_reading_time, calculate_readability_score
+from .research import PREFETCH_UNAVAILABLE
+from .seo import generate_local_seo_metadata
+from .analytics import analyze
+from .utils import CONFIG_DIR, LLM_MODEL, strip_code_fences
 from dotenv import load_dotenv
 
 load_dotenv()
 
-llm = LLM(
-    model="gemini/gemini-2.0-flash",
-    api_key=os.getenv("GOOGLE_API_KEY"),
-    temperature=0.7
-)
+
+# Inputs the task templates use beyond topic and tone, for callers that only pass those two.
+DEFAULT_INPUTS = {"prefetched_research": PREFETCH_UNAVAILABLE}
+
+# Settings of an agent's `llm:` block in agents.yaml, and their defaults.
+LLM_SETTINGS = {"model": LLM_MODEL, "temperature": 0.7, "max_tokens": None, "timeout": None, "fallback_model": None, "fallback_timeout": None}
+
+
+def build_llm(model: str = LLM_MODEL, temperature: float = 0.7, max_tokens: Optional[int] = None, timeout: Optional[float] = None,
+              fallback_model: Optional[str] = None, fallback_timeout: Optional[float] = None) -> CachedLLM:
+    """
+    An LLM for the crew (by default the Gemini model agents without an `llm:` block use).
+    With `fallback_model`, a call that takes longer than `timeout` seconds is retried on it.
+    """
+    fallback = build_llm(fallback_model, temperature, max_tokens, fallback_timeout) if fallback_model else None
+    return CachedLLM(
+        model=model,
+        # Other providers' keys are picked up by litellm from their usual environment variables.
+        api_key=os.getenv("GOOGLE_API_KEY") if model.startswith("gemini/") else None,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        timeout=timeout,
+        fallback=fallback,
+    )
+
+
+def build_agent_llms(agents_config: Mapping[str, Mapping[str, Any]]) -> Dict[str, CachedLLM]:
+    """The LLM of every agent with an `llm:` block. Agents with identical settings share one instance."""
+    built, agent_llms = {}, {}
+    for name, config in agents_config.items():
+        settings = config.get("llm")
+        if not settings:
+            continue
+        unknown = set(settings) - set(LLM_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown llm setting(s) for agent '{name}': {', '.join(sorted(unknown))}")
+        key = tuple(sorted({**LLM_SETTINGS, **settings}.items()))
+        if key not in built:
+            built[key] = build_llm(**dict(key))
+        agent_llms[name] = built[key]
+    return agent_llms
+
+
+# Tools are stateless, so every run's agents and tasks share the same instances.
+AGENT_TOOLS = {"researcher": (search_news, find_keywords)}
+TASK_TOOLS = {"research_task": (search_news, find_keywords)}
+
+
+def _freeze(value):
+    """Recursively turns parsed YAML into read-only mappings and tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Mutable copy of a frozen config, as handed to a new Agent or Task."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _load_yaml(path: Path) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+# --- Crew Template ---
+@dataclass(frozen=True)
+class CrewTemplate:
+    """
+    The agent and task definitions parsed once from agents.yaml/tasks.yaml, plus the
+    LLMs and tools. Read-only, so any number of runs (and threads) can build their
+    own BlogWriterCrew from the same template.
+
+    Agents with an `llm:` block get the model it routes them to (`agent_llms`);
+    the others use the default `llm`. Tasks with a `context_budget` (tokens) get
+    their context compacted to it (`context_budgets`).
+    """
+    agents_config: Mapping[str, Mapping[str, Any]]
+    tasks_config: Mapping[str, Mapping[str, Any]]
+    llm: Any
+    agent_llms: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    agent_tools: Mapping[str, Tuple[Any, ...]] = field(default_factory=lambda: MappingProxyType(dict(AGENT_TOOLS)))
+    task_tools: Mapping[str, Tuple[Any, ...]] = field(default_factory=lambda: MappingProxyType(dict(TASK_TOOLS)))
+
+    @classmethod
+    def from_yaml(cls, config_dir: Path = CONFIG_DIR, llm: Any = None) -> "CrewTemplate":
+        """Parses the YAML configs. An explicit `llm` is used by every agent, ignoring their `llm:` blocks."""
+        agents_config = _freeze(_load_yaml(Path(config_dir) / "agents.yaml"))
+        return cls(
+            agents_config=agents_config,
+            tasks_config=_freeze(_load_yaml(Path(config_dir) / "tasks.yaml")),
+            llm=llm or build_llm(),
+            agent_llms=MappingProxyType({} if llm else build_agent_llms(agents_config)),
+        )
+
+    def agent_config(self, name: str) -> dict:
+        """The agent's YAML fields; its `llm:` block is resolved into agent_llms."""
+        config = _thaw(self.agents_config[name])
+        config.pop("llm", None)
+        return config
+
+    def task_config(self, name: str) -> dict:
+        """The task's YAML fields; `agent` and `context` names are resolved by the crew."""
+        config = _thaw(self.tasks_config[name])
+        config.pop("agent", None)
+        config.pop("context", None)
+        config.pop("context_budget", None)
+        return config
+
+    @property
+    def context_budgets(self) -> Dict[str, int]:
+        """The `context_budget` of every task that sets one, keyed by task name."""
+        return {name: int(config["context_budget"]) for name, config in self.tasks_config.items() if config.get("context_budget")}
+
+
+_default_template: Optional[CrewTemplate] = None
+_template_lock = threading.Lock()
+
+
+def get_crew_template() -> CrewTemplate:
+    """The process-wide template, parsed from the YAML files on first use."""
+    global _default_template
+    if _default_template is None:
+        with _template_lock:
+            if _default_template is None:
+                _default_template = CrewTemplate.from_yaml()
+    return _default_template
+
+
+class BudgetedCrew(Crew):
+    """
+    A Crew that hands each task with a budget its context compacted to that many
+    tokens. Inputs missing from `kickoff` fall back to DEFAULT_INPUTS.
+    """
+    context_budgets: Dict[str, int] = Field(default_factory=dict)
+
+    def _interpolate_inputs(self, inputs: Dict[str, Any]) -> None:
+        super()._interpolate_inputs({**DEFAULT_INPUTS, **inputs})
+
+    def _get_context(self, task: Task, task_outputs: List[TaskOutput]):
+        budget = self.context_budgets.get(task.name)
+        if not budget or not task.context:
+            return super()._get_context(task, task_outputs)
+        sources = [(context_task.name, context_task.output.raw) for context_task in task.context if context_task.output is not None]
+        return compact_context(task.name, sources, budget)
+
 
 # --- Crew Definition ---
-@CrewBase
 class BlogWriterCrew:
-    """BlogWriterCrew orchestrates agents and tasks for autonomous blog generation."""
+    """
+    BlogWriterCrew orchestrates agents and tasks for autonomous blog generation.
 
-    agents_config = 'config/agents.yaml'
-    tasks_config = 'config/tasks.yaml'
+    Each instance holds its own Agent and Task objects (built lazily from the shared
+    CrewTemplate), so task outputs of concurrent runs never overwrite each other.
+    """
 
-    def __init__(self):
-        """Initialize the crew with the LLM."""
-        self.llm = llm
+    def __init__(self, template: Optional[CrewTemplate] = None):
+        """Initialize the crew from a pre-parsed template (the default one if not given)."""
+        self.template = template or get_crew_template()
+        self.llm = self.template.llm
+        self._agents: Dict[str, Agent] = {}
+        self._tasks: Dict[str, Task] = {}
+
+    @property
+    def agents_config(self) -> Mapping[str, Mapping[str, Any]]:
+        return self.template.agents_config
+
+    @property
+    def tasks_config(self) -> Mapping[str, Mapping[str, Any]]:
+        return self.template.tasks_config
+
+    def agent_llm(self, name: str) -> Any:
+        """The LLM the agent `name` is routed to."""
+        return self.template.agent_llms.get(name, self.llm)
+
+    def context_budget(self, name: str) -> Optional[int]:
+        """The task's context budget in tokens, or None if its context is passed in full."""
+        return self.template.context_budgets.get(name) if CONTEXT_BUDGETS_ENABLED else None
+
+    def context_budgets(self) -> Dict[str, int]:
+        return dict(self.template.context_budgets) if CONTEXT_BUDGETS_ENABLED else {}
+
+    def _agent(self, name: str, **overrides) -> Agent:
+        if name not in self._agents:
+            self._agents[name] = Agent(
+                config=self.template.agent_config(name),
+                tools=list(self.template.agent_tools.get(name, ())),
+                llm=self.agent_llm(name),
+                **overrides,
+            )
+        return self._agents[name]
+
+    def _task(self, name: str) -> Task:
+        if name not in self._tasks:
+            task_info = self.template.tasks_config[name]
+            context = [self._task(context_name) for context_name in task_info.get("context", ())]
+            self._tasks[name] = Task(
+                config=self.template.task_config(name),
+                name=name,
+                agent=getattr(self, task_info["agent"])(),
+                tools=list(self.template.task_tools.get(name, ())),
+                **({"context": context} if context else {}),
+            )
+        return self._tasks[name]
 
     # --- Agent Definitions ---
-    @agent
     def topic_analyzer(self) -> Agent:
-        return Agent(
-            config=self.agents_config['topic_analyzer'],
-            llm=self.llm,
-        )
+        return self._agent("topic_analyzer")
 
-    @agent
     def researcher(self) -> Agent:
-        return Agent(
-            config=self.agents_config['researcher'],
-            tools=[search_news, find_keywords],
-            llm=self.llm,
-        )
+        return self._agent("researcher")
 
-    @agent
     def writer(self) -> Agent:
-        return Agent(
-            config=self.agents_config['writer'],
-            llm=self.llm,
-            allow_delegation=False,
-            verbose=True
-        )
+        return self._agent("writer", allow_delegation=False, verbose=True)
 
-    @agent
     def seo_optimizer(self) -> Agent:
-        return Agent(
-            config=self.agents_config['seo_optimizer'],
-            llm=self.llm,
-        )
+        return self._agent("seo_optimizer")
 
     # --- Task Definitions ---
-    @task
     def topic_analysis_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['topic_analysis_task'],
-        )
+        return self._task("topic_analysis_task")
 
-    @task
     def research_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['research_task'],
-            tools=[search_news, find_keywords],
-        )
+        return self._task("research_task")
 
-    @task
     def writing_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['writing_task'],
-        )
+        return self._task("writing_task")
 
-    @task
     def seo_optimization_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['seo_optimization_task'],
-        )
+        return self._task("seo_optimization_task")
 
     # --- Crew Assembly ---
-    @crew
     def crew(self) -> Crew:
         """Creates and configures the sequential blog writing crew."""
-        return Crew(
+        return BudgetedCrew(
             agents=self.get_agents(),
             tasks=self.get_tasks(),  
             process=Process.sequential,
             verbose=True,
+            context_budgets=self.context_budgets(),
             # full_output=True # May provide more detailed output object
         )
 
+    def stage_crew(self, *tasks: Task) -> Crew:
+        """
+        Creates a sequential crew for a subset of the tasks (one pipeline stage).
+
+        Tasks keep their `context` links, so a stage reads the outputs of tasks that
+        already ran in an earlier stage of the same BlogWriterCrew instance
+        (compacted to the task's context budget).
+        """
+        agents = []
+        for stage_task in tasks:
+            if all(stage_task.agent is not existing for existing in agents):
+                agents.append(stage_task.agent)
+        return BudgetedCrew(
+            agents=agents,
+            tasks=list(tasks),
+            process=Process.sequential,
+            verbose=True,
+            context_budgets=self.context_budgets(),
+        )
+
     # Helper methods to instantiate agents and tasks
     def get_agents(self):
         """Returns a list of agent instances for the crew."""
@@ -117,8 +309,28 @@ class BlogWriterCrew:
             self.seo_optimization_task(),
         ]
 
+    def task_outputs(self) -> Dict[str, str]:
+        """Raw output of every task that has run on this instance, keyed by task name."""
+        outputs = {}
+        for name, crew_task in self._tasks.items():
+            if crew_task.output is not None:
+                outputs[name] = crew_task.output.raw if hasattr(crew_task.output, 'raw') else str(crew_task.output)
+        return outputs
+
+def set_task_output(task: Task, raw_output: str):
+    """
+    Records an output produced outside the crew (e.g. by section drafting) on a task,
+    so downstream tasks that list it as `context` receive it like a normal task output.
+    """
+    task.output = TaskOutput(
+        description=task.description,
+        expected_output=task.expected_output,
+        raw=raw_output,
+        agent=task.agent.role if task.agent else "",
+    )
+
 # --- Post-Processing Logic (typically called from main script) ---
-def process_crew_output(crew_result, writing_task_output):
+def process_crew_output(crew_result, writing_task_output, fast_seo=False, topic=None, keywords=None):
     """
     Processes the raw output from the crew, calculates final metrics,
     and returns structured blog content and metadata.
@@ -126,6 +338,8 @@ def process_crew_output(crew_result, writing_task_output):
     Args:
         crew_result: The result obtained from crew.kickoff(). This is typically the output of the last task in a sequential process.
         writing_task_output: The raw markdown output from the writing task.
+        fast_seo: If True, `crew_result` is ignored and the SEO fields are computed locally
+            from the blog content, `topic` and the researched `keywords` (same output schema).
 
     Returns:
         Tuple: (blog_content: str, metadata: dict) or (None, None) on error.
@@ -134,51 +348,42 @@ def process_crew_output(crew_result, writing_task_output):
         print("❌ Error: Writing task output (blog content) is missing.")
         return None, None
     
-    if writing_task_output.startswith("```markdown"):
-        writing_task_output = writing_task_output[11:-3].strip()
-    elif writing_task_output.startswith("```"):
-        writing_task_output = writing_task_output[3:-3].strip()
+    writing_task_output = strip_code_fences(writing_task_output)
 
     seo_metadata = {}
 
-    if not crew_result or not isinstance(crew_result, str):
-        # Adjusted error message based on the change above
-        print(f"❌ Error: Raw SEO task output is missing or not a string. Found: {type(crew_result)}")
-        return writing_task_output, {"error": "Missing or invalid raw SEO metadata from crew."}
-
-
-
-    # Parse the JSON string from the SEO task output
-    try:
-        if crew_result.startswith("```json"):
-            crew_result = crew_result[7:-3].strip()
-        elif crew_result.startswith("```"):
-            crew_result = crew_result[3:-3].strip()
-
-        seo_metadata = json.loads(crew_result)
-
-        # Validate required keys
-        required_keys = ["title", "meta_description", "tags", "slug"]
-        if not all(key in seo_metadata for key in required_keys):
-            print(f"Warning: SEO metadata missing required keys. Found: {seo_metadata.keys()}")
-
-    except json.JSONDecodeError as e:
-        print(f"❌ Error parsing SEO metadata JSON: {e}")
-        print(f"Raw SEO output was: {crew_result}")
-        return writing_task_output, {"error": "Failed to parse SEO JSON", "raw_output": crew_result}
-    except Exception as e:
-        print(f"❌ Unexpected error processing SEO metadata: {e}")
-        return writing_task_output, {"error": str(e), "raw_output": crew_result}
-
-
-    # Calculate final metrics using the blog content
+    if fast_seo:
+        # Local fast path: no SEO LLM call and no JSON parsing
+        seo_metadata = generate_local_seo_metadata(writing_task_output, topic or "", keywords)
+    else:
+        if not crew_result or not isinstance(crew_result, str):
+            # Adjusted error message based on the change above
+            print(f"❌ Error: Raw SEO task output is missing or not a string. Found: {type(crew_result)}")
+            return writing_task_output, {"error": "Missing or invalid raw SEO metadata from crew."}
+
+        # Parse the JSON string from the SEO task output
+        try:
+            crew_result = strip_code_fences(crew_result)
+            seo_metadata = json.loads(crew_result)
+
+            # Validate required keys
+            required_keys = ["title", "meta_description", "tags", "slug"]
+            if not all(key in seo_metadata for key in required_keys):
+                print(f"Warning: SEO metadata missing required keys. Found: {seo_metadata.keys()}")
+
+        except json.JSONDecodeError as e:
+            print(f"❌ Error parsing SEO metadata JSON: {e}")
+            print(f"Raw SEO output was: {crew_result}")
+            return writing_task_output, {"error": "Failed to parse SEO JSON", "raw_output": crew_result}
+        except Exception as e:
+            print(f"❌ Unexpected error processing SEO metadata: {e}")
+            return writing_task_output, {"error": str(e), "raw_output": crew_result}
+
+
+    # Calculate final metrics using the blog content (one pass; density is measured for the SEO tags)
     try:
-        reading_time = calculate_reading_time(writing_task_output)
-        readability_score = calculate_readability_score(writing_task_output)
-
-        # Add calculated metrics to the metadata dictionary
-        seo_metadata['estimated_reading_time_minutes'] = reading_time
-        seo_metadata['flesch_reading_ease_score'] = readability_score
+        tags = seo_metadata.get('tags')
+        seo_metadata.update(analyze(writing_task_output, keywords=tags if isinstance(tags, list) else None).as_metadata())
     except Exception as e:
         print(f"Warning: Failed to calculate reading time/readability score. Error: {e}")
         seo_metadata['estimated_reading_time_minutes'] = "N/A"
@@ -0,0 +1,163 @@
+# src/blog_writer/job_queue.py
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+from dotenv import load_dotenv
+from .cache import CACHE_DIR
+
+load_dotenv()
+
+JOB_QUEUE_PATH = Path(os.getenv("JOB_QUEUE_PATH") or CACHE_DIR / "jobs.sqlite3")
+# Finished jobs (and their results) are kept this long for polling.
+JOB_QUEUE_RETENTION_SECONDS = float(os.getenv("JOB_QUEUE_RETENTION_SECONDS", 7 * 24 * 60 * 60))
+# A job interrupted this many times (e.g. the process died while running it) is failed instead of retried.
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_COLUMNS = ("id", "topic", "tone", "options", "status", "attempts", "error", "result", "submitted_at", "started_at", "finished_at")
+
+
+class JobQueue:
+    """
+    Durable FIFO of blog generation jobs in SQLite, shared by the service's workers.
+
+    A job is claimed by switching it from queued to running in one transaction,
+    so no two workers take the same job. Jobs still marked running when the queue
+    is reopened were interrupted by a restart: `requeue_interrupted` puts them
+    back in the queue (their checkpoint lets the pipeline resume where they
+    stopped). Finished jobs keep their result until JOB_QUEUE_RETENTION_SECONDS.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, retention_seconds: float = JOB_QUEUE_RETENTION_SECONDS, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.db_path = Path(db_path or JOB_QUEUE_PATH)
+        self.retention_seconds = retention_seconds
+        self.max_attempts = max_attempts
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, topic TEXT NOT NULL, tone TEXT NOT NULL, options TEXT NOT NULL,"
+                " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, error TEXT, result TEXT,"
+                " submitted_at REAL NOT NULL, started_at REAL, finished_at REAL);"
+                "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, submitted_at);"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _row_to_job(self, row) -> dict:
+        job = dict(zip(_COLUMNS, row))
+        job["options"] = json.loads(job["options"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def enqueue(self, topic: str, tone: str, options: Optional[dict] = None) -> dict:
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO jobs (id, topic, tone, options, status, submitted_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, topic, tone, json.dumps(options or {}), QUEUED, time.time()),
+            )
+            conn.commit()
+            return self._get_locked(conn, job_id)
+
+    def claim_next(self) -> Optional[dict]:
+        """Marks the oldest queued job as running and returns it, or returns None if the queue is empty."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT id FROM jobs WHERE status = ? ORDER BY submitted_at, rowid LIMIT 1", (QUEUED,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ? WHERE id = ?",
+                (RUNNING, time.time(), row[0]),
+            )
+            conn.commit()
+            return self._get_locked(conn, row[0])
+
+    def finish(self, job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result, ensure_ascii=False, default=str) if result is not None else None, error, time.time(), job_id),
+            )
+            conn.execute("DELETE FROM jobs WHERE finished_at < ?", (time.time() - self.retention_seconds,))
+            conn.commit()
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a job that has not started yet. Returns False if it is running, finished or unknown."""
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, "Cancelled before it started.", time.time(), job_id, QUEUED),
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+
+    def requeue_interrupted(self) -> int:
+        """
+        Puts jobs left running by a previous process back in the queue, keeping their
+        place, and fails those already interrupted `max_attempts` times. Returns the number requeued.
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status = ? AND attempts >= ?",
+                (FAILED, f"Interrupted {self.max_attempts} times; giving up.", time.time(), RUNNING, self.max_attempts),
+            )
+            count = conn.execute("UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING)).rowcount
+            conn.commit()
+            return count
+
+    def _get_locked(self, conn: sqlite3.Connection, job_id: str) -> Optional[dict]:
+        row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._get_locked(self._connect(), job_id)
+
+    def find(self, status: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[dict]:
+        """Jobs (without their results), most recently submitted first."""
+        columns = ", ".join("NULL" if column == "result" else column for column in _COLUMNS)
+        where, params = (" WHERE status = ?", [status]) if status else ("", [])
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {columns} FROM jobs{where} ORDER BY submitted_at DESC, rowid DESC LIMIT ? OFFSET ?", (*params, limit, offset)
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def queue_position(self, job_id: str) -> int:
+        """1-based position among queued jobs (0 if the job is not queued)."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT COUNT(*) FROM jobs AS other, jobs AS job WHERE job.id = ? AND job.status = ? AND other.status = ?"
+                " AND (other.submitted_at < job.submitted_at OR (other.submitted_at = job.submitted_at AND other.rowid <= job.rowid))",
+                (job_id, QUEUED, QUEUED),
+            ).fetchone()
+        return row[0]
+
+    def counts(self) -> dict:
+        with self._lock:
+            return dict(self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
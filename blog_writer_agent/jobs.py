@@ -0,0 +1,145 @@
+# src/blog_writer/jobs.py
+import asyncio
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+from dotenv import load_dotenv
+from .pipeline import BlogRunResult, PipelineOptions, generate_blog, warm_up
+from .streaming import WriterStream
+from .telemetry import RunTelemetry
+from .tools import aclose_async_client
+
+load_dotenv()
+
+# Generations that may run at the same time across all sessions/users of the process.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Finished jobs kept for polling before the oldest are dropped.
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", "200"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+@dataclass
+class Job:
+    """A blog generation submitted to a JobRunner. Updated in place by the worker thread."""
+    id: str
+    topic: str
+    tone: str
+    options: PipelineOptions
+    session_id: Optional[str] = None
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[BlogRunResult] = None
+    error: Optional[str] = None
+    # Live writer output and stage progress, safe to poll from the UI thread
+    stream: WriterStream = field(default_factory=WriterStream)
+    telemetry: RunTelemetry = field(default_factory=RunTelemetry)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobRunner:
+    """
+    Runs blog generations on a bounded pool of worker threads, each with its own
+    event loop, so callers (e.g. the Streamlit script thread) never block on a crew
+    kickoff. Jobs are looked up by ID or by the chat session they belong to and
+    polled for status; at most `max_workers` run at once and the rest wait in order.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, retention: int = JOB_RETENTION):
+        self.max_workers = max(1, max_workers)
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="blog-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._futures: dict = {}
+        self._lock = threading.Lock()
+        # Load crewai and friends on a worker so the first job does not pay for the imports
+        self._executor.submit(warm_up)
+
+    def submit(self, topic: str, tone: str, options: Optional[PipelineOptions] = None, session_id: Optional[str] = None) -> Job:
+        job = Job(id=uuid.uuid4().hex[:12], topic=topic, tone=tone, options=options or PipelineOptions(), session_id=session_id)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._futures[job.id] = self._executor.submit(self._run, job)
+        print(f"🧵 Queued job {job.id} for '{topic}' (session: {session_id})")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs_for_session(self, session_id: str) -> List[Job]:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.session_id == session_id]
+
+    def queue_position(self, job_id: str) -> int:
+        """1-based position among queued jobs (0 if the job is running or finished)."""
+        with self._lock:
+            queued = [job.id for job in self._jobs.values() if job.status == QUEUED]
+        return queued.index(job_id) + 1 if job_id in queued else 0
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a job that has not started yet. Running crews cannot be interrupted."""
+        with self._lock:
+            future: Optional[Future] = self._futures.get(job_id)
+            job = self._jobs.get(job_id)
+        if future is None or job is None or not future.cancel():
+            return False
+        job.status, job.error, job.finished_at = FAILED, "Cancelled before it started.", time.time()
+        return True
+
+    def forget(self, job_id: str):
+        """Drops a finished job once its result has been collected."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished:
+                del self._jobs[job_id]
+                self._futures.pop(job_id, None)
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job: Job):
+        job.status, job.started_at = RUNNING, time.time()
+        try:
+            job.result = asyncio.run(self._generate(job))
+            job.error = job.result.error
+            job.status = DONE if job.result.ok else FAILED
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+            traceback.print_exc()
+        finally:
+            job.finished_at = time.time()
+            print(f"🧵 Job {job.id} {job.status} in {job.elapsed_seconds:.1f}s")
+            self._prune()
+
+    async def _generate(self, job: Job) -> BlogRunResult:
+        try:
+            return await generate_blog(job.topic, job.tone, job.options, stream=job.stream, telemetry=job.telemetry)
+        finally:
+            # The pooled async client belongs to this job's event loop
+            await aclose_async_client()
+
+    def _prune(self):
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+            for job_id in finished[:max(0, len(finished) - self.retention)]:
+                del self._jobs[job_id]
+                self._futures.pop(job_id, None)
@@ -0,0 +1,258 @@
+# src/blog_writer/llm.py
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+import httpx
+import litellm
+from crewai import LLM
+from crewai.utilities.events.llm_events import LLMCallType
+from dotenv import load_dotenv
+from .cache import TTLCache, make_cache_key
+from .ratelimit import get_limiter
+from .streaming import get_active_stream
+from .telemetry import current_telemetry
+
+load_dotenv()
+
+# "auto" caches only deterministic (temperature 0) calls; "true"/"false" force it on/off.
+LLM_CACHE = os.getenv("LLM_CACHE", "auto").lower()
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", 30 * 24 * 60 * 60))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+completion_cache = TTLCache("llm", ttl_seconds=LLM_CACHE_TTL_SECONDS, max_entries=LLM_CACHE_MAX_ENTRIES)
+_cache_override: Optional[bool] = None
+
+
+@dataclass
+class LLMCacheStats:
+    """Completion cache counters for one run (or the whole process)."""
+    hits: int = 0
+    misses: int = 0
+    saved_seconds: float = 0.0
+    llm_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_hit(self, saved_seconds: float):
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += saved_seconds
+
+    def record_miss(self, llm_seconds: float):
+        with self._lock:
+            self.misses += 1
+            self.llm_seconds += llm_seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "saved_calls": self.hits,
+            "uncached_calls": self.misses,
+            "saved_seconds": round(self.saved_seconds, 2),
+            "llm_seconds": round(self.llm_seconds, 2),
+        }
+
+
+# Per-run counters. run_in_thread copies the context, so the crew worker thread
+# of each run records into the stats object its run started.
+_run_stats: ContextVar[Optional[LLMCacheStats]] = ContextVar("llm_cache_run_stats", default=None)
+process_stats = LLMCacheStats()
+
+
+def start_llm_cache_stats() -> LLMCacheStats:
+    """Starts a fresh set of cache counters for the current run and returns it."""
+    stats = LLMCacheStats()
+    _run_stats.set(stats)
+    return stats
+
+
+def set_llm_cache_enabled(enabled: Optional[bool]):
+    """Forces the completion cache on/off for every CachedLLM in the process (None restores the defaults)."""
+    global _cache_override
+    _cache_override = enabled
+
+
+def _cache_enabled_by_default(temperature: Optional[float]) -> bool:
+    if LLM_CACHE in ("1", "true", "yes", "on"):
+        return True
+    if LLM_CACHE in ("0", "false", "no", "off"):
+        return False
+    # No temperature means the provider's default sampling, which is not deterministic.
+    return temperature == 0
+
+
+class CachedLLM(LLM):
+    """
+    crewAI LLM with an optional content-addressed completion cache.
+
+    Completions are keyed on the model, sampling parameters and a hash of the full
+    message list, and stored in the SQLite cache. Caching is on by default only
+    for temperature 0 (unset or higher temperatures mean the outputs vary) unless
+    LLM_CACHE=true or `cache=True` is passed.
+
+    While a WriterStream is active in the calling context (see streaming.py), plain
+    text completions are streamed token by token into it; cache hits are replayed
+    into it in one piece.
+
+    `timeout` is the call's latency budget: a call that exceeds it is retried once
+    on `fallback` (another CachedLLM, usually a different model) if one is set.
+    """
+
+    def __init__(self, *args, cache: Optional[bool] = None, fallback: Optional["CachedLLM"] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_enabled = _cache_enabled_by_default(self.temperature) if cache is None else cache
+        self.fallback = fallback
+
+    def _completion_key(self, messages) -> str:
+        return make_cache_key(
+            "completion",
+            self.model,
+            messages,
+            temperature=self.temperature,
+            top_p=self.top_p,
+            max_tokens=self.max_tokens,
+            max_completion_tokens=self.max_completion_tokens,
+            # crewAI merges stop words through a set, so their order is not stable between processes.
+            stop=sorted(self.stop) if isinstance(self.stop, list) else self.stop,
+            seed=self.seed,
+        )
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        start = time.perf_counter()
+        try:
+            return self._cached_call(messages, tools, callbacks, available_functions)
+        except Exception as e:
+            if self.fallback is None or not _is_timeout(e):
+                raise
+            seconds = time.perf_counter() - start
+            print(f"⚠️ {self.model} exceeded its {self.timeout}s budget ({seconds:.1f}s), retrying on {self.fallback.model}")
+            telemetry = current_telemetry()
+            if telemetry is not None:
+                telemetry.emit("llm_fallback", stage=telemetry.current_stage, model=self.model, fallback=self.fallback.model, seconds=round(seconds, 3))
+            return self.fallback.call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions)
+
+    def _cached_call(self, messages, tools=None, callbacks=None, available_functions=None):
+        # Function-calling requests have side effects, so they always go to the model.
+        enabled = self.cache_enabled if _cache_override is None else _cache_override
+        if not enabled or tools or available_functions:
+            return super().call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions)
+
+        run_stats = _run_stats.get()
+        key = self._completion_key(messages)
+        cached = completion_cache.get(key)
+        if cached is not None:
+            for stats in (process_stats, run_stats):
+                if stats is not None:
+                    stats.record_hit(cached.get("latency", 0.0))
+            telemetry = current_telemetry()
+            if telemetry is not None:
+                telemetry.record_llm_call(self.model, 0.0, cached=True)
+            stream = get_active_stream()
+            if stream is not None:
+                stream.start_call()
+                stream.feed(cached["text"])
+            return cached["text"]
+
+        start = time.perf_counter()
+        response = super().call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions)
+        latency = time.perf_counter() - start
+        for stats in (process_stats, run_stats):
+            if stats is not None:
+                stats.record_miss(latency)
+        if isinstance(response, str) and response.strip():
+            completion_cache.set(key, {"text": response, "latency": round(latency, 3)})
+        return response
+
+    def _handle_non_streaming_response(self, params, callbacks=None, available_functions=None):
+        # Every request to the model passes through here, so this is where the provider's
+        # rate limit is applied and latency and token usage are recorded.
+        stream = get_active_stream()
+        streamed = stream is not None and not params.get("tools")
+        usage = _UsageRecorder()
+        callbacks = [*(callbacks or []), usage]
+        attempt = {}
+
+        def request():
+            # Timed per attempt, so limiter waits and backoff are not counted as model time.
+            attempt["start"] = time.perf_counter()
+            if streamed:
+                return self._stream_completion(params, stream, callbacks)
+            return super(CachedLLM, self)._handle_non_streaming_response(params, callbacks, available_functions)
+
+        response = get_limiter(_provider(self.model)).run(request, tokens=_estimate_tokens(params), used_tokens=lambda _: usage.total_tokens)
+        telemetry = current_telemetry()
+        if telemetry is not None:
+            telemetry.record_llm_call(
+                self.model,
+                time.perf_counter() - attempt["start"],
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                streamed=streamed,
+            )
+        return response
+
+    def _stream_completion(self, params, stream, callbacks=None) -> str:
+        """Streams a text completion into `stream`, returning the full text like a non-streaming call."""
+        stream.start_call()
+        text, usage = "", None
+        for chunk in litellm.completion(**{**params, "stream": True, "stream_options": {"include_usage": True}}):
+            usage = (chunk.get("usage") if isinstance(chunk, dict) else getattr(chunk, "usage", None)) or usage
+            piece = _chunk_text(chunk)
+            if piece:
+                text += piece
+                stream.feed(piece)
+        if not text.strip():
+            raise ValueError("No content received from streaming response.")
+        if usage:
+            for callback in callbacks or []:
+                if hasattr(callback, "log_success_event"):
+                    callback.log_success_event(kwargs=params, response_obj={"usage": usage}, start_time=0, end_time=0)
+        self._handle_emit_call_events(text, LLMCallType.LLM_CALL)
+        return text
+
+
+def _is_timeout(error: Exception) -> bool:
+    return isinstance(error, (litellm.Timeout, httpx.TimeoutException, TimeoutError))
+
+
+def _provider(model: str) -> str:
+    """Rate-limit key of a litellm model name ("gemini/gemini-2.0-flash" -> "gemini")."""
+    return model.split("/", 1)[0] if "/" in model else model
+
+
+def _estimate_tokens(params: dict) -> int:
+    """Tokens reserved against the provider's TPM budget before a call: ~4 characters per prompt token plus the completion limit."""
+    prompt_chars = sum(len(str(message.get("content") or "")) for message in params.get("messages") or [])
+    return prompt_chars // 4 + (params.get("max_tokens") or 1024)
+
+
+class _UsageRecorder:
+    """Callback that keeps the token usage crewAI reports for a single completion."""
+
+    def __init__(self):
+        self.prompt_tokens = None
+        self.completion_tokens = None
+
+    @property
+    def total_tokens(self) -> Optional[int]:
+        if self.prompt_tokens is None and self.completion_tokens is None:
+            return None
+        return (self.prompt_tokens or 0) + (self.completion_tokens or 0)
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        usage = response_obj.get("usage")
+        get = usage.get if isinstance(usage, dict) else lambda name: getattr(usage, name, None)
+        self.prompt_tokens = get("prompt_tokens")
+        self.completion_tokens = get("completion_tokens")
+
+
+def _chunk_text(chunk) -> Optional[str]:
+    """Text delta of a litellm streaming chunk (object or dict form)."""
+    choices = chunk.get("choices") if isinstance(chunk, dict) else getattr(chunk, "choices", None)
+    if not choices:
+        return None
+    delta = choices[0].get("delta") if isinstance(choices[0], dict) else getattr(choices[0], "delta", None)
+    if delta is None:
+        return None
+    return delta.get("content") if isinstance(delta, dict) else getattr(delta, "content", None)
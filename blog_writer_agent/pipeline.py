@@ -0,0 +1,424 @@
+# src/blog_writer/pipeline.py
+import asyncio
+import time
+import traceback
+from dataclasses import asdict, dataclass, field, fields
+from typing import TYPE_CHECKING, Dict, Optional
+from .checkpoints import CHECKPOINTS_ENABLED, RunCheckpoint, load_checkpoint
+from .context_budget import compact_context
+from .research import NEWS_FANOUT_ENABLED, PREFETCH_UNAVAILABLE, prefetch_research
+from .results import claim_generation, load_result, release_generation, result_cache, result_cache_key, store_result
+from .sections import draft_sections
+from .seo import parse_research_keywords
+from .seo_draft import accept_seo_draft, draft_seo_metadata
+from .streaming import WriterStream, streaming_to
+from .telemetry import RunTelemetry, start_run_telemetry
+from .tools import fetch_related_words_async, start_tool_memo
+from .utils import parse_topic_analysis, run_in_thread
+
+if TYPE_CHECKING:
+    from .crew import BlogWriterCrew
+
+WRITER_MODES = ("single", "sections")
+SEO_MODES = ("llm", "fast", "speculative")
+
+
+@dataclass
+class PipelineOptions:
+    """Per-run switches for the generation pipeline."""
+    # Fetch news and keywords for the topic while the topic analysis runs.
+    prefetch: bool = True
+    # Once the outline is known, also search the news for each outline heading (needs prefetch).
+    news_fanout: bool = NEWS_FANOUT_ENABLED
+    # "single": one writer generation for the whole post.
+    # "sections": intro, each H2 section and conclusion drafted concurrently, then stitched.
+    writer_mode: str = "single"
+    # Run the short LLM pass that adds transition sentences between drafted sections.
+    section_transitions: bool = True
+    # "llm": SEO metadata from the seo_optimizer agent.
+    # "fast": computed locally from the post and researched keywords, skipping an LLM round-trip.
+    # "speculative": drafted from the analysis and research while the writer runs, checked
+    # locally against the finished post; the seo_optimizer agent only runs if the check fails.
+    seo_mode: str = "llm"
+    # Run the crew even if a fresh result for the same request is memoized (the new result replaces it).
+    force_regenerate: bool = False
+
+
+@dataclass
+class BlogRunResult:
+    """Outcome of a single blog generation run."""
+    topic: str
+    tone: str
+    blog_content: Optional[str] = None
+    metadata: dict = field(default_factory=dict)
+    raw_blog_output: Optional[str] = None
+    error: Optional[str] = None
+    error_traceback: Optional[str] = None
+    started_at: float = 0.0
+    duration_seconds: float = 0.0
+    llm_cache: dict = field(default_factory=dict)
+    # Stage wall times, LLM and tool call totals (see RunTelemetry.summary)
+    timing: dict = field(default_factory=dict)
+    # Raw output of each task that ran, keyed by task name (e.g. "research_task")
+    task_outputs: Dict[str, str] = field(default_factory=dict)
+    # Set when the post was served from the result cache: when the reused run was generated
+    reused_from: Optional[float] = None
+    # Checkpoint/telemetry ID of the run; pass it to resume_blog (main.py --resume) after a failure
+    run_id: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and bool(self.blog_content) and "error" not in self.metadata
+
+    @property
+    def from_cache(self) -> bool:
+        return self.reused_from is not None
+
+
+def _task_raw_output(task) -> Optional[str]:
+    if task.output is None:
+        return None
+    return task.output.raw if hasattr(task.output, 'raw') else str(task.output)
+
+
+async def _researched_keywords(topic: str, research_report: Optional[str]) -> list:
+    """Datamuse keywords for the topic (normally a cache hit after the prefetch) plus the research report's keywords."""
+    try:
+        keywords = [item["word"] for item in await fetch_related_words_async(topic)]
+    except Exception as e:
+        print(f"Warning: Could not load Datamuse keywords for local SEO. Error: {e}")
+        keywords = []
+    return keywords + parse_research_keywords(research_report)
+
+
+async def _run_writing_stage(
+    crew_instance: "BlogWriterCrew",
+    topic: str,
+    tone: str,
+    inputs: dict,
+    options: PipelineOptions,
+    stream: Optional[WriterStream] = None,
+):
+    """
+    Writes the post either single-shot through the writer agent or as concurrently
+    drafted sections. Single-shot writer tokens are streamed into `stream`; drafted
+    sections are only delivered once stitched.
+    """
+    writing_task = crew_instance.writing_task()
+    if options.writer_mode == "sections":
+        analysis = parse_topic_analysis(_task_raw_output(crew_instance.topic_analysis_task()))
+        if analysis.get("outline_headings"):
+            blog_post = await draft_sections(
+                crew_instance.agent_llm("writer"),
+                crew_instance.agents_config['writer'],
+                topic,
+                tone,
+                analysis,
+                # Every section call carries the research, so it gets the writing task's context budget.
+                compact_context(
+                    "writing_task",
+                    [("research_task", _task_raw_output(crew_instance.research_task()) or "")],
+                    crew_instance.context_budget("writing_task"),
+                ),
+                transitions=options.section_transitions,
+            )
+            from .crew import set_task_output
+            # Interpolate the task as a crew kickoff would, so SEO sees a normal writing output.
+            writing_task.interpolate_inputs_and_add_conversation_history(inputs)
+            set_task_output(writing_task, blog_post)
+            return
+        print("Warning: Topic analysis has no usable outline_headings; falling back to the single-shot writer.")
+    with streaming_to(stream):
+        await run_in_thread(crew_instance.stage_crew(writing_task).kickoff, inputs)
+
+
+def _restore_task(crew_instance: "BlogWriterCrew", task_name: str, checkpoint: Optional[RunCheckpoint], inputs: dict, telemetry: RunTelemetry) -> bool:
+    """Sets a task's output from the checkpoint, if it has one, so the task is not run again."""
+    raw_output = checkpoint.task_outputs.get(task_name) if checkpoint else None
+    if not raw_output:
+        return False
+    from .crew import set_task_output
+    task = getattr(crew_instance, task_name)()
+    task.interpolate_inputs_and_add_conversation_history(inputs)
+    set_task_output(task, raw_output)
+    telemetry.emit("task_restored", task=task_name)
+    return True
+
+
+def warm_up():
+    """
+    Imports crewai and the LLM, parses the crew template and loads the syllable
+    dictionary ahead of the first run. Long-lived processes can call it in the
+    background; short-lived ones simply pay the cost on their first generate_blog call.
+    """
+    from .analytics import count_syllables
+    from .crew import get_crew_template
+    get_crew_template()
+    count_syllables("warm")
+
+
+async def _in_stage(telemetry: RunTelemetry, name: str, awaitable):
+    with telemetry.stage(name):
+        return await awaitable
+
+
+def _result_entry(result: BlogRunResult) -> dict:
+    return {
+        "blog_content": result.blog_content,
+        "metadata": result.metadata,
+        "raw_blog_output": result.raw_blog_output,
+        "task_outputs": result.task_outputs,
+        "generated_at": result.started_at,
+        "duration_seconds": round(result.duration_seconds, 3),
+    }
+
+
+def _reused_result(topic: str, tone: str, entry: dict, stream: Optional[WriterStream], telemetry: Optional[RunTelemetry]) -> BlogRunResult:
+    telemetry = start_run_telemetry(telemetry)
+    telemetry.emit("result_reused", topic=topic, tone=tone, generated_at=entry["generated_at"])
+    result = BlogRunResult(
+        topic=topic,
+        tone=tone,
+        blog_content=entry["blog_content"],
+        metadata=entry["metadata"],
+        raw_blog_output=entry.get("raw_blog_output"),
+        task_outputs=entry.get("task_outputs") or {},
+        started_at=time.time(),
+        reused_from=entry["generated_at"],
+    )
+    print(f"♻️ Reusing the post for '{topic}' generated {time.time() - entry['generated_at']:.0f}s ago (use force regenerate for a new one).")
+    if stream is not None:
+        stream.finish(result.blog_content)
+    result.timing = telemetry.summary()
+    return result
+
+
+async def generate_blog(
+    topic: str,
+    tone: str,
+    options: Optional[PipelineOptions] = None,
+    stream: Optional[WriterStream] = None,
+    telemetry: Optional[RunTelemetry] = None,
+) -> BlogRunResult:
+    """
+    Returns a blog post for the (topic, tone) pair, reusing a memoized result when
+    possible.
+
+    Successful runs are stored in the result cache under the normalized topic and
+    tone, the model, a hash of agents.yaml/tasks.yaml and the writer/SEO options.
+    A repeat within RESULT_CACHE_TTL_SECONDS is served from there (with
+    `result.reused_from` set) unless `options.force_regenerate` is set, and an
+    identical request that is already running in this process is waited for
+    instead of being generated twice.
+    """
+    options = options or PipelineOptions()
+    if not result_cache.enabled:
+        return await _run_pipeline(topic, tone, options, stream, telemetry)
+
+    key = result_cache_key(topic, tone, options.writer_mode, options.seo_mode, options.section_transitions)
+    owns_key = False
+    while not options.force_regenerate:
+        entry = load_result(key)
+        if entry is not None:
+            return _reused_result(topic, tone, entry, stream, telemetry)
+        pending = claim_generation(key)
+        if pending is None:
+            owns_key = True
+            break
+        print(f"⏳ An identical request for '{topic}' is already running; waiting for its result...")
+        await run_in_thread(pending.wait)
+    try:
+        result = await _run_pipeline(topic, tone, options, stream, telemetry)
+        if result.ok:
+            store_result(key, _result_entry(result))
+        return result
+    finally:
+        if owns_key:
+            release_generation(key)
+
+
+async def resume_blog(
+    run_id: str,
+    stream: Optional[WriterStream] = None,
+    telemetry: Optional[RunTelemetry] = None,
+) -> BlogRunResult:
+    """
+    Resumes a failed or interrupted run from its checkpoint: completed task outputs
+    are reused verbatim and only the missing or failed stages run. Raises ValueError
+    if there is no checkpoint for `run_id`.
+    """
+    checkpoint = load_checkpoint(run_id)
+    if checkpoint is None:
+        raise ValueError(f"No checkpoint found for run '{run_id}'.")
+    known = {f.name for f in fields(PipelineOptions)}
+    options = PipelineOptions(**{key: value for key, value in checkpoint.options.items() if key in known})
+    checkpoint.resumed += 1
+    print(f"🔁 Resuming run {run_id} for '{checkpoint.topic}' (reusing: {', '.join(sorted(checkpoint.task_outputs)) or 'nothing'})")
+    result = await _run_pipeline(
+        checkpoint.topic, checkpoint.tone, options, stream, telemetry or RunTelemetry(run_id=run_id), checkpoint=checkpoint
+    )
+    if result.ok and result_cache.enabled:
+        store_result(result_cache_key(checkpoint.topic, checkpoint.tone, options.writer_mode, options.seo_mode, options.section_transitions), _result_entry(result))
+    return result
+
+
+async def _run_pipeline(
+    topic: str,
+    tone: str,
+    options: PipelineOptions,
+    stream: Optional[WriterStream] = None,
+    telemetry: Optional[RunTelemetry] = None,
+    checkpoint: Optional[RunCheckpoint] = None,
+) -> BlogRunResult:
+    """
+    Runs the blog writing pipeline for a single (topic, tone) pair.
+
+    The topic analysis runs as its own stage, concurrently with the research
+    prefetch. Once the outline is known, the news search fans out to one query
+    per outline heading; research, writing and SEO then run as further stages that read
+    earlier outputs through the shared task context. Every call builds its own
+    BlogWriterCrew from the pre-parsed crew template, so agents, tasks and task
+    outputs are never shared between runs; the outputs come back on
+    `result.task_outputs`. With `seo_mode="speculative"` the SEO metadata is
+    drafted concurrently with the writing stage.
+
+    If `stream` is given, the writer's tokens are pushed into it as they are
+    generated and `stream.finish()` receives the exact markdown of the result.
+    Stage, LLM and tool timings are recorded on `telemetry` (a new RunTelemetry
+    by default) and summarized in `result.timing`.
+
+    Each task's output is saved to a RunCheckpoint (keyed by `result.run_id`) as
+    soon as its stage completes. Tasks already present in `checkpoint` are
+    restored verbatim instead of being run again.
+    """
+    # crewai and the LLM load on the first run, not when the package is imported
+    from .crew import BlogWriterCrew, process_crew_output
+    from .llm import start_llm_cache_stats
+
+    result = BlogRunResult(topic=topic, tone=tone, started_at=time.time())
+    start = time.perf_counter()
+    cache_stats = start_llm_cache_stats()
+    telemetry = start_run_telemetry(telemetry)
+    start_tool_memo()
+    if checkpoint is None and CHECKPOINTS_ENABLED:
+        checkpoint = RunCheckpoint(run_id=telemetry.run_id, topic=topic, tone=tone, options=asdict(options))
+        checkpoint.save()
+    result.run_id = checkpoint.run_id if checkpoint else telemetry.run_id
+    telemetry.emit("run_started", topic=topic, tone=tone, writer_mode=options.writer_mode, seo_mode=options.seo_mode,
+                   resumed_tasks=sorted(checkpoint.task_outputs) if checkpoint else [])
+    crew_instance = None
+    seo_draft = None
+    try:
+        crew_instance = BlogWriterCrew()
+        inputs = {'topic': topic, 'tone': tone, 'prefetched_research': PREFETCH_UNAVAILABLE}
+
+        def restore(task_name: str) -> bool:
+            return _restore_task(crew_instance, task_name, checkpoint, inputs, telemetry)
+
+        def record(task_name: str):
+            if checkpoint is not None:
+                checkpoint.record_task(task_name, _task_raw_output(getattr(crew_instance, task_name)()))
+
+        # --- Stage 1: topic analysis (+ research prefetch) ---
+        research_restored = restore("research_task")
+        stage_one = []
+        if not restore("topic_analysis_task"):
+            analysis_crew = crew_instance.stage_crew(crew_instance.topic_analysis_task())
+            stage_one.append(_in_stage(telemetry, "topic_analysis", run_in_thread(analysis_crew.kickoff, inputs)))
+        if options.prefetch and not research_restored:
+            stage_one.append(_in_stage(telemetry, "prefetch", prefetch_research(topic)))
+        stage_one_results = await asyncio.gather(*stage_one)
+        if options.prefetch and not research_restored:
+            inputs['prefetched_research'] = stage_one_results[-1]
+        record("topic_analysis_task")
+
+        # --- Stage 1b: news for each outline heading ---
+        if options.prefetch and options.news_fanout and not research_restored:
+            headings = parse_topic_analysis(_task_raw_output(crew_instance.topic_analysis_task())).get("outline_headings")
+            if headings:
+                with telemetry.stage("news_fanout", headings=len(headings)):
+                    inputs['prefetched_research'] = await prefetch_research(topic, headings)
+
+        # --- Stage 2: research ---
+        if not research_restored:
+            with telemetry.stage("research"):
+                await run_in_thread(crew_instance.stage_crew(crew_instance.research_task()).kickoff, inputs)
+            record("research_task")
+
+        # --- Stage 3: writing (+ speculative SEO draft) ---
+        seo_restored = options.seo_mode != "fast" and restore("seo_optimization_task")
+        writing_restored = restore("writing_task")
+        if options.seo_mode == "speculative" and not seo_restored and not writing_restored:
+            # A task of its own runs in a copy of the context, so its "seo_draft" stage
+            # (and the LLM call it records) never leaks into the concurrent writing stage.
+            seo_draft = asyncio.create_task(_in_stage(telemetry, "seo_draft", draft_seo_metadata(
+                crew_instance.agent_llm("seo_optimizer"),
+                crew_instance.agents_config['seo_optimizer'],
+                topic,
+                tone,
+                parse_topic_analysis(_task_raw_output(crew_instance.topic_analysis_task())),
+                _task_raw_output(crew_instance.research_task()),
+            )))
+        if not writing_restored:
+            with telemetry.stage("writing", mode=options.writer_mode):
+                await _run_writing_stage(crew_instance, topic, tone, inputs, options, stream)
+            record("writing_task")
+
+        result.raw_blog_output = _task_raw_output(crew_instance.writing_task())
+
+        # --- Stage 4: SEO ---
+        with telemetry.stage("seo", mode=options.seo_mode):
+            seo_metadata_raw_output = None
+            if options.seo_mode != "fast":
+                if seo_restored:
+                    seo_metadata_raw_output = _task_raw_output(crew_instance.seo_optimization_task())
+                elif seo_draft is not None and result.raw_blog_output:
+                    try:
+                        raw_draft = await seo_draft
+                    except Exception as e:
+                        print(f"Warning: Speculative SEO draft failed, running the SEO agent. Error: {e}")
+                        raw_draft = None
+                    seo_metadata_raw_output = accept_seo_draft(raw_draft, result.raw_blog_output, topic)
+                    if seo_metadata_raw_output is not None:
+                        from .crew import set_task_output
+                        set_task_output(crew_instance.seo_optimization_task(), seo_metadata_raw_output)
+                if seo_metadata_raw_output is None and not seo_restored:
+                    crew_result = await run_in_thread(crew_instance.stage_crew(crew_instance.seo_optimization_task()).kickoff, inputs)
+                    seo_metadata_raw_output = getattr(crew_result, 'raw', crew_result)
+
+            if not result.raw_blog_output:
+                result.error = "Could not retrieve final blog content from writing task."
+            else:
+                fast_seo = options.seo_mode == "fast"
+                keywords = await _researched_keywords(topic, _task_raw_output(crew_instance.research_task())) if fast_seo else None
+                blog_content, seo_metadata = process_crew_output(
+                    seo_metadata_raw_output, result.raw_blog_output, fast_seo=fast_seo, topic=topic, keywords=keywords
+                )
+                result.blog_content = blog_content
+                result.metadata = seo_metadata or {}
+                if "error" in result.metadata:
+                    result.error = result.metadata["error"]
+                elif not fast_seo:
+                    # Only SEO output that parsed is kept; a resume re-runs the SEO stage otherwise.
+                    record("seo_optimization_task")
+        if stream is not None and result.raw_blog_output:
+            stream.finish(result.blog_content or result.raw_blog_output)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        result.error_traceback = traceback.format_exc()
+    finally:
+        if seo_draft is not None and not seo_draft.done():
+            # The writing failed before the draft was needed
+            seo_draft.cancel()
+        result.duration_seconds = time.perf_counter() - start
+        result.llm_cache = cache_stats.as_dict()
+        if crew_instance is not None:
+            result.task_outputs = crew_instance.task_outputs()
+        if checkpoint is not None:
+            if result.ok:
+                checkpoint.delete()
+            else:
+                checkpoint.fail(result.error)
+        telemetry.emit("run_completed", ok=result.ok, error=result.error, seconds=round(result.duration_seconds, 3))
+        result.timing = telemetry.summary()
+    return result
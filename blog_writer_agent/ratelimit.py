@@ -0,0 +1,307 @@
+# src/blog_writer/ratelimit.py
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+from dotenv import load_dotenv
+
+load_dotenv()
+
+T = TypeVar("T")
+
+RATE_LIMITS_ENABLED = os.getenv("RATE_LIMITS_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "4"))
+RATE_LIMIT_BACKOFF_BASE = float(os.getenv("RATE_LIMIT_BACKOFF_BASE", "1.0"))
+RATE_LIMIT_BACKOFF_MAX = float(os.getenv("RATE_LIMIT_BACKOFF_MAX", "30"))
+
+# Budgets per provider, overridable as <PROVIDER>_RPM, <PROVIDER>_TPM and <PROVIDER>_MAX_CONCURRENCY.
+# 0 means no budget. Gemini quotas depend on the key's tier, so Gemini has no budget by default and quota
+# errors are caught by the 429 backoff; <PROVIDER>_FREE_TIER=true applies the free-tier budget below instead.
+PROVIDER_DEFAULTS = {
+    "gemini": {"rpm": 0, "tpm": 0, "max_concurrency": 8},
+    "newsdata": {"rpm": 30, "tpm": 0, "max_concurrency": 4},
+    "datamuse": {"rpm": 600, "tpm": 0, "max_concurrency": 8},
+}
+OTHER_PROVIDER_DEFAULTS = {"rpm": 0, "tpm": 0, "max_concurrency": 16}
+# Free-tier limits of gemini-2.0-flash.
+FREE_TIER_DEFAULTS = {
+    "gemini": {"rpm": 15, "tpm": 1_000_000},
+}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class _RequestWindow:
+    """
+    At most `per_minute` requests in any rolling 60-second window. Unlike a bucket
+    with a small burst, a short run that stays under the quota is never delayed.
+    """
+
+    def __init__(self, per_minute: float):
+        self.limit = max(1, int(per_minute))
+        self.started = deque()
+
+    def wait(self, now: float) -> float:
+        """Seconds until one more request fits in the window (0 if it does now)."""
+        while self.started and now - self.started[0] >= 60:
+            self.started.popleft()
+        return 0.0 if len(self.started) < self.limit else self.started[0] + 60 - now
+
+    def take(self, now: float):
+        self.started.append(now)
+
+
+class _TokenBucket:
+    """
+    Refills continuously up to `capacity`. The capacity (burst) is a tenth of the
+    per-minute budget and the refill rate covers the rest, so no 60-second window
+    ever exceeds the budget.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(1.0, per_minute / 10)
+        self.rate = max(per_minute - self.capacity, 1.0) / 60
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)."""
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def take(self, amount: float) -> float:
+        """Deducts `amount` (at most the capacity) and returns what was deducted."""
+        taken = min(amount, self.capacity)
+        self.level -= taken
+        return taken
+
+    def settle(self, taken: float, used: float):
+        """Refunds the part of a deduction a call did not use (or charges the excess), capped like `take`."""
+        self.level = min(self.capacity, self.level + taken - min(used, self.capacity))
+
+
+@dataclass
+class LimiterStats:
+    provider: str
+    requests: int = 0
+    throttled: int = 0
+    retries: int = 0
+    waits: int = 0
+    wait_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {**self.__dict__, "wait_seconds": round(self.wait_seconds, 2)}
+
+
+class RateLimiter:
+    """
+    Process-wide limiter for one provider, shared by every run and thread.
+
+    A call first waits for room in the requests-per-minute window, its estimated
+    tokens in the tokens-per-minute bucket and a concurrency slot. A 429 or 5xx answer is retried after a jittered exponential
+    backoff (or the server's Retry-After), which pauses every caller of the
+    provider, not just the one that was throttled. The concurrency limit adapts to
+    the observed errors: it halves on each throttled, 5xx or timed-out call and
+    grows back by about one slot per limit's worth of successful calls.
+    """
+
+    def __init__(self, provider: str, rpm: float = 0, tpm: float = 0, max_concurrency: int = 16,
+                 max_retries: int = RATE_LIMIT_MAX_RETRIES, backoff_base: float = RATE_LIMIT_BACKOFF_BASE,
+                 backoff_max: float = RATE_LIMIT_BACKOFF_MAX):
+        self.provider = provider
+        self.requests = _RequestWindow(rpm) if rpm > 0 else None
+        self.tokens = _TokenBucket(tpm) if tpm > 0 else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = float(self.max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.stats = LimiterStats(provider)
+        self._cond = threading.Condition()
+
+    def _try_acquire_locked(self, tokens: float) -> Tuple[Optional[float], float]:
+        """
+        Reserves a slot and budget and returns (None, tokens deducted from the bucket),
+        or returns (how long to wait before trying again, 0).
+        """
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now, 0.0
+        if self.in_flight >= int(self.concurrency):
+            # A release wakes sync waiters; async waiters poll.
+            return 0.05, 0.0
+        wait = self.requests.wait(now) if self.requests is not None else 0.0
+        if self.tokens is not None:
+            self.tokens.refill(now)
+            wait = max(wait, self.tokens.wait_for(tokens))
+        if wait > 0:
+            return wait, 0.0
+        if self.requests is not None:
+            self.requests.take(now)
+        reserved = self.tokens.take(tokens) if self.tokens is not None else 0.0
+        self.in_flight += 1
+        self.stats.requests += 1
+        return None, reserved
+
+    def _record_wait(self, started: float):
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            self.stats.waits += 1
+            self.stats.wait_seconds += waited
+
+    def acquire(self, tokens: float = 0) -> float:
+        """Waits for a slot and budget for a call of `tokens`; returns the tokens reserved, to pass to `release`."""
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                wait, reserved = self._try_acquire_locked(tokens)
+                if wait is None:
+                    self._record_wait(started)
+                    return reserved
+                self._cond.wait(timeout=wait)
+
+    async def acquire_async(self, tokens: float = 0) -> float:
+        started = time.monotonic()
+        while True:
+            with self._cond:
+                wait, reserved = self._try_acquire_locked(tokens)
+                if wait is None:
+                    self._record_wait(started)
+                    return reserved
+            await asyncio.sleep(wait)
+
+    def release(self, overloaded: bool = False, reserved_tokens: float = 0, used_tokens: Optional[float] = None):
+        """
+        Frees the slot, settles the tokens `acquire` reserved against the actual usage
+        (kept as is when the usage is unknown) and adapts the concurrency limit: halved
+        when the call was throttled, failed with a 5xx or timed out, else raised a little.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if self.tokens is not None and used_tokens is not None:
+                self.tokens.settle(reserved_tokens, used_tokens)
+            if overloaded:
+                self.concurrency = max(1.0, self.concurrency / 2)
+            else:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            self._cond.notify_all()
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Pauses the provider after a throttled call and returns the delay: Retry-After, else full-jitter exponential backoff."""
+        delay = retry_after if retry_after is not None else random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+            self.stats.throttled += 1
+        return delay
+
+    def _should_retry(self, error: Exception, attempt: int) -> Optional[float]:
+        """The backoff delay if `error` is a 429/5xx worth retrying, else None."""
+        status = error_status(error)
+        if status not in RETRYABLE_STATUS or attempt >= self.max_retries:
+            return None
+        self.stats.retries += 1
+        delay = self.backoff(attempt, _retry_after(error))
+        print(f"⏳ {self.provider} returned {status}; retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+        return delay
+
+    def run(self, func: Callable[[], T], tokens: float = 0, used_tokens: Optional[Callable[[T], Optional[float]]] = None) -> T:
+        """
+        Calls `func` within the provider's budget, retrying 429/5xx errors (raised
+        by `func`) with backoff. `tokens` is the estimated token cost; `used_tokens`
+        extracts the actual cost from the result to settle the estimate. A failed
+        attempt is settled as using no tokens (providers do not bill rejected calls).
+        """
+        attempt = 0
+        while True:
+            reserved = self.acquire(tokens)
+            try:
+                result = func()
+            except Exception as e:
+                self.release(is_overload(e), reserved, 0)
+                delay = self._should_retry(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.release(False, reserved, used_tokens(result) if used_tokens else None)
+            return result
+
+    async def run_async(self, func: Callable[[], Awaitable[T]], tokens: float = 0) -> T:
+        """Async variant of `run`; `func` returns a new awaitable for each attempt."""
+        attempt = 0
+        while True:
+            reserved = await self.acquire_async(tokens)
+            try:
+                result = await func()
+            except Exception as e:
+                self.release(is_overload(e), reserved, 0)
+                delay = self._should_retry(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.release(False)
+            return result
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status of an httpx or litellm error, if it carries one."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_overload(error: Exception) -> bool:
+    """True for errors that mean the provider is saturated: 429, 5xx and timeouts."""
+    return error_status(error) in RETRYABLE_STATUS or isinstance(error, TimeoutError) or "Timeout" in type(error).__name__
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return min(float(headers.get("retry-after")), RATE_LIMIT_BACKOFF_MAX)
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _provider_settings(provider: str) -> dict:
+    prefix = provider.upper().replace("-", "_")
+    defaults = PROVIDER_DEFAULTS.get(provider, OTHER_PROVIDER_DEFAULTS)
+    if os.getenv(f"{prefix}_FREE_TIER", "false").lower() in ("1", "true", "yes"):
+        defaults = {**defaults, **FREE_TIER_DEFAULTS.get(provider, {})}
+    return {
+        "rpm": float(os.getenv(f"{prefix}_RPM", defaults["rpm"])),
+        "tpm": float(os.getenv(f"{prefix}_TPM", defaults["tpm"])),
+        "max_concurrency": int(os.getenv(f"{prefix}_MAX_CONCURRENCY", defaults["max_concurrency"])),
+    }
+
+
+def get_limiter(provider: str) -> RateLimiter:
+    """The process-wide limiter of `provider` (e.g. "gemini", "newsdata"), created on first use."""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                settings = _provider_settings(provider) if RATE_LIMITS_ENABLED else {"max_concurrency": 1_000_000}
+                limiter = _limiters[provider] = RateLimiter(provider, **settings)
+    return limiter
+
+
+def rate_limit_stats() -> list:
+    return [limiter.stats.as_dict() for limiter in list(_limiters.values())]
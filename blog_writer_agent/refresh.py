@@ -0,0 +1,189 @@
+# src/blog_writer/refresh.py
+import asyncio
+import json
+import os
+import time
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from .analytics import analyze
+from .batch import THREADS_PER_RUN
+from .research import fanout_queries, fetch_fanout, merge_articles, published_at, rank_articles, terms
+from .sections import CONCLUSION_HEADING, redraft_sections, split_sections
+from .seo import MAX_TAGS, MIN_TAGS, generate_local_seo_metadata, tags_in_post
+from .store import OutputStore, get_output_store
+from .telemetry import RunTelemetry, start_run_telemetry
+from .tools import format_article, start_tool_memo
+from .utils import atomic_write_text, run_in_thread, thread_pool
+
+load_dotenv()
+
+# New articles handed to the writer per section.
+REFRESH_MAX_ARTICLES_PER_SECTION = int(os.getenv("REFRESH_MAX_ARTICLES_PER_SECTION", "3"))
+
+
+@dataclass
+class RefreshResult:
+    """Outcome of refreshing one stored post."""
+    file_base: str
+    topic: str
+    # When the post's news was last checked (its generation time the first time)
+    since: float = 0.0
+    new_articles: int = 0
+    # Headings of the sections that were re-drafted
+    redrafted_sections: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    error_traceback: Optional[str] = None
+    duration_seconds: float = 0.0
+    # Stage wall times, LLM and tool call totals (see RunTelemetry.summary)
+    timing: dict = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.redrafted_sections)
+
+
+def _section_news(articles: List[dict], sections: Dict[str, str]) -> Dict[str, List[dict]]:
+    """
+    New articles per section heading. An article belongs to the sections whose
+    query found it; one found only by the topic query goes to the section whose
+    heading shares the most words with it, if any.
+    """
+    news: Dict[str, List[dict]] = {}
+    heading_terms = {query: set(terms(heading)) for query, heading in sections.items()}
+    for article in articles:
+        queries = [query for query in article["queries"] if query in sections]
+        if not queries:
+            text = set(terms(f"{article.get('title')} {article.get('description')}"))
+            overlap, best = max(((len(text & words), query) for query, words in heading_terms.items()), default=(0, None))
+            queries = [best] if overlap else []
+        for query in queries:
+            section = news.setdefault(sections[query], [])
+            if len(section) < REFRESH_MAX_ARTICLES_PER_SECTION:
+                section.append(article)
+    return news
+
+
+def _format_news(articles: List[dict]) -> str:
+    return "\n".join(
+        format_article(article) + (f"\n  Published: {article['pubDate']}" if article.get("pubDate") else "")
+        for article in articles
+    )
+
+
+def refreshed_metadata(metadata: dict, blog_content: str, topic: str) -> dict:
+    """
+    The SEO fields and metrics of a refreshed post. Title, slug and meta description
+    are kept, so published URLs and snippets stay stable. Tags still found in the
+    post are kept and topped up with locally ranked ones, and the text metrics
+    are recomputed.
+    """
+    tags = metadata.get("tags") if isinstance(metadata.get("tags"), list) else []
+    kept = tags_in_post(tags, blog_content)
+    if len(kept) < MIN_TAGS:
+        local = generate_local_seo_metadata(blog_content, topic, tags)["tags"]
+        kept += [tag for tag in local if tag not in kept][:MAX_TAGS - len(kept)]
+    return {**metadata, "tags": kept, **analyze(blog_content, keywords=kept).as_metadata()}
+
+
+async def refresh_post(post: dict, store: Optional[OutputStore] = None, telemetry: Optional[RunTelemetry] = None) -> RefreshResult:
+    """
+    Brings one stored post (an OutputStore.iter_posts record) up to date.
+
+    The topic and every H2 heading are searched as in the research fan-out, and
+    only articles published since the post's news was last checked (its
+    `news_checked_at`, else when it was saved) and not already linked from the
+    post are kept. Only the sections those articles belong to are re-drafted, in
+    one concurrent LLM call each; the rest of the post is kept verbatim. The post
+    is then saved with refreshed tags and metrics. Without new articles, only
+    `news_checked_at` is updated and no LLM is called.
+    """
+    store = store or get_output_store()
+    metadata = post["metadata"]
+    topic = metadata.get("topic") or post["topic"]
+    tone = metadata.get("tone") or post["tone"] or "Educational"
+    result = RefreshResult(file_base=post["file_base"], topic=topic, since=float(metadata.get("news_checked_at") or post["updated_at"]))
+    start = time.perf_counter()
+    checked_at = time.time()
+    telemetry = start_run_telemetry(telemetry)
+    start_tool_memo()
+    telemetry.emit("refresh_started", topic=topic, file_base=post["file_base"], since=result.since)
+    try:
+        parts = split_sections(post["markdown"])
+        headings = [heading for heading, _ in parts if heading and heading.lower() != CONCLUSION_HEADING.lower()]
+        with telemetry.stage("news"):
+            sections = fanout_queries(topic, headings)
+            queries = [topic, *sections]
+            fetched = await fetch_fanout(queries)
+            if not fetched:
+                raise RuntimeError("No NewsData query succeeded; the post was left unchanged.")
+            results = {
+                query: [
+                    article for article in articles
+                    if (published_at(article) or 0) > result.since and (article.get("link") or "#") not in post["markdown"]
+                ]
+                for query, articles in fetched.items()
+            }
+            merged = merge_articles({query: articles for query, articles in results.items() if articles})
+            result.new_articles = len(merged)
+            news = _section_news(rank_articles(merged, topic, queries, limit=len(merged)), sections)
+
+        updates = [(heading, text, _format_news(news[heading])) for heading, text in parts if heading in news]
+        if updates:
+            from .crew import BlogWriterCrew
+            crew_instance = BlogWriterCrew()
+            with telemetry.stage("redraft", sections=len(updates)):
+                redrafted = await redraft_sections(
+                    crew_instance.agent_llm("writer"), crew_instance.agents_config['writer'], topic, tone, updates
+                )
+            replacements = dict(zip((heading for heading, _, _ in updates), redrafted))
+            blog_content = "\n\n".join(replacements.get(heading, text) if heading else text for heading, text in parts)
+            refreshed = {**refreshed_metadata(metadata, blog_content, topic), "news_checked_at": checked_at, "refreshed_at": checked_at}
+            await run_in_thread(store.save_post, topic, tone, blog_content, {k: v for k, v in refreshed.items() if k not in ("topic", "tone")})
+            result.redrafted_sections = list(replacements)
+        else:
+            await run_in_thread(
+                atomic_write_text, Path(post["metadata_path"]), json.dumps({**metadata, "news_checked_at": checked_at}, indent=2, ensure_ascii=False)
+            )
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        result.error_traceback = traceback.format_exc()
+    finally:
+        result.duration_seconds = time.perf_counter() - start
+        telemetry.emit(
+            "refresh_completed", ok=result.ok, error=result.error, new_articles=result.new_articles,
+            redrafted_sections=result.redrafted_sections, seconds=round(result.duration_seconds, 3),
+        )
+        result.timing = telemetry.summary()
+    return result
+
+
+async def refresh_posts(
+    posts: List[dict],
+    concurrency: int = 4,
+    store: Optional[OutputStore] = None,
+    on_result: Optional[Callable[[int, RefreshResult], None]] = None,
+) -> List[RefreshResult]:
+    """
+    Refreshes stored posts with at most `concurrency` in flight. Results are
+    returned in input order; `on_result` is called in a worker thread as each one finishes.
+    """
+    concurrency = max(1, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def refresh_one(index: int, post: dict) -> RefreshResult:
+        async with semaphore:
+            print(f"🔄 [{index + 1}/{len(posts)}] Refreshing: '{post['topic'] or post['file_base']}'")
+            result = await refresh_post(post, store)
+        if on_result:
+            await run_in_thread(on_result, index, result)
+        return result
+
+    with thread_pool(concurrency * THREADS_PER_RUN, "blog-refresh"):
+        return list(await asyncio.gather(*(refresh_one(index, post) for index, post in enumerate(posts))))
@@ -0,0 +1,214 @@
+# src/blog_writer/research.py
+import asyncio
+import math
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+from .seo import STOPWORDS
+from .telemetry import current_telemetry
+from .tools import fetch_news_async, find_keywords_async, format_article, search_news_async
+
+load_dotenv()
+
+PREFETCH_UNAVAILABLE = (
+    "No prefetched results are available for this run. "
+    "Use the News Search Tool and the Keyword Finder Tool to gather them."
+)
+
+NEWS_FANOUT_ENABLED = os.getenv("NEWS_FANOUT_ENABLED", "true").lower() in ("1", "true", "yes")
+# At most this many outline headings get their own NewsData query (one request each).
+NEWS_FANOUT_MAX_QUERIES = int(os.getenv("NEWS_FANOUT_MAX_QUERIES", "6"))
+# Articles handed to the researcher after merging and ranking.
+NEWS_FANOUT_MAX_ARTICLES = int(os.getenv("NEWS_FANOUT_MAX_ARTICLES", "10"))
+# Titles sharing at least this fraction of their words are the same story.
+TITLE_SIMILARITY_THRESHOLD = 0.8
+# An article loses half its recency score every this many days.
+RECENCY_HALF_LIFE_DAYS = 7.0
+# Weight of relevance against recency in an article's score.
+RELEVANCE_WEIGHT = 0.6
+# Content words kept from a heading to build its query.
+HEADING_QUERY_WORDS = 6
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9'-]*")
+# A syndicated title often ends with " - Publisher" or " | Publisher".
+_TITLE_SUFFIX_RE = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,40}$")
+
+
+def terms(text: str) -> List[str]:
+    """The lowercase words of `text`, without stopwords."""
+    return [word for word in _WORD_RE.findall((text or "").lower()) if word not in STOPWORDS]
+
+
+def heading_query(heading: str) -> str:
+    """A short NewsData query from an outline heading: its first HEADING_QUERY_WORDS content words."""
+    return " ".join(terms(re.sub(r"^[\s#*\d.)]+", "", heading))[:HEADING_QUERY_WORDS])
+
+
+def _url_key(url: Optional[str]) -> Optional[str]:
+    """The URL without scheme, "www.", query string, fragment or trailing slash."""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}" if host else None
+
+
+def _title_words(title: Optional[str]) -> frozenset:
+    return frozenset(_WORD_RE.findall(_TITLE_SUFFIX_RE.sub("", title or "").lower()))
+
+
+def _similar_titles(a: frozenset, b: frozenset) -> bool:
+    return bool(a and b) and len(a & b) / len(a | b) >= TITLE_SIMILARITY_THRESHOLD
+
+
+def published_at(article: dict) -> Optional[float]:
+    """Publication time as a UNIX timestamp (NewsData dates are "YYYY-MM-DD HH:MM:SS" in UTC)."""
+    try:
+        return datetime.strptime(article.get("pubDate") or "", "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+def merge_articles(results: Dict[str, List[dict]]) -> List[dict]:
+    """
+    Merges the articles found for each query (query -> NewsData results) into one
+    list without duplicates. Articles with the same URL or a near-identical title
+    are one story: the entry with the longest description is kept and remembers
+    every query that found it under "queries".
+    """
+    merged: List[dict] = []
+    for query, articles in results.items():
+        for article in articles:
+            url, words = _url_key(article.get("link")), _title_words(article.get("title"))
+            for existing in merged:
+                if (url and url == existing["_url"]) or _similar_titles(words, existing["_words"]):
+                    if query not in existing["queries"]:
+                        existing["queries"].append(query)
+                    if len(article.get("description") or "") > len(existing.get("description") or ""):
+                        existing.update({k: v for k, v in article.items() if v})
+                    break
+            else:
+                merged.append({**article, "queries": [query], "_url": url, "_words": words})
+    for article in merged:
+        del article["_url"], article["_words"]
+    return merged
+
+
+def score_article(article: dict, topic: str, now: Optional[float] = None) -> float:
+    """
+    Relevance (share of the topic's and of the matching queries' terms found in the
+    title and description, plus a bonus per extra query that found the article)
+    blended with recency (halving every RECENCY_HALF_LIFE_DAYS).
+    """
+    text = set(terms(f"{article.get('title')} {article.get('description')}"))
+    topic_terms = set(terms(topic))
+    query_terms = {term for query in article.get("queries", ()) for term in terms(query)}
+    topic_overlap = len(text & topic_terms) / len(topic_terms) if topic_terms else 0.0
+    query_overlap = len(text & query_terms) / len(query_terms) if query_terms else 0.0
+    relevance = min(1.0, 0.5 * topic_overlap + 0.5 * query_overlap + 0.1 * (len(article.get("queries", ())) - 1))
+    published = published_at(article)
+    age_days = max(0.0, ((now or time.time()) - published) / 86400) if published is not None else math.inf
+    recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+    return RELEVANCE_WEIGHT * relevance + (1 - RELEVANCE_WEIGHT) * recency
+
+
+def rank_articles(articles: List[dict], topic: str, queries: Sequence[str], limit: int = NEWS_FANOUT_MAX_ARTICLES) -> List[dict]:
+    """
+    The best `limit` articles, best first. The top article of each query is kept
+    first (in query order), so every section is covered before the rest of the
+    slots go to the highest scores.
+    """
+    now = time.time()
+    scored = sorted(articles, key=lambda article: score_article(article, topic, now), reverse=True)
+    chosen = []
+    for query in queries:
+        best = next((article for article in scored if query in article["queries"] and article not in chosen), None)
+        if best is not None and len(chosen) < limit:
+            chosen.append(best)
+    chosen += [article for article in scored if article not in chosen][:limit - len(chosen)]
+    return sorted(chosen, key=scored.index)
+
+
+def _format_fanout(articles: List[dict], sections: Dict[str, str]) -> str:
+    lines = ["**Recent News:**"]
+    for article in articles:
+        entry = format_article(article)
+        if article.get("pubDate"):
+            entry += f"\n  Published: {article['pubDate']}"
+        covers = [sections[query] for query in article["queries"] if query in sections]
+        if covers:
+            entry += f"\n  Relevant to: {'; '.join(covers)}"
+        lines.append(entry)
+    return "\n".join(lines)
+
+
+def fanout_queries(topic: str, headings: Sequence[str]) -> Dict[str, str]:
+    """The news query of each heading (query -> heading), skipping empty and repeated queries."""
+    sections: Dict[str, str] = {}
+    topic_query = " ".join(terms(topic))
+    for heading in headings:
+        query = heading_query(heading)
+        if query and query != topic_query and query not in sections and len(sections) < NEWS_FANOUT_MAX_QUERIES:
+            sections[query] = heading
+    return sections
+
+
+async def fetch_fanout(queries: Sequence[str]) -> Dict[str, List[dict]]:
+    """The articles of each query (query -> NewsData results), fetched concurrently. Failed queries are left out."""
+    responses = await asyncio.gather(*(fetch_news_async(query) for query in queries), return_exceptions=True)
+    return {
+        query: response.get("results") or [] for query, response in zip(queries, responses)
+        if isinstance(response, dict) and response.get("status") == "success"
+    }
+
+
+async def search_news_fanout(topic: str, headings: Sequence[str] = ()) -> str:
+    """
+    Searches NewsData for the topic and for each outline heading concurrently,
+    then merges, dedupes and ranks the articles (see merge_articles and
+    rank_articles). A failed heading query is skipped; if every query fails the
+    topic's error is returned, as the search tool would.
+    """
+    sections = fanout_queries(topic, headings)
+    queries = [topic, *sections]
+    if not sections:
+        return await search_news_async(topic)
+
+    results = {query: articles for query, articles in (await fetch_fanout(queries)).items() if articles}
+    if not results:
+        return await search_news_async(topic)
+    merged = merge_articles(results)
+    ranked = rank_articles(merged, topic, queries)
+    found = sum(len(articles) for articles in results.values())
+    print(f"📰 News fan-out: {len(queries)} queries, {found} articles, {found - len(merged)} duplicates merged, kept {len(ranked)}")
+    telemetry = current_telemetry()
+    if telemetry is not None:
+        telemetry.emit(
+            "news_fanout", stage=telemetry.current_stage, queries=len(queries), unanswered_queries=len(queries) - len(results),
+            articles=found, duplicates=found - len(merged), kept=len(ranked),
+        )
+    return _format_fanout(ranked, sections)
+
+
+async def prefetch_research(topic: str, headings: Sequence[str] = ()) -> str:
+    """
+    Runs the core news and keyword lookups for `topic` concurrently; with
+    `headings`, the news search fans out to one query per outline heading.
+
+    The topic lookups depend only on the topic, so the pipeline starts them together
+    with the topic analysis and, once the outline is known, runs the fan-out (the
+    topic lookups then come from the run's tool memo). The formatted results go to
+    the researcher as context, introduced as already-run tool results. Tool errors are returned as text (like the crew tools
+    do) so the researcher can fall back to calling the tools itself.
+    """
+    news, keywords = await asyncio.gather(search_news_fanout(topic, headings), find_keywords_async(topic))
+    covered = " and the news search also for each outline heading (see \"Relevant to\")" if headings else ""
+    return (
+        f"**Prefetched tool results:** the News Search Tool and Keyword Finder Tool were already run for '{topic}'{covered}. "
+        "Work from these results directly. Only call a tool yourself if a result below is missing, reports an error, "
+        f"or does not cover a sub-topic.\n{news}\n\n{keywords}"
+    )
@@ -0,0 +1,86 @@
+# src/blog_writer/results.py
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+from .cache import TTLCache, make_cache_key, normalize_query
+from .utils import CONFIG_DIR, LLM_MODEL
+
+load_dotenv()
+
+# Freshness window: a repeated (topic, tone) request within this many seconds reuses the earlier post.
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", 24 * 60 * 60))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "500"))
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+result_cache = TTLCache("results", ttl_seconds=RESULT_CACHE_TTL_SECONDS, max_entries=RESULT_CACHE_MAX_ENTRIES)
+result_cache.enabled = RESULT_CACHE_ENABLED
+
+# Keys currently being generated in this process, so identical concurrent requests
+# (double-clicks, retries) wait for one run instead of starting their own.
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def prompt_config_hash(config_dir: Path = CONFIG_DIR) -> str:
+    """Hash of agents.yaml and tasks.yaml, so editing a prompt invalidates earlier results."""
+    digest = hashlib.sha256()
+    for name in ("agents.yaml", "tasks.yaml"):
+        digest.update((Path(config_dir) / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def result_cache_key(topic: str, tone: str, writer_mode: str, seo_mode: str, section_transitions: bool = True,
+                     model: str = LLM_MODEL, config_dir: Path = CONFIG_DIR) -> str:
+    """Key of a generated post: normalized topic and tone, model, prompt config and the output-affecting options."""
+    return make_cache_key(
+        "blog", normalize_query(topic), normalize_query(tone),
+        model=model, config=prompt_config_hash(config_dir),
+        writer_mode=writer_mode, seo_mode=seo_mode, section_transitions=section_transitions,
+    )
+
+
+def load_result(key: str) -> Optional[dict]:
+    """The stored run for `key` if it is still within the freshness window."""
+    return result_cache.get(key)
+
+
+def store_result(key: str, entry: dict):
+    """Stores a successful run; failed runs are never memoized."""
+    result_cache.set(key, {**entry, "generated_at": entry.get("generated_at") or time.time()})
+
+
+def claim_generation(key: str) -> Optional[threading.Event]:
+    """
+    Marks `key` as being generated by the caller and returns None, or returns the
+    event of the run already generating it. The claimant must call release_generation.
+    """
+    with _in_flight_lock:
+        pending = _in_flight.get(key)
+        if pending is None:
+            _in_flight[key] = threading.Event()
+        return pending
+
+
+def release_generation(key: str):
+    with _in_flight_lock:
+        pending = _in_flight.pop(key, None)
+    if pending is not None:
+        pending.set()
+
+
+def set_result_cache_enabled(enabled: bool):
+    """Turns result reuse on or off for this process."""
+    result_cache.enabled = enabled
+
+
+def clear_result_cache() -> int:
+    """Removes every memoized post. Returns the number of deleted entries."""
+    return result_cache.clear()
+
+
+def result_cache_stats() -> dict:
+    return result_cache.stats()
@@ -0,0 +1,199 @@
+# src/blog_writer/sections.py
+import asyncio
+import json
+import re
+from typing import List, Optional, Tuple
+from .utils import run_in_thread, strip_code_fences
+
+CONCLUSION_HEADING = "Conclusion"
+
+
+def agent_system_prompt(agent_config: dict, inputs: dict) -> str:
+    """Builds an agent's persona from agents.yaml, so direct LLM calls sound like the crew's agent."""
+    from crewai.utilities.string_utils import interpolate_only
+
+    role = interpolate_only(agent_config.get("role", ""), inputs).strip()
+    goal = interpolate_only(agent_config.get("goal", ""), inputs).strip()
+    backstory = interpolate_only(agent_config.get("backstory", ""), inputs).strip()
+    return f"You are {role}. {backstory}\nYour personal goal is: {goal}"
+
+
+def _shared_context(topic: str, tone: str, analysis: dict, research_report: str) -> str:
+    outline = "\n".join(f"{i}. {heading}" for i, heading in enumerate(analysis["outline_headings"], start=1))
+    return (
+        f"Blog topic: {topic}\n"
+        f"Tone: {tone}\n"
+        f"Target audience: {analysis.get('target_audience', 'General readers')}\n"
+        f"Key takeaway: {analysis.get('key_takeaway', '')}\n\n"
+        f"Full outline of the post (H2 sections, in order):\n{outline}\n\n"
+        f"Research findings (news context and keywords):\n{research_report or 'None provided.'}"
+    )
+
+
+def _section_briefs(headings: List[str]) -> List[dict]:
+    """One brief per independently drafted piece: introduction, each H2 section, conclusion."""
+    briefs = [{
+        "heading": None,
+        "instructions": (
+            "Write ONLY the introduction of the post: start with a single H1 title line ('# ...'), "
+            "followed by a captivating introduction (~100-150 words) that hooks the reader and states the post's value. "
+            "Do not write any of the H2 sections."
+        ),
+    }]
+    for index, heading in enumerate(headings):
+        previous_heading = headings[index - 1] if index > 0 else "the introduction"
+        next_heading = headings[index + 1] if index + 1 < len(headings) else "the conclusion"
+        briefs.append({
+            "heading": heading,
+            "instructions": (
+                f"Write ONLY the section '## {heading}' (~250-350 words), starting with exactly that H2 heading line. "
+                f"It follows '{previous_heading}' and is followed by '{next_heading}'; do not repeat their content. "
+                "Weave in relevant news and keywords naturally and use Markdown formatting for readability."
+            ),
+        })
+    briefs.append({
+        "heading": CONCLUSION_HEADING,
+        "instructions": (
+            f"Write ONLY the conclusion, starting with the heading line '## {CONCLUSION_HEADING}'. "
+            "Summarize the post, reinforce the key takeaway and end with a clear call-to-action."
+        ),
+    })
+    return briefs
+
+
+def _normalize_piece(text: str, heading: Optional[str]) -> str:
+    """Strips fences and makes sure every section starts with its own H2 heading."""
+    text = strip_code_fences(text)
+    if heading is None:
+        return text
+    lines = text.splitlines()
+    if lines and lines[0].lstrip().startswith("#"):
+        lines = lines[1:]
+    return f"## {heading}\n\n" + "\n".join(lines).strip()
+
+
+def _transition_prompt(pieces: List[str]) -> str:
+    boundaries = []
+    for index in range(1, len(pieces)):
+        previous_tail = " ".join(pieces[index - 1].split()[-60:])
+        next_heading = pieces[index].splitlines()[0]
+        boundaries.append(f"Boundary {index}:\n- End of previous part: ...{previous_tail}\n- Next part heading: {next_heading}")
+    return (
+        "The parts of a blog post below were drafted separately. For every boundary, write ONE short, natural "
+        "transition sentence that opens the next part and links it to what came before.\n\n"
+        + "\n\n".join(boundaries)
+        + f"\n\nReturn ONLY a JSON list of {len(boundaries)} strings, one per boundary, in order."
+    )
+
+
+def _parse_transitions(raw: str, expected: int) -> List[str]:
+    try:
+        transitions = json.loads(strip_code_fences(raw))
+    except (json.JSONDecodeError, TypeError):
+        return []
+    if not isinstance(transitions, list) or len(transitions) != expected:
+        return []
+    return [str(t).strip() for t in transitions]
+
+
+def stitch_sections(pieces: List[str], transitions: Optional[List[str]] = None) -> str:
+    """Joins the drafted pieces in order, inserting a transition sentence as its own paragraph under each H2 heading."""
+    parts = [pieces[0].strip()]
+    for index, piece in enumerate(pieces[1:]):
+        transition = transitions[index] if transitions and index < len(transitions) else ""
+        if transition:
+            heading, _, body = piece.partition("\n")
+            piece = f"{heading}\n\n{transition}\n\n{body.strip()}"
+        parts.append(piece.strip())
+    return re.sub(r'\n{3,}', '\n\n', "\n\n".join(parts)).strip()
+
+
+async def draft_sections(
+    llm,
+    writer_config: dict,
+    topic: str,
+    tone: str,
+    analysis: dict,
+    research_report: str,
+    transitions: bool = True,
+) -> str:
+    """
+    Drafts the introduction, each outline section and the conclusion as concurrent
+    LLM calls that share the same context, then stitches them into one post.
+
+    Latency is bounded by the slowest section (plus one short transition call)
+    instead of one long generation for the whole post.
+    """
+    inputs = {"topic": topic, "tone": tone}
+    system_prompt = agent_system_prompt(writer_config, inputs)
+    shared_context = _shared_context(topic, tone, analysis, research_report)
+    briefs = _section_briefs(analysis["outline_headings"])
+
+    def call_llm(user_prompt: str) -> str:
+        return llm.call([
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ])
+
+    drafts = await asyncio.gather(*(
+        run_in_thread(
+            call_llm,
+            f"{shared_context}\n\n{brief['instructions']}\n"
+            "**Output ONLY this part of the post in Markdown.** No preamble or comments.",
+        )
+        for brief in briefs
+    ))
+    pieces = [_normalize_piece(draft, brief["heading"]) for draft, brief in zip(drafts, briefs)]
+
+    bridge_sentences = None
+    if transitions and len(pieces) > 1:
+        try:
+            raw = await run_in_thread(call_llm, _transition_prompt(pieces))
+            bridge_sentences = _parse_transitions(raw, len(pieces) - 1)
+        except Exception as e:
+            print(f"Warning: Transition pass failed, stitching sections without it. Error: {e}")
+    return stitch_sections(pieces, bridge_sentences)
+
+
+def split_sections(blog_content: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Splits a post at its H2 headings (outside code blocks) into (heading, text)
+    pairs, where each text starts with its heading line. The part before the
+    first H2 (title and introduction) has the heading None.
+    """
+    parts: List[Tuple[Optional[str], List[str]]] = [(None, [])]
+    in_code = False
+    for line in (blog_content or "").splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else re.match(r'^\s{0,3}##\s+(.+?)\s*#*\s*$', line)
+        if match:
+            parts.append((match.group(1).strip(), []))
+        parts[-1][1].append(line)
+    return [(heading, "\n".join(lines).strip()) for heading, lines in parts if heading is not None or "\n".join(lines).strip()]
+
+
+async def redraft_sections(llm, writer_config: dict, topic: str, tone: str, updates: List[Tuple[str, str, str]]) -> List[str]:
+    """
+    Rewrites existing sections of a published post to take in recent news, as
+    concurrent LLM calls. `updates` holds (heading, current section text, news)
+    triples; the rewritten sections come back in the same order.
+    """
+    system_prompt = agent_system_prompt(writer_config, {"topic": topic, "tone": tone})
+
+    def call_llm(heading: str, text: str, news: str) -> str:
+        return llm.call([
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": (
+                f"Blog topic: {topic}\nTone: {tone}\n\n"
+                f"Current section of the published post:\n{text}\n\n"
+                f"News published since the section was written:\n{news}\n\n"
+                f"Update ONLY the section '## {heading}' so it reflects the news above where relevant. "
+                "Keep its heading, structure, tone, approximate length and the content that is still accurate, "
+                "and weave the new developments in naturally.\n"
+                "**Output ONLY the updated section in Markdown**, starting with exactly that H2 heading line. No preamble or comments."
+            )},
+        ])
+
+    drafts = await asyncio.gather(*(run_in_thread(call_llm, heading, text, news) for heading, text, news in updates))
+    return [_normalize_piece(draft, heading) for draft, (heading, _, _) in zip(drafts, updates)]
@@ -0,0 +1,253 @@
+# src/blog_writer/seo.py
+import re
+import unicodedata
+from collections import Counter
+from typing import Iterable, List, Optional
+from .analytics import strip_markdown
+
+TITLE_MAX_CHARS = 60
+META_DESCRIPTION_MAX_CHARS = 160
+SLUG_MAX_CHARS = 60
+MIN_TAGS, MAX_TAGS = 5, 7
+# A speculative SEO draft is rejected when fewer of its tags than this appear in the post...
+MIN_TAG_COVERAGE = 0.8
+# ...or when fewer of its title's (or slug's) content words than this appear in the post (or title and topic).
+MIN_TITLE_COVERAGE = 0.6
+# LLM titles are asked to stay "ideally under 60" characters; longer ones are rejected.
+DRAFT_TITLE_MAX_CHARS = 70
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just let me more most my myself no nor not now of off on once only or
+other our ours ourselves out over own same she should so some such than that the their theirs them themselves then
+there these they this those through to too under until up very was we were what when where which while who whom why
+will with would you your yours yourself yourselves also get got like make made many much one two new way ways use
+using used it's you're don't can't won't let's here's what's
+""".split())
+
+
+def slugify(text: str, max_length: int = SLUG_MAX_CHARS) -> str:
+    """
+    Creates a lowercase, ASCII, kebab-case URL slug, dropping stopwords when the
+    result would otherwise exceed `max_length` and never cutting a word in half.
+    """
+    text = re.sub(r"['’]", "", text or "")
+    text = re.sub(r'[^\w]+', ' ', text)
+    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    words = re.findall(r'[a-z0-9]+', ascii_text.lower())
+    if len("-".join(words)) > max_length:
+        words = [w for w in words if w not in STOPWORDS] or words
+    slug = ""
+    for word in words:
+        candidate = f"{slug}-{word}" if slug else word
+        if len(candidate) > max_length:
+            break
+        slug = candidate
+    return slug or "blog-post"
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    """Shortens text at a word boundary so it fits in `max_chars`."""
+    text = re.sub(r'\s+', ' ', text).strip()
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 3].rsplit(" ", 1)[0].rstrip(" ,;:-")
+    return f"{cut}..."
+
+
+def _shorten_title(title: str, max_chars: int = TITLE_MAX_CHARS) -> str:
+    """Keeps long titles readable: prefer the part before a ':' or ' - ' separator, else cut at a word."""
+    title = re.sub(r'\s+', ' ', title).strip()
+    if len(title) <= max_chars:
+        return title
+    for separator in (":", " - ", " – ", " — "):
+        head = title.split(separator, 1)[0].strip()
+        if 20 <= len(head) <= max_chars:
+            return head
+    words = title[:max_chars + 1].rsplit(" ", 1)[0].rstrip(" ,;:-").split()
+    while len(words) > 1 and words[-1].lower() in STOPWORDS:
+        words.pop()
+    return " ".join(words)
+
+
+def _summarize(text: str, max_chars: int = META_DESCRIPTION_MAX_CHARS) -> str:
+    """Takes whole sentences while they fit in `max_chars`; truncates the first one if it alone is too long."""
+    sentences = re.split(r'(?<=[.!?])\s+', re.sub(r'\s+', ' ', text).strip())
+    summary = ""
+    for sentence in sentences:
+        candidate = f"{summary} {sentence}".strip()
+        if len(candidate) > max_chars:
+            break
+        summary = candidate
+    return summary or _truncate(text, max_chars)
+
+
+def extract_headings(blog_content: str, level: int) -> List[str]:
+    prefix = "#" * level
+    pattern = rf'^\s{{0,3}}{prefix}\s+(.+?)\s*#*\s*$'
+    return [strip_markdown(h).strip() for h in re.findall(pattern, blog_content or "", flags=re.MULTILINE)]
+
+
+def _intro_paragraph(blog_content: str) -> str:
+    """First prose paragraph of the post (skipping headings, lists, quotes and images)."""
+    for block in re.split(r'\n\s*\n', blog_content or ""):
+        block = block.strip()
+        if not block or block.startswith(("#", "-", "*", ">", "!", "|", "```")) or re.match(r'\d+\.', block):
+            continue
+        return strip_markdown(block)
+    return ""
+
+
+def _phrase_count(phrase: str, text: str) -> int:
+    return len(re.findall(rf'(?<![a-z0-9]){re.escape(phrase)}(?![a-z0-9])', text))
+
+
+def _rank_tags(plain_text: str, headings: List[str], keywords: Iterable[str], topic: str) -> List[str]:
+    """
+    Ranks candidate tags by how often they occur in the post. Candidates are the
+    topic, the Datamuse keywords and frequent non-stopword terms (and bigrams) from
+    the headings and body; keywords that never appear in the post are discarded.
+    """
+    text = plain_text.lower()
+    tokens = re.findall(r"[a-z0-9][a-z0-9'-]*", text)
+    content_tokens = [t for t in tokens if t not in STOPWORDS and len(t) > 2 and not t.isdigit()]
+    term_counts = Counter(content_tokens)
+    bigram_counts = Counter(
+        f"{a} {b}" for a, b in zip(tokens, tokens[1:])
+        if a not in STOPWORDS and b not in STOPWORDS and len(a) > 2 and len(b) > 2
+    )
+
+    scores = {}
+    topic_phrase = re.sub(r'\s+', ' ', topic.lower()).strip()
+    topic_count = _phrase_count(topic_phrase, text) if topic_phrase else 0
+    if topic_count and len(topic_phrase.split()) <= 4:
+        # A short topic that the post actually uses ranks above every other candidate.
+        scores[topic_phrase] = topic_count + 1000
+    for keyword in keywords:
+        keyword = keyword.lower().strip()
+        count = _phrase_count(keyword, text) if keyword else 0
+        if count:
+            # Cross-checked keywords (researched AND used in the post) rank above plain body terms.
+            scores[keyword] = max(scores.get(keyword, 0), count * 2 + 100)
+    heading_terms = {t for h in headings for t in re.findall(r"[a-z0-9][a-z0-9'-]*", h.lower()) if t not in STOPWORDS}
+    for bigram, count in bigram_counts.most_common(20):
+        if count > 1:
+            scores.setdefault(bigram, count * 3)
+    for term, count in term_counts.most_common(30):
+        boost = 2 if term in heading_terms else 1
+        scores.setdefault(term, count * boost)
+
+    ranked = sorted(scores, key=lambda tag: scores[tag], reverse=True)
+    tags = []
+    for tag in ranked:
+        # Skip single words already covered by a chosen multi-word tag, and plural/singular duplicates.
+        if " " not in tag and any(tag in chosen.split() for chosen in tags):
+            continue
+        if any(tag.rstrip("s") == chosen.rstrip("s") for chosen in tags):
+            continue
+        tags.append(tag)
+        if len(tags) == MAX_TAGS:
+            break
+    return tags
+
+
+def generate_local_seo_metadata(blog_content: str, topic: str, keywords: Optional[Iterable[str]] = None) -> dict:
+    """
+    Computes SEO metadata locally instead of calling the SEO agent.
+
+    Returns the same keys as the seo_optimization_task JSON ("title",
+    "meta_description", "tags", "slug"): the title comes from the H1 (or the topic),
+    the meta description from the introduction, tags from term frequencies cross-
+    checked against the researched keywords, and the slug from the title.
+    """
+    h1_headings = extract_headings(blog_content, 1)
+    h2_headings = extract_headings(blog_content, 2)
+    plain_text = strip_markdown(blog_content)
+
+    title = _shorten_title(h1_headings[0] if h1_headings else topic.strip().title())
+
+    intro = _intro_paragraph(blog_content)
+    description_source = intro or " ".join(h2_headings) or title
+    meta_description = _summarize(description_source)
+
+    tags = _rank_tags(plain_text, h1_headings + h2_headings, keywords or [], topic)
+    if len(tags) < MIN_TAGS:
+        for heading in h2_headings:
+            candidate = slugify(heading, max_length=30).replace("-", " ")
+            if candidate and candidate not in tags:
+                tags.append(candidate)
+            if len(tags) >= MIN_TAGS:
+                break
+
+    return {
+        "title": title,
+        "meta_description": meta_description,
+        "tags": tags,
+        "slug": slugify(title),
+    }
+
+
+def parse_research_keywords(research_report: str) -> List[str]:
+    """Reads the keyword bullets under the '### Relevant Keywords' heading of the research report."""
+    match = re.search(r'#+\s*Relevant Keywords\s*\n(.*?)(?:\n#|\Z)', research_report or "", flags=re.DOTALL | re.IGNORECASE)
+    if not match:
+        return []
+    keywords = []
+    for line in match.group(1).splitlines():
+        line = strip_markdown(line).strip()
+        keywords.extend(k.strip() for k in line.split(",") if k.strip())
+    return keywords
+
+
+def _content_words(text: str) -> List[str]:
+    return [w.rstrip("s") for w in re.findall(r"[a-z0-9]+", (text or "").lower()) if w not in STOPWORDS]
+
+
+def _coverage(words: List[str], vocabulary: set) -> float:
+    return sum(word in vocabulary for word in words) / len(words) if words else 0.0
+
+
+def tags_in_post(tags: Iterable[str], blog_content: str) -> List[str]:
+    """The tags whose words all occur in the post (ignoring case and plural "s")."""
+    vocabulary = set(_content_words(strip_markdown(blog_content)))
+    return [tag for tag in tags if _coverage(_content_words(str(tag)), vocabulary) == 1.0]
+
+
+def validate_seo_metadata(metadata: dict, blog_content: str, topic: str):
+    """
+    Checks SEO metadata drafted before the post was written against the final post.
+
+    A tag counts as present if all its words occur in the post; absent tags are
+    dropped. The draft is rejected if it misses a field, if fewer than
+    MIN_TAG_COVERAGE of its tags are present, if its title is too long or its
+    words are mostly absent from the post, if the meta description is empty or too
+    long, or if the slug is not kebab-case or does not match the title and topic.
+    Returns (metadata with only the present tags, list of problems).
+    """
+    problems = []
+    if not isinstance(metadata, dict):
+        return metadata, ["not a JSON object"]
+    title, description, tags, slug = (metadata.get(key) for key in ("title", "meta_description", "tags", "slug"))
+    if not all(isinstance(value, str) and value.strip() for value in (title, description, slug)):
+        problems.append("missing title, meta description or slug")
+    if not isinstance(tags, list) or not tags:
+        problems.append("missing tags")
+    if problems:
+        return metadata, problems
+
+    vocabulary = set(_content_words(strip_markdown(blog_content)))
+    present = tags_in_post(tags, blog_content)
+    if len(present) < MIN_TAG_COVERAGE * len(tags):
+        problems.append(f"only {len(present)} of {len(tags)} tags appear in the post")
+    if len(title) > DRAFT_TITLE_MAX_CHARS:
+        problems.append(f"title is longer than {DRAFT_TITLE_MAX_CHARS} characters")
+    if _coverage(_content_words(title), vocabulary) < MIN_TITLE_COVERAGE:
+        problems.append("title does not match the post")
+    if len(description) > META_DESCRIPTION_MAX_CHARS:
+        problems.append(f"meta description is longer than {META_DESCRIPTION_MAX_CHARS} characters")
+    if not re.fullmatch(r'[a-z0-9]+(?:-[a-z0-9]+)*', slug) or len(slug) > SLUG_MAX_CHARS:
+        problems.append("slug is not a short kebab-case string")
+    elif _coverage(_content_words(slug.replace("-", " ")), set(_content_words(f"{title} {topic}"))) < MIN_TITLE_COVERAGE:
+        problems.append("slug does not match the title")
+    return {**metadata, "tags": present}, problems
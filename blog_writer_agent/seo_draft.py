@@ -0,0 +1,61 @@
+# src/blog_writer/seo_draft.py
+import json
+from typing import Optional
+from .context_budget import compact_research
+from .sections import agent_system_prompt
+from .seo import validate_seo_metadata
+from .telemetry import current_telemetry
+from .utils import run_in_thread, strip_code_fences
+
+
+def _draft_prompt(topic: str, tone: str, analysis: dict, research_report: Optional[str]) -> str:
+    outline = "\n".join(f"{i}. {heading}" for i, heading in enumerate(analysis.get("outline_headings") or [], start=1))
+    return (
+        f"Blog topic: '{topic}'\n"
+        f"Tone: {tone}\n"
+        f"Target audience: {analysis.get('target_audience', 'General readers')}\n"
+        f"Key takeaway: {analysis.get('key_takeaway', '')}\n\n"
+        f"Outline of the post (H2 sections, in order):\n{outline or 'Not available.'}\n\n"
+        f"Research findings (news context and keywords):\n{compact_research(research_report or '') or 'None provided.'}\n\n"
+        "The post is being written from this outline and research right now. Draft its SEO metadata ahead of time:\n"
+        "1. **Title:** a compelling, SEO-friendly title (ideally under 60 chars) built from the topic's own words.\n"
+        "2. **Meta Description:** an engaging summary of the post's value (MAX 160 chars).\n"
+        "3. **Tags/Keywords:** 5-7 tags made only of words the post is certain to use: the topic, the outline headings and the researched keywords.\n"
+        "4. **URL Slug:** a short, lowercase, kebab-case slug made from the title.\n"
+        'Return ONLY a valid JSON string containing the keys "title", "meta_description", "tags" (list of strings), and "slug".'
+    )
+
+
+async def draft_seo_metadata(llm, seo_config: dict, topic: str, tone: str, analysis: dict, research_report: Optional[str]) -> str:
+    """
+    Asks the SEO optimizer's model for the post's metadata from the topic analysis
+    and research alone, so it can run while the writer is still working. Returns
+    the raw answer, to be checked with `accept_seo_draft` once the post exists.
+    """
+    messages = [
+        {"role": "system", "content": agent_system_prompt(seo_config, {"topic": topic, "tone": tone})},
+        {"role": "user", "content": _draft_prompt(topic, tone, analysis, research_report)},
+    ]
+    return await run_in_thread(llm.call, messages)
+
+
+def accept_seo_draft(raw_draft: Optional[str], blog_content: str, topic: str) -> Optional[str]:
+    """
+    The draft as SEO task output (a JSON string, absent tags dropped) if it passes
+    `validate_seo_metadata` against the final post, else None. The verdict is
+    printed and recorded as a `seo_draft_checked` telemetry event.
+    """
+    try:
+        draft = json.loads(strip_code_fences(raw_draft or ""))
+    except json.JSONDecodeError:
+        draft, problems = None, ["not valid JSON"]
+    else:
+        draft, problems = validate_seo_metadata(draft, blog_content, topic)
+    if problems:
+        print(f"🔮 Speculative SEO draft rejected ({'; '.join(problems)}); running the SEO agent.")
+    else:
+        print("🔮 Speculative SEO draft accepted; skipping the SEO agent.")
+    telemetry = current_telemetry()
+    if telemetry is not None:
+        telemetry.emit("seo_draft_checked", stage=telemetry.current_stage, accepted=not problems, problems=problems)
+    return None if problems else json.dumps(draft, ensure_ascii=False)
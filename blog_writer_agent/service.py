@@ -0,0 +1,360 @@
+# src/blog_writer/service.py
+import asyncio
+import json
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, fields
+from functools import partial
+from typing import Dict, List, Optional, Set
+from aiohttp import web
+from dotenv import load_dotenv
+from .batch import THREADS_PER_RUN
+from .checkpoints import load_checkpoint
+from .job_queue import DONE, FAILED, FINISHED, QUEUED, JobQueue
+from .pipeline import SEO_MODES, WRITER_MODES, BlogRunResult, PipelineOptions, generate_blog, resume_blog, warm_up
+from .store import get_output_store
+from .telemetry import RunTelemetry
+from .tools import aclose_async_client
+from .utils import run_in_thread, set_thread_pool
+
+load_dotenv()
+
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8080"))
+# Generations that run at once; the rest wait in the queue.
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "4"))
+# Submissions are refused with 503 while this many jobs are waiting.
+SERVICE_MAX_QUEUED = int(os.getenv("SERVICE_MAX_QUEUED", "1000"))
+# Comment lines sent on idle event streams so proxies keep them open.
+SSE_HEARTBEAT_SECONDS = 15
+
+DEFAULT_TONE = "Educational"
+# Request fields accepted in a submission's "options", with the type (or choices) of each.
+OPTION_TYPES = {"prefetch": bool, "news_fanout": bool, "writer_mode": WRITER_MODES, "seo_mode": SEO_MODES, "section_transitions": bool, "force_regenerate": bool}
+
+
+def parse_options(options: Optional[dict]) -> PipelineOptions:
+    """PipelineOptions from a submission's "options" object. Raises ValueError on unknown fields or bad values."""
+    options = options or {}
+    if not isinstance(options, dict):
+        raise ValueError("'options' must be an object.")
+    for name, value in options.items():
+        expected = OPTION_TYPES.get(name)
+        if expected is None:
+            raise ValueError(f"Unknown option '{name}'. Known options: {', '.join(OPTION_TYPES)}.")
+        if isinstance(expected, tuple) and value not in expected:
+            raise ValueError(f"Option '{name}' must be one of: {', '.join(expected)}.")
+        if expected is bool and not isinstance(value, bool):
+            raise ValueError(f"Option '{name}' must be true or false.")
+    return PipelineOptions(**options)
+
+
+class BlogService:
+    """
+    Runs queued blog generations on `workers` asyncio workers in the service's event
+    loop and publishes their telemetry to event-stream subscribers.
+
+    Jobs live in a JobQueue, so queued work and finished results survive a restart.
+    A job's run ID is its job ID: a job interrupted by a restart is requeued on
+    start-up and resumed from its checkpoint, re-running only the unfinished stages.
+    Successful posts are saved to the output store like CLI runs.
+    """
+
+    def __init__(self, queue: Optional[JobQueue] = None, workers: int = SERVICE_WORKERS, max_queued: int = SERVICE_MAX_QUEUED):
+        self.queue = queue or JobQueue()
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        # Telemetry of the running jobs, for their current stage and for replaying events to late subscribers
+        self._running: Dict[str, RunTelemetry] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._worker_tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        # Crew kickoffs (and section drafting) run in worker threads, as in batch mode.
+        self._pool = ThreadPoolExecutor(max_workers=self.workers * THREADS_PER_RUN, thread_name_prefix="blog-service")
+        self._wakeup = asyncio.Condition()
+        requeued = self.queue.requeue_interrupted()
+        if requeued:
+            print(f"🔁 Requeued {requeued} jobs interrupted by the last shutdown")
+        # Load crewai and friends in the background so the first job does not pay for the imports
+        self._loop.run_in_executor(self._pool, warm_up)
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        print(f"🧵 Blog service started with {self.workers} workers ({self.queue.counts().get(QUEUED, 0)} jobs queued)")
+
+    async def stop(self):
+        """Stops the workers. Jobs still running stay marked as running and are resumed on the next start."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        await aclose_async_client()
+        self.queue.close()
+        if self._pool is not None:
+            # Crews still running finish in the background; their jobs are resumed on the next start.
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def submit(self, topic: str, tone: str, options: PipelineOptions) -> dict:
+        job = self.queue.enqueue(topic, tone, asdict(options))
+        async with self._wakeup:
+            self._wakeup.notify()
+        print(f"🧵 Queued job {job['id']} for '{topic}'")
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        if not self.queue.cancel(job_id):
+            return False
+        self._publish_status(self.queue.get(job_id))
+        return True
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "running": len(self._running), "jobs": self.queue.counts()}
+
+    def is_full(self) -> bool:
+        return self.queue.counts().get(QUEUED, 0) >= self.max_queued
+
+    def job_view(self, job: dict) -> dict:
+        """The public status of a job (without its result)."""
+        view = {key: job[key] for key in ("id", "topic", "tone", "options", "status", "attempts", "error", "submitted_at", "started_at", "finished_at")}
+        telemetry = self._running.get(job["id"])
+        if job["status"] == QUEUED:
+            view["queue_position"] = self.queue.queue_position(job["id"])
+        elif telemetry is not None:
+            view["active_stages"] = list(telemetry.active_stages)
+            view["completed_stages"] = list(telemetry.completed_stages)
+        view["links"] = {name: f"/jobs/{job['id']}{suffix}" for name, suffix in (("self", ""), ("result", "/result"), ("events", "/events"))}
+        return view
+
+    async def _worker(self):
+        set_thread_pool(self._pool)
+        while True:
+            async with self._wakeup:
+                job = self.queue.claim_next()
+                while job is None:
+                    await self._wakeup.wait()
+                    job = self.queue.claim_next()
+            await self._run_job(job)
+
+    async def _run_job(self, job: dict):
+        telemetry = RunTelemetry(run_id=job["id"], listener=partial(self._publish_threadsafe, job["id"]))
+        self._running[job["id"]] = telemetry
+        self._publish_status(job)
+        print(f"🧵 Job {job['id']} started for '{job['topic']}' (attempt {job['attempts']})")
+        try:
+            result = await self._generate(job, telemetry)
+            payload = await run_in_thread(self._save_result, result)
+            self.queue.finish(job["id"], DONE if result.ok else FAILED, payload, result.error or result.metadata.get("error"))
+        except Exception as e:
+            traceback.print_exc()
+            self.queue.finish(job["id"], FAILED, error=f"{type(e).__name__}: {e}")
+        finally:
+            self._running.pop(job["id"], None)
+        finished = self.queue.get(job["id"])
+        print(f"🧵 Job {job['id']} {finished['status']} in {finished['finished_at'] - finished['started_at']:.1f}s")
+        self._publish_status(finished)
+
+    async def _generate(self, job: dict, telemetry: RunTelemetry) -> BlogRunResult:
+        if job["attempts"] > 1 and load_checkpoint(job["id"]) is not None:
+            return await resume_blog(job["id"], telemetry=telemetry)
+        known = {f.name for f in fields(PipelineOptions)}
+        options = PipelineOptions(**{key: value for key, value in job["options"].items() if key in known})
+        return await generate_blog(job["topic"], job["tone"], options, telemetry=telemetry)
+
+    def _save_result(self, result: BlogRunResult) -> dict:
+        """Saves a successful post to the output store and returns the job's stored result."""
+        payload = {
+            "run_id": result.run_id,
+            "blog_content": result.blog_content,
+            "metadata": result.metadata,
+            "timing": result.timing,
+            "duration_seconds": round(result.duration_seconds, 3),
+            "reused_from": result.reused_from,
+            "post": None,
+        }
+        if not result.ok:
+            payload["raw_blog_output"] = result.raw_blog_output
+            return payload
+        try:
+            record = get_output_store().save_post(result.topic, result.tone, result.blog_content, result.metadata)
+            payload["post"] = {key: record[key] for key in ("slug", "file_base", "markdown_path", "metadata_path")}
+        except Exception as e:
+            print(f"❌ Error saving '{result.topic}' to the output store: {e}")
+        return payload
+
+    # --- Event streams ---
+    def _publish_threadsafe(self, job_id: str, event: dict):
+        # Telemetry listeners are called from the crew's worker threads.
+        self._loop.call_soon_threadsafe(self._publish, job_id, event)
+
+    def _publish(self, job_id: str, event: dict):
+        for subscriber in self._subscribers.get(job_id, ()):
+            subscriber.put_nowait(event)
+
+    def _publish_status(self, job: dict):
+        self._publish(job["id"], {"event": "job_status", **self.job_view(job)})
+
+    async def stream_events(self, request: web.Request, job: dict) -> web.StreamResponse:
+        """
+        Streams a job's events as server-sent events: its current status, the telemetry
+        events recorded so far, then new ones (stage_started/stage_completed, llm_call,
+        tool_call, ...) until a final job_status event.
+        """
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        await response.prepare(request)
+        subscriber: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job["id"], set()).add(subscriber)
+        try:
+            # Re-read after subscribing, so no event falls between the snapshot and the stream.
+            job = self.queue.get(job["id"]) or job
+            telemetry = self._running.get(job["id"])
+            replayed = list(telemetry.events) if telemetry is not None else []
+            replayed_ids = {id(event) for event in replayed}
+            for event in [{"event": "job_status", **self.job_view(job)}, *replayed]:
+                await _send_event(response, event)
+            if job["status"] in FINISHED:
+                return response
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    await response.write(b": keep-alive\n\n")
+                    continue
+                if id(event) in replayed_ids:
+                    continue
+                await _send_event(response, event)
+                if event["event"] == "job_status" and event["status"] in FINISHED:
+                    return response
+        except ConnectionResetError:
+            return response
+        finally:
+            self._subscribers[job["id"]].discard(subscriber)
+            if not self._subscribers[job["id"]]:
+                del self._subscribers[job["id"]]
+
+
+async def _send_event(response: web.StreamResponse, event: dict):
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    await response.write(f"event: {event['event']}\ndata: {data}\n\n".encode("utf-8"))
+
+
+def _error(status: int, message: str, **headers) -> web.Response:
+    return web.json_response({"error": message}, status=status, headers=headers or None)
+
+
+# --- HTTP handlers ---
+routes = web.RouteTableDef()
+SERVICE_KEY = web.AppKey("service", BlogService)
+
+
+def _service(request: web.Request) -> BlogService:
+    return request.app[SERVICE_KEY]
+
+
+def _job_or_404(request: web.Request) -> Optional[dict]:
+    return _service(request).queue.get(request.match_info["job_id"])
+
+
+@routes.post("/jobs")
+async def submit_job(request: web.Request) -> web.Response:
+    """Queues a post: {"topic": "...", "tone": "...", "options": {"writer_mode": "sections", ...}}."""
+    service = _service(request)
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return _error(400, "Request body must be JSON.")
+    if not isinstance(body, dict):
+        return _error(400, "Request body must be a JSON object.")
+    topic, tone = body.get("topic"), body.get("tone") or DEFAULT_TONE
+    if not isinstance(topic, str) or not topic.strip():
+        return _error(400, "'topic' is required.")
+    if not isinstance(tone, str):
+        return _error(400, "'tone' must be a string.")
+    try:
+        options = parse_options(body.get("options"))
+    except ValueError as e:
+        return _error(400, str(e))
+    if service.is_full():
+        return _error(503, f"The queue is full ({service.max_queued} jobs waiting); retry later.", **{"Retry-After": "30"})
+    job = await service.submit(topic.strip(), tone.strip(), options)
+    return web.json_response(service.job_view(job), status=202, headers={"Location": f"/jobs/{job['id']}"})
+
+
+@routes.get("/jobs")
+async def list_jobs(request: web.Request) -> web.Response:
+    service = _service(request)
+    try:
+        limit = min(int(request.query.get("limit", 100)), 1000)
+        offset = int(request.query.get("offset", 0))
+    except ValueError:
+        return _error(400, "'limit' and 'offset' must be integers.")
+    jobs = service.queue.find(status=request.query.get("status"), limit=limit, offset=offset)
+    return web.json_response({"jobs": [service.job_view(job) for job in jobs]})
+
+
+@routes.get("/jobs/{job_id}")
+async def job_status(request: web.Request) -> web.Response:
+    job = _job_or_404(request)
+    if job is None:
+        return _error(404, "Unknown job.")
+    return web.json_response(_service(request).job_view(job))
+
+
+@routes.get("/jobs/{job_id}/result")
+async def job_result(request: web.Request) -> web.Response:
+    """The post and metadata of a finished job; 409 while it is queued or running."""
+    job = _job_or_404(request)
+    if job is None:
+        return _error(404, "Unknown job.")
+    if job["status"] not in FINISHED:
+        return web.json_response(_service(request).job_view(job), status=409)
+    return web.json_response({"id": job["id"], "status": job["status"], "error": job["error"], **(job["result"] or {})})
+
+
+@routes.get("/jobs/{job_id}/events")
+async def job_events(request: web.Request) -> web.StreamResponse:
+    job = _job_or_404(request)
+    if job is None:
+        return _error(404, "Unknown job.")
+    return await _service(request).stream_events(request, job)
+
+
+@routes.delete("/jobs/{job_id}")
+async def cancel_job(request: web.Request) -> web.Response:
+    service = _service(request)
+    job = _job_or_404(request)
+    if job is None:
+        return _error(404, "Unknown job.")
+    if not service.cancel(job["id"]):
+        return _error(409, f"Job is {job['status']}; only queued jobs can be cancelled.")
+    return web.json_response(service.job_view(service.queue.get(job["id"])))
+
+
+@routes.get("/health")
+async def health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok", **_service(request).stats()})
+
+
+def create_app(service: Optional[BlogService] = None) -> web.Application:
+    """The aiohttp application; its workers start and stop with the app."""
+    app = web.Application()
+    app[SERVICE_KEY] = service or BlogService()
+    app.add_routes(routes)
+
+    async def on_startup(app: web.Application):
+        await app[SERVICE_KEY].start()
+
+    async def on_cleanup(app: web.Application):
+        await app[SERVICE_KEY].stop()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def run_service(host: str = SERVICE_HOST, port: int = SERVICE_PORT, workers: int = SERVICE_WORKERS):
+    """Serves the API until interrupted."""
+    web.run_app(create_app(BlogService(workers=workers)), host=host, port=port, print=lambda message: print(f"🌐 {message}"))
@@ -0,0 +1,253 @@
+# src/blog_writer/store.py
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional
+from dotenv import load_dotenv
+from .cache import normalize_query
+from .utils import OUTPUT_DIR, atomic_write_text, sanitize_filename, save_json, save_markdown
+
+load_dotenv()
+
+# The index lives next to the files it describes unless overridden.
+OUTPUT_INDEX_PATH = os.getenv("OUTPUT_INDEX_PATH") or None
+
+_COLUMNS = ("id", "file_base", "slug", "title", "topic", "tone", "meta_description", "content_hash", "created_at", "updated_at")
+# Tags come back with each row (joined by the unit separator) rather than one query per post.
+_SELECT = (
+    f"SELECT {', '.join(_COLUMNS)},"
+    " (SELECT group_concat(tag, char(31)) FROM (SELECT tag FROM post_tags WHERE post_id = posts.id ORDER BY tag))"
+    " FROM posts"
+)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode('utf-8')).hexdigest()
+
+
+class OutputStore:
+    """
+    Generated posts in `outputs/`, written atomically and indexed in SQLite.
+
+    Each post is a `<name>_blog.md` / `<name>_metadata.json` pair as before; the
+    index (`.index.sqlite3` in the same directory) records slug, title, topic,
+    tone, tags, content hash and timestamps, so posts can be looked up by tag or
+    slug and exported without scanning or parsing the directory. Regenerating a
+    topic overwrites its files and index row; a different topic whose sanitized
+    filename collides gets a short hash suffix instead of overwriting.
+    """
+
+    def __init__(self, root: Optional[Path] = None, db_path: Optional[Path] = None):
+        self.root = Path(root) if root else OUTPUT_DIR
+        self.db_path = Path(db_path or OUTPUT_INDEX_PATH or self.root / ".index.sqlite3")
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            is_new = not self.db_path.exists()
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                " id INTEGER PRIMARY KEY, file_base TEXT NOT NULL UNIQUE, topic_key TEXT NOT NULL,"
+                " slug TEXT, title TEXT, topic TEXT, tone TEXT, meta_description TEXT,"
+                " content_hash TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS idx_posts_slug ON posts (slug);"
+                "CREATE INDEX IF NOT EXISTS idx_posts_topic ON posts (topic_key);"
+                "CREATE INDEX IF NOT EXISTS idx_posts_updated ON posts (updated_at);"
+                "CREATE TABLE IF NOT EXISTS post_tags ("
+                " post_id INTEGER NOT NULL REFERENCES posts (id) ON DELETE CASCADE, tag TEXT NOT NULL,"
+                " PRIMARY KEY (post_id, tag));"
+                "CREATE INDEX IF NOT EXISTS idx_post_tags_tag ON post_tags (tag);"
+            )
+            self._conn.commit()
+            if is_new:
+                self._reindex_locked()
+        return self._conn
+
+    def _file_base(self, conn: sqlite3.Connection, topic: str) -> str:
+        """
+        The `<name>` for a topic's files: the name it was saved under before, else its
+        sanitized topic, plus a hash suffix if another topic already owns that name
+        (compared case-insensitively, for case-insensitive filesystems).
+        """
+        topic_key = normalize_query(topic)
+        row = conn.execute("SELECT file_base FROM posts WHERE topic_key = ? ORDER BY id LIMIT 1", (topic_key,)).fetchone()
+        if row is not None:
+            return row[0]
+        base = sanitize_filename(topic)
+        taken = conn.execute("SELECT 1 FROM posts WHERE lower(file_base) = lower(?)", (base,)).fetchone()
+        return f"{base}_{content_hash(topic_key)[:8]}" if taken else base
+
+    def save_post(self, topic: str, tone: str, blog_content: str, metadata: dict) -> dict:
+        """Writes the post's markdown and metadata files atomically and indexes them. Returns the index record."""
+        with self._lock:
+            conn = self._connect()
+            file_base = self._file_base(conn, topic)
+            if save_markdown(f"{file_base}_blog", blog_content, self.root) is None:
+                raise OSError(f"Could not write {file_base}_blog.md")
+            # topic/tone let reindex() rebuild the index from the files alone
+            if save_json(f"{file_base}_metadata", {**metadata, "topic": topic, "tone": tone}, self.root) is None:
+                raise OSError(f"Could not write {file_base}_metadata.json")
+            self._index_locked(conn, file_base, topic, tone, blog_content, metadata)
+            conn.commit()
+            return self._get_locked(conn, file_base)
+
+    def _index_locked(self, conn: sqlite3.Connection, file_base: str, topic: str, tone: Optional[str], blog_content: str, metadata: dict, now: Optional[float] = None):
+        now = now or time.time()
+        conn.execute(
+            "INSERT INTO posts (file_base, topic_key, slug, title, topic, tone, meta_description, content_hash, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (file_base) DO UPDATE SET topic_key = excluded.topic_key, slug = excluded.slug,"
+            " title = excluded.title, topic = excluded.topic, tone = excluded.tone,"
+            " meta_description = excluded.meta_description, content_hash = excluded.content_hash,"
+            " updated_at = excluded.updated_at",
+            (
+                file_base, normalize_query(topic), metadata.get("slug"), metadata.get("title"), topic, tone,
+                metadata.get("meta_description"), content_hash(blog_content), now, now,
+            ),
+        )
+        post_id = conn.execute("SELECT id FROM posts WHERE file_base = ?", (file_base,)).fetchone()[0]
+        conn.execute("DELETE FROM post_tags WHERE post_id = ?", (post_id,))
+        tags = {normalize_query(str(tag)) for tag in metadata.get("tags") or [] if str(tag).strip()}
+        conn.executemany("INSERT INTO post_tags (post_id, tag) VALUES (?, ?)", [(post_id, tag) for tag in sorted(tags)])
+
+    def _row_to_record(self, row) -> dict:
+        record = dict(zip(_COLUMNS, row))
+        record["tags"] = row[len(_COLUMNS)].split("\x1f") if row[len(_COLUMNS)] else []
+        record["markdown_path"] = str(self.root / f"{record['file_base']}_blog.md")
+        record["metadata_path"] = str(self.root / f"{record['file_base']}_metadata.json")
+        return record
+
+    def _get_locked(self, conn: sqlite3.Connection, file_base: str) -> Optional[dict]:
+        row = conn.execute(f"{_SELECT} WHERE file_base = ?", (file_base,)).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def find(self, tag: Optional[str] = None, slug: Optional[str] = None, topic: Optional[str] = None, limit: Optional[int] = 100, offset: int = 0) -> List[dict]:
+        """Index records matching every given filter, most recently updated first."""
+        clauses, params = [], []
+        if tag:
+            clauses.append("id IN (SELECT post_id FROM post_tags WHERE tag = ?)")
+            params.append(normalize_query(tag))
+        if slug:
+            clauses.append("slug = ?")
+            params.append(slug)
+        if topic:
+            clauses.append("topic_key = ?")
+            params.append(normalize_query(topic))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"{_SELECT}{where} ORDER BY updated_at DESC, id DESC LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._connect().execute(query, (*params, -1 if limit is None else limit, offset)).fetchall()
+        return [self._row_to_record(row) for row in rows]
+
+    def get_by_slug(self, slug: str) -> Optional[dict]:
+        found = self.find(slug=slug, limit=1)
+        return found[0] if found else None
+
+    def tag_counts(self) -> dict:
+        with self._lock:
+            rows = self._connect().execute("SELECT tag, COUNT(*) FROM post_tags GROUP BY tag ORDER BY COUNT(*) DESC, tag").fetchall()
+        return dict(rows)
+
+    def iter_posts(self, **filters) -> Iterator[dict]:
+        """Index records plus their markdown and metadata, read from disk one post at a time."""
+        for record in self.find(limit=None, **filters):
+            try:
+                record["markdown"] = Path(record["markdown_path"]).read_text(encoding='utf-8')
+                record["metadata"] = json.loads(Path(record["metadata_path"]).read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: Skipping '{record['file_base']}': {e}")
+                continue
+            yield record
+
+    def export_jsonl(self, path: Path, **filters) -> int:
+        """Writes matching posts (record, markdown and metadata) as JSON lines to `path`, atomically. Returns the count."""
+        lines = [json.dumps(record, ensure_ascii=False) for record in self.iter_posts(**filters)]
+        atomic_write_text(Path(path), "\n".join(lines) + ("\n" if lines else ""))
+        return len(lines)
+
+    def rescore(self, workers: Optional[int] = None, batch_size: int = 1000, **filters) -> int:
+        """
+        Recomputes the text metrics (reading time, Flesch score, word count, tag density)
+        in the metadata of matching posts from their markdown, `batch_size` posts at a
+        time, and refreshes their index entries. Returns the number of posts updated.
+        """
+        from .analytics import analyze_many
+        posts = self.iter_posts(**filters)
+        count = 0
+        while True:
+            batch = list(itertools.islice(posts, batch_size))
+            if not batch:
+                return count
+            keywords = [post["metadata"].get("tags") if isinstance(post["metadata"].get("tags"), list) else None for post in batch]
+            scores = analyze_many([post["markdown"] for post in batch], keywords, workers=workers)
+            with self._lock:
+                conn = self._connect()
+                for post, stats in zip(batch, scores):
+                    metadata = {**post["metadata"], **stats.as_metadata()}
+                    try:
+                        atomic_write_text(Path(post["metadata_path"]), json.dumps(metadata, indent=2, ensure_ascii=False))
+                    except OSError as e:
+                        print(f"Warning: Could not update '{post['file_base']}' metadata: {e}")
+                        continue
+                    # Keep the index in step with the rewritten file; updated_at is kept so rescoring does not reorder posts.
+                    self._index_locked(conn, post["file_base"], post["topic"], post["tone"], post["markdown"], metadata, now=post["updated_at"])
+                    count += 1
+                conn.commit()
+
+    def reindex(self) -> int:
+        """Rebuilds the index from the `*_metadata.json` / `*_blog.md` pairs on disk. Returns the number of posts indexed."""
+        with self._lock:
+            self._connect()
+            return self._reindex_locked()
+
+    def _reindex_locked(self) -> int:
+        conn = self._conn
+        conn.execute("DELETE FROM posts")
+        count = 0
+        for metadata_path in sorted(self.root.glob("*_metadata.json")):
+            file_base = metadata_path.name[:-len("_metadata.json")]
+            markdown_path = self.root / f"{file_base}_blog.md"
+            if not markdown_path.exists():
+                continue
+            try:
+                metadata = json.loads(metadata_path.read_text(encoding='utf-8'))
+                blog_content = markdown_path.read_text(encoding='utf-8')
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: Could not index '{file_base}': {e}")
+                continue
+            # Files saved before the index existed only carry the topic in their name.
+            topic = metadata.get("topic") or file_base.replace("_", " ")
+            self._index_locked(conn, file_base, topic, metadata.get("tone"), blog_content, metadata, now=metadata_path.stat().st_mtime)
+            count += 1
+        conn.commit()
+        return count
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_store: Optional[OutputStore] = None
+_store_lock = threading.Lock()
+
+
+def get_output_store() -> OutputStore:
+    """The process-wide store for OUTPUT_DIR, opened on first use."""
+    global _default_store
+    if _default_store is None:
+        with _store_lock:
+            if _default_store is None:
+                _default_store = OutputStore()
+    return _default_store
@@ -0,0 +1,97 @@
+# src/blog_writer/streaming.py
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+
+def _visible_answer(raw: str) -> str:
+    """
+    The part of a (partial) writer response that belongs to the blog post: the text
+    after "Final Answer:" with a wrapping code fence removed. Trailing backticks and
+    whitespace are held back until more text arrives, since they may be a closing fence.
+    """
+    if FINAL_ANSWER_MARKER not in raw:
+        return ""
+    answer = raw.split(FINAL_ANSWER_MARKER)[-1].lstrip()
+    if answer.startswith("```"):
+        if "\n" not in answer:
+            return ""
+        answer = answer.split("\n", 1)[1]
+    return re.sub(r'[`\s]+$', '', answer)
+
+
+class WriterStream:
+    """
+    Receives the writer agent's tokens while the post is being generated.
+
+    `on_delta` is called with each newly visible piece of the post; `text` holds
+    everything visible so far. When the run finishes, `finish()` is called with the
+    exact markdown that gets saved: any held-back tail is emitted through
+    `on_delta`, or, if the final post diverges from what was streamed (for example
+    the agent retried after a formatting error), `on_reset` receives the full post.
+    Callbacks run in the crew's worker thread.
+    """
+
+    def __init__(
+        self,
+        on_delta: Optional[Callable[[str], None]] = None,
+        on_reset: Optional[Callable[[str], None]] = None,
+    ):
+        self.on_delta = on_delta
+        self.on_reset = on_reset
+        self.text = ""
+        self.final_text: Optional[str] = None
+        self._raw = ""
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.final_text is not None
+
+    def start_call(self):
+        """A new LLM call for the writer begins; its raw text replaces the previous attempt's."""
+        with self._lock:
+            self._raw = ""
+
+    def feed(self, chunk: str):
+        with self._lock:
+            self._raw += chunk
+            visible = _visible_answer(self._raw)
+            if not visible.startswith(self.text) or len(visible) == len(self.text):
+                return
+            delta, self.text = visible[len(self.text):], visible
+        if self.on_delta:
+            self.on_delta(delta)
+
+    def finish(self, final_text: str):
+        with self._lock:
+            final_text = final_text or ""
+            streamed, self.final_text, self.text = self.text, final_text, final_text
+        if final_text.startswith(streamed):
+            if final_text != streamed and self.on_delta:
+                self.on_delta(final_text[len(streamed):])
+        elif self.on_reset:
+            self.on_reset(final_text)
+
+
+# The stream of the run whose writer is currently generating. run_in_thread copies
+# the context, so only the crew worker thread of that run sees it.
+_active_stream: ContextVar[Optional[WriterStream]] = ContextVar("active_writer_stream", default=None)
+
+
+def get_active_stream() -> Optional[WriterStream]:
+    return _active_stream.get()
+
+
+@contextmanager
+def streaming_to(stream: Optional[WriterStream]):
+    """Routes the LLM calls made in this context (and threads started from it) to `stream`."""
+    token = _active_stream.set(stream)
+    try:
+        yield stream
+    finally:
+        _active_stream.reset(token)
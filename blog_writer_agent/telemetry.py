@@ -0,0 +1,209 @@
+# src/blog_writer/telemetry.py
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Optional JSON-lines file that receives every telemetry event of every run.
+TELEMETRY_EVENTS_FILE = os.getenv("TELEMETRY_EVENTS_FILE") or None
+
+STAGE_LABELS = {
+    "topic_analysis": "🧠 Analyzing topic...",
+    "prefetch": "📡 Fetching news and keywords...",
+    "news_fanout": "📰 Searching news for each section...",
+    "research": "📚 Researching...",
+    "writing": "✍️ Writing content...",
+    "seo_draft": "🔮 Drafting SEO metadata...",
+    "seo": "🔍 Optimizing for SEO...",
+}
+
+_events_file_lock = threading.Lock()
+
+# Stage of the current execution context. Stages of one run can overlap (the prefetch
+# runs alongside the topic analysis, the SEO draft alongside the writing), so each
+# asyncio task and worker thread records its events under its own stage.
+_current_stage: ContextVar[Optional[str]] = ContextVar("current_stage", default=None)
+
+
+def set_events_file(path: Optional[str]):
+    """Appends all telemetry events to `path` as JSON lines (None disables the file)."""
+    global TELEMETRY_EVENTS_FILE
+    TELEMETRY_EVENTS_FILE = path
+
+
+def _write_event_line(event: dict):
+    if not TELEMETRY_EVENTS_FILE:
+        return
+    try:
+        with _events_file_lock, open(TELEMETRY_EVENTS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+    except OSError as e:
+        print(f"Warning: Could not write telemetry event to {TELEMETRY_EVENTS_FILE}. Error: {e}")
+
+
+class RunTelemetry:
+    """
+    Collects the timing events of one blog generation run: stage wall times, LLM
+    call latencies and token counts, tool call latencies and outcomes, and the
+    input tokens saved by compacting task contexts.
+
+    Events are plain JSON-serializable dicts. They are kept in `events`, passed to
+    `listener` (called from whichever thread records them) and appended to
+    TELEMETRY_EVENTS_FILE when it is set. `active_stages` (in start order) and
+    `completed_stages` can be polled from any thread to show progress.
+    """
+
+    def __init__(self, run_id: Optional[str] = None, listener: Optional[Callable[[dict], None]] = None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.listener = listener
+        self.events: List[dict] = []
+        self.active_stages: List[str] = []
+        self.completed_stages: List[str] = []
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def emit(self, event_type: str, **fields) -> dict:
+        event = {
+            "event": event_type,
+            "run_id": self.run_id,
+            "timestamp": round(time.time(), 3),
+            "elapsed_seconds": round(time.perf_counter() - self._started, 3),
+            **fields,
+        }
+        with self._lock:
+            self.events.append(event)
+        _write_event_line(event)
+        if self.listener:
+            self.listener(event)
+        return event
+
+    @property
+    def current_stage(self) -> Optional[str]:
+        """The stage the calling task or thread runs in, for the events it records."""
+        return _current_stage.get()
+
+    @contextmanager
+    def stage(self, name: str, **fields):
+        """
+        Times one pipeline stage, emitting stage_started and stage_completed (with its
+        outcome). Events recorded in the block (and in tasks and threads it starts) belong to it.
+        """
+        token = _current_stage.set(name)
+        with self._lock:
+            self.active_stages.append(name)
+        self.emit("stage_started", stage=name, **fields)
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            self.emit("stage_completed", stage=name, seconds=round(time.perf_counter() - start, 3), outcome=outcome, **fields)
+            with self._lock:
+                self.active_stages.remove(name)
+                self.completed_stages.append(name)
+            _current_stage.reset(token)
+
+    def record_llm_call(self, model: str, seconds: float, prompt_tokens=None, completion_tokens=None, cached=False, streamed=False):
+        self.emit(
+            "llm_call",
+            stage=self.current_stage,
+            model=model,
+            seconds=round(seconds, 3),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached=cached,
+            streamed=streamed,
+        )
+
+    def record_tool_call(self, tool: str, seconds: float, outcome: str, query: Optional[str] = None):
+        self.emit("tool_call", stage=self.current_stage, tool=tool, seconds=round(seconds, 3), outcome=outcome, query=query)
+
+    def summary(self) -> dict:
+        """Aggregates the events into the timing summary stored on the run result."""
+        with self._lock:
+            events = list(self.events)
+        stages = {}
+        llm = {"calls": 0, "cache_hits": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0, "fallbacks": 0, "models": {}}
+        tools = {}
+        context = {"compactions": 0, "tokens_before": 0, "tokens_after": 0, "tokens_saved": 0}
+        for event in events:
+            if event["event"] == "stage_completed":
+                stages[event["stage"]] = round(stages.get(event["stage"], 0.0) + event["seconds"], 3)
+            elif event["event"] == "llm_call":
+                if event["cached"]:
+                    llm["cache_hits"] += 1
+                    continue
+                llm["calls"] += 1
+                llm["seconds"] += event["seconds"]
+                llm["models"][event["model"]] = llm["models"].get(event["model"], 0) + 1
+                llm["prompt_tokens"] += event["prompt_tokens"] or 0
+                llm["completion_tokens"] += event["completion_tokens"] or 0
+            elif event["event"] == "llm_fallback":
+                llm["fallbacks"] += 1
+            elif event["event"] == "context_compacted":
+                context["compactions"] += 1
+                context["tokens_before"] += event["tokens_before"]
+                context["tokens_after"] += event["tokens_after"]
+                context["tokens_saved"] += event["tokens_before"] - event["tokens_after"]
+            elif event["event"] == "tool_call":
+                stats = tools.setdefault(event["tool"], {"calls": 0, "errors": 0, "cache_hits": 0, "memo_hits": 0, "seconds": 0.0})
+                stats["calls"] += 1
+                stats["seconds"] = round(stats["seconds"] + event["seconds"], 3)
+                if event["outcome"] == "error":
+                    stats["errors"] += 1
+                elif event["outcome"] == "cache_hit":
+                    stats["cache_hits"] += 1
+                elif event["outcome"] == "memo":
+                    stats["memo_hits"] += 1
+        llm["seconds"] = round(llm["seconds"], 3)
+        return {
+            "run_id": self.run_id,
+            "total_seconds": round(time.perf_counter() - self._started, 3),
+            "stages": stages,
+            "llm": llm,
+            "tools": tools,
+            "context": context,
+        }
+
+
+# Telemetry of the current run. run_in_thread copies the context, so the crew worker
+# threads and tool calls of each run record into the run that started them.
+_run_telemetry: ContextVar[Optional[RunTelemetry]] = ContextVar("run_telemetry", default=None)
+
+
+def start_run_telemetry(telemetry: Optional[RunTelemetry] = None) -> RunTelemetry:
+    """Makes `telemetry` (or a new RunTelemetry) the recorder for the current run and returns it."""
+    telemetry = telemetry or RunTelemetry()
+    _run_telemetry.set(telemetry)
+    return telemetry
+
+
+def current_telemetry() -> Optional[RunTelemetry]:
+    return _run_telemetry.get()
+
+
+@contextmanager
+def timed_tool_call(tool: str, query: Optional[str] = None):
+    """
+    Records the latency and outcome of a tool call on the current run. The block
+    may set `call["outcome"]` (e.g. "cache_hit"); exceptions are recorded as "error".
+    """
+    call = {"outcome": "ok"}
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call["outcome"] = "error"
+        raise
+    finally:
+        telemetry = _run_telemetry.get()
+        if telemetry is not None:
+            telemetry.record_tool_call(tool, time.perf_counter() - start, call["outcome"], query=query)
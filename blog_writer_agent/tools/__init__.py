@@ -1,6 +1,25 @@
 # src/blog_writer/tools/__init__.py
-from .news_tool import search_news
-from .datamuse_tool import find_keywords
+from . import news_tool, datamuse_tool
+from .news_tool import search_news_async, fetch_news, fetch_news_async, format_article
+from .datamuse_tool import find_keywords_async, fetch_related_words, fetch_related_words_async
+from .http_client import get_client, get_async_client, aclose_async_client, close_client
+from .api_cache import set_api_cache_enabled, clear_api_caches, api_cache_stats, start_tool_memo
 
 # Export the functions directly
-__all__ = ['search_news', 'find_keywords']
+__all__ = [
+    'search_news', 'find_keywords',
+    'search_news_async', 'find_keywords_async',
+    'fetch_news', 'fetch_news_async', 'format_article',
+    'fetch_related_words', 'fetch_related_words_async',
+    'get_client', 'get_async_client', 'aclose_async_client', 'close_client',
+    'set_api_cache_enabled', 'clear_api_caches', 'api_cache_stats', 'start_tool_memo',
+]
+
+
+def __getattr__(name):
+    # search_news and find_keywords are crewai tools, built on first access.
+    if name == "search_news":
+        return news_tool.search_news
+    if name == "find_keywords":
+        return datamuse_tool.find_keywords
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
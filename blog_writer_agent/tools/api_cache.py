@@ -0,0 +1,118 @@
+# src/blog_writer/tools/api_cache.py
+import os
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from dotenv import load_dotenv
+from ..cache import TTLCache, normalize_query
+from ..ratelimit import get_limiter
+from ..telemetry import timed_tool_call
+
+load_dotenv()
+
+# News goes stale quickly; Datamuse word associations practically never change.
+NEWS_CACHE_TTL_SECONDS = float(os.getenv("NEWS_CACHE_TTL_SECONDS", 60 * 60))
+DATAMUSE_CACHE_TTL_SECONDS = float(os.getenv("DATAMUSE_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60))
+API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "2000"))
+API_CACHE_ENABLED = os.getenv("API_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+news_cache = TTLCache("newsdata", ttl_seconds=NEWS_CACHE_TTL_SECONDS, max_entries=API_CACHE_MAX_ENTRIES)
+datamuse_cache = TTLCache("datamuse", ttl_seconds=DATAMUSE_CACHE_TTL_SECONDS, max_entries=API_CACHE_MAX_ENTRIES)
+API_CACHES = (news_cache, datamuse_cache)
+
+
+def set_api_cache_enabled(enabled: bool):
+    """Turns the NewsData/Datamuse response caches on or off for this process (e.g. for --no-cache)."""
+    for cache in API_CACHES:
+        cache.enabled = enabled
+
+
+def clear_api_caches() -> dict:
+    """Removes all cached API responses. Returns the number of deleted entries per cache."""
+    return {cache.namespace: cache.clear() for cache in API_CACHES}
+
+
+def api_cache_stats() -> list:
+    return [cache.stats() for cache in API_CACHES]
+
+
+set_api_cache_enabled(API_CACHE_ENABLED)
+
+
+# Successful tool call results of the current run, keyed by (tool, normalized query).
+# Like the run telemetry, the dict is shared with the crew worker threads of the run,
+# so an agent repeating a lookup (or one the prefetch already made) gets the answer at once.
+_run_memo: ContextVar[Optional[Dict[Tuple[str, str], Any]]] = ContextVar("tool_run_memo", default=None)
+_MISSING = object()
+
+
+def start_tool_memo():
+    """Gives the current run an empty tool call memo."""
+    _run_memo.set({})
+
+
+def _recall(call: dict, tool: str, query: str, service: str) -> Any:
+    memo = _run_memo.get()
+    value = memo.get((tool, normalize_query(query)), _MISSING) if memo is not None else _MISSING
+    if value is not _MISSING:
+        call["outcome"] = "memo"
+        print(f"--- {service} result reused within the run for query: {query} ---")
+    return value
+
+
+def _memoize(tool: str, query: str, value: Any):
+    memo = _run_memo.get()
+    if memo is not None:
+        memo[(tool, normalize_query(query))] = value
+
+
+def _cached(call: dict, tool: str, query: str, cache: TTLCache, cache_key: str, service: str) -> Any:
+    value = cache.get(cache_key)
+    if value is not None:
+        call["outcome"] = "cache_hit"
+        print(f"--- {service} cache hit for query: {query} ---")
+        _memoize(tool, query, value)
+    return value
+
+
+def _store(tool: str, query: str, cache: TTLCache, cache_key: str, value: Any, cacheable: Callable[[Any], bool]):
+    # Errors (raised) and error answers (not cacheable) are never kept, so a transient
+    # failure is retried by the next identical call instead of replayed for the whole run.
+    if cacheable(value):
+        cache.set(cache_key, value)
+        _memoize(tool, query, value)
+
+
+def _always(value: Any) -> bool:
+    return True
+
+
+def cached_call(tool: str, query: str, cache: TTLCache, cache_key: str, fetch: Callable[[], Any],
+                limiter: str, service: str, cacheable: Callable[[Any], bool] = _always) -> Any:
+    """
+    Returns the result of `tool` for `query` from the run memo, then `cache`, and
+    otherwise calls `fetch` within the `limiter` budget. Only results passing
+    `cacheable` are stored; errors are raised to the caller.
+    """
+    with timed_tool_call(tool, query) as call:
+        value = _recall(call, tool, query, service)
+        if value is _MISSING:
+            value = _cached(call, tool, query, cache, cache_key, service)
+        if value is None:
+            print(f"--- Calling {service} API (function tool) for query: {query} ---")
+            value = get_limiter(limiter).run(fetch)
+            _store(tool, query, cache, cache_key, value, cacheable)
+        return value
+
+
+async def cached_call_async(tool: str, query: str, cache: TTLCache, cache_key: str, fetch: Callable[[], Awaitable[Any]],
+                            limiter: str, service: str, cacheable: Callable[[Any], bool] = _always) -> Any:
+    """Async variant of `cached_call`; `fetch` returns a new awaitable for each attempt."""
+    with timed_tool_call(tool, query) as call:
+        value = _recall(call, tool, query, service)
+        if value is _MISSING:
+            value = _cached(call, tool, query, cache, cache_key, service)
+        if value is None:
+            print(f"--- Calling {service} API (async) for query: {query} ---")
+            value = await get_limiter(limiter).run_async(fetch)
+            _store(tool, query, cache, cache_key, value, cacheable)
+        return value
@@ -1,46 +1,99 @@
 # src/blog_writer/tools/datamuse_tool.py
-import httpx
+import os
 import json
-from crewai.tools import tool
+from .http_client import get_client, get_async_client
+from .api_cache import datamuse_cache, cached_call, cached_call_async
+from ..cache import make_cache_key, normalize_query
 
-@tool("Datamuse Keyword Finder")
-def find_keywords(query: str) -> str:
-    """Finds semantically related words (keywords, variations) for a given topic/word using the Datamuse API. Input should be the topic or keyword string."""
-    base_url = "https://api.datamuse.com/words"
-    params = {"ml": query, "max": 15}
-    headers = {"Accept": "application/json"}
+BASE_URL = os.getenv("DATAMUSE_BASE_URL", "https://api.datamuse.com/words")
 
-    try:
-        with httpx.Client() as client:
-            print(f"--- Calling Datamuse API (function tool) for query: {query} ---")
-            response = client.get(base_url, params=params, headers=headers, timeout=10.0)
-            response.raise_for_status()
-            results = response.json()
-
-            if results:
-                keywords = [item['word'] for item in results]
-                return f"**Keywords related to '{query}':**\n- {', '.join(keywords)}"
-            else:
-                return f"No related keywords found for '{query}' via Datamuse."
-
-    except httpx.HTTPStatusError as e:
+
+def _build_params(query: str) -> dict:
+    return {"ml": query, "max": 15}
+
+
+def _cache_key(params: dict) -> str:
+    return make_cache_key("datamuse", normalize_query(params["ml"]), max=params["max"])
+
+
+def _format_results(results: list, query: str) -> str:
+    """Formats a Datamuse API response into the keyword list handed to the agent."""
+    if results:
+        keywords = [item['word'] for item in results]
+        return f"**Keywords related to '{query}':**\n- {', '.join(keywords)}"
+    else:
+        return f"No related keywords found for '{query}' via Datamuse."
+
+
+def _error_message(e: Exception) -> str:
+    """Maps a request failure to the error string returned to the agent."""
+    import httpx
+
+    if isinstance(e, httpx.HTTPStatusError):
         error_message = f"HTTP error calling Datamuse API: {e.response.status_code} - {e.response.text}"
-        print(f"Error: {error_message}")
-        return error_message
-    except httpx.TimeoutException:
+    elif isinstance(e, httpx.TimeoutException):
         error_message = "Error: Request to Datamuse API timed out."
-        print(error_message)
-        return error_message
-    except httpx.RequestError as e:
+    elif isinstance(e, httpx.RequestError):
         error_message = f"Network error calling Datamuse API: {e}"
-        print(error_message)
-        return error_message
-    except json.JSONDecodeError:
+    elif isinstance(e, json.JSONDecodeError):
         error_message = "Error: Could not decode JSON response from Datamuse API."
-        print(error_message)
-        return error_message
-    except Exception as e:
+    else:
         error_message = f"An unexpected error occurred with Datamuse API: {e}"
-        print(error_message)
-        return error_message
-    
\ No newline at end of file
+    print(error_message)
+    return error_message
+
+
+def _parse(response) -> list:
+    return [{"word": item["word"], "score": item.get("score")} for item in response.json()]
+
+
+def _get(params: dict) -> list:
+    return _parse(get_client().get(BASE_URL, params=params).raise_for_status())
+
+
+async def _get_async(params: dict) -> list:
+    response = await get_async_client().get(BASE_URL, params=params)
+    return _parse(response.raise_for_status())
+
+
+def fetch_related_words(query: str) -> list:
+    """
+    Returns the Datamuse results for `query` as [{"word": ..., "score": ...}], served
+    from the run memo or the cache when possible. Request errors are raised to the caller.
+    """
+    params = _build_params(query)
+    return cached_call("find_keywords", query, datamuse_cache, _cache_key(params), lambda: _get(params),
+                       limiter="datamuse", service="Datamuse")
+
+
+async def fetch_related_words_async(query: str) -> list:
+    """Async variant of `fetch_related_words` using the pooled async client."""
+    params = _build_params(query)
+    return await cached_call_async("find_keywords", query, datamuse_cache, _cache_key(params), lambda: _get_async(params),
+                                   limiter="datamuse", service="Datamuse")
+
+
+def _find_keywords(query: str) -> str:
+    """Finds semantically related words (keywords, variations) for a given topic/word using the Datamuse API. Input should be the topic or keyword string."""
+    try:
+        return _format_results(fetch_related_words(query), query)
+    except Exception as e:
+        return _error_message(e)
+
+
+async def find_keywords_async(query: str) -> str:
+    """Async variant of the `find_keywords` tool using the pooled async client. Returns the same strings."""
+    try:
+        return _format_results(await fetch_related_words_async(query), query)
+    except Exception as e:
+        return _error_message(e)
+
+
+def __getattr__(name):
+    # The crewai tool is built when the crew first asks for it, so importing the
+    # plain/async helpers does not load crewai.
+    if name == "find_keywords":
+        from crewai.tools import tool
+        globals()[name] = tool("Datamuse Keyword Finder")(_find_keywords)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,99 @@
+# src/blog_writer/tools/http_client.py
+import asyncio
+import atexit
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    import httpx
+
+load_dotenv()
+
+# Pool settings (override via environment variables / .env)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+
+_client = None
+_client_lock = threading.Lock()
+# One AsyncClient per event loop: httpx async connections cannot be shared across loops.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _http2_supported() -> bool:
+    """HTTP/2 needs the optional `h2` package (pip install httpx[http2])."""
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        print("Warning: HTTP2_ENABLED is set but the 'h2' package is not installed. Falling back to HTTP/1.1.")
+        return False
+
+
+def _client_kwargs() -> dict:
+    # httpx is imported with the first client rather than with the package (~0.25s)
+    import httpx
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(HTTP_TIMEOUT),
+        "http2": _http2_supported(),
+        "headers": {"Accept": "application/json"},
+    }
+
+
+def get_client() -> "httpx.Client":
+    """
+    Returns the process-wide pooled sync client.
+
+    httpx.Client is thread-safe, so the crew worker threads of concurrent runs
+    all reuse the same keep-alive connections.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        with _client_lock:
+            if _client is None or _client.is_closed:
+                import httpx
+                _client = httpx.Client(**_client_kwargs())
+    return _client
+
+
+def get_async_client() -> "httpx.AsyncClient":
+    """Returns the pooled async client bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        import httpx
+        client = httpx.AsyncClient(**_client_kwargs())
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_client():
+    """Closes the async client of the running event loop. Call before the loop shuts down."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def close_client():
+    """Closes the shared sync client. Registered to run at interpreter exit."""
+    global _client
+    with _client_lock:
+        if _client is not None and not _client.is_closed:
+            _client.close()
+        _client = None
+
+
+atexit.register(close_client)
@@ -1,67 +1,153 @@
 # src/blog_writer/tools/news_tool.py
 import os
-import httpx
 import json
-from crewai.tools import tool
 from dotenv import load_dotenv
+from .http_client import get_client, get_async_client
+from .api_cache import news_cache, cached_call, cached_call_async
+from ..cache import make_cache_key, normalize_query
 
 load_dotenv()
 
-@tool("News Search Tool")
-def search_news(search_query: str) -> str:
-    """Searches for recent news articles on a given topic using the NewsData.io API. Input should be the search query (topic string)."""
+BASE_URL = os.getenv("NEWSDATA_BASE_URL", "https://newsdata.io/api/1/news")
+MISSING_KEY_MESSAGE = "Error: NEWSDATA_API_KEY not found in environment variables. Please set it in the .env file."
+
+
+class MissingAPIKeyError(RuntimeError):
+    """Raised by the fetch helpers when NEWSDATA_API_KEY is not set."""
+
+
+def _build_params(search_query: str):
+    """Returns the NewsData query parameters, or None when the API key is missing."""
     api_key = os.getenv("NEWSDATA_API_KEY")
     if not api_key:
-        return "Error: NEWSDATA_API_KEY not found in environment variables. Please set it in the .env file."
-
-    base_url = "https://newsdata.io/api/1/news"
-    params = {
+        return None
+    return {
         "apikey": api_key,
         "q": search_query,
         "language": "en",
         "size": 5
     }
-    headers = {"Accept": "application/json"}
 
-    try:
-        with httpx.Client() as client:
-            print(f"--- Calling NewsData API (function tool) for query: {search_query} ---")
-            response = client.get(base_url, params=params, headers=headers, timeout=15.0)
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("status") == "success" and data.get("results"):
-                articles = data["results"]
-                formatted_results = ["**Recent News:**"]
-                for article in articles:
-                    title = article.get('title', 'N/A')
-                    link = article.get('link', '#')
-                    description = article.get('description') or article.get('content', '')
-                    snippet = (description[:200] + '...') if description and len(description) > 200 else description or "No description."
-                    formatted_results.append(f"- Title: {title}\n  Snippet: {snippet}\n  Link: {link}")
-                return "\n".join(formatted_results) if len(formatted_results) > 1 else "No relevant news articles found."
-            else:
-                error_msg = data.get('results', {}).get('message', 'Unknown API error or no results')
-                print(f"NewsData API Warning: {error_msg}")
-                return f"No news results found or API error: {error_msg}"
-
-    except httpx.HTTPStatusError as e:
+
+def _cache_key(params: dict) -> str:
+    # The API key is deliberately left out so rotating keys does not invalidate the cache.
+    return make_cache_key("news", normalize_query(params["q"]), language=params["language"], size=params["size"])
+
+
+def _compact_response(data: dict) -> dict:
+    """Keeps only the article fields the tools use, so cached responses stay small."""
+    fields = ("title", "link", "description", "content", "pubDate", "source_id")
+    return {
+        "status": data.get("status"),
+        "results": [{k: article.get(k) for k in fields} for article in data.get("results") or []],
+    }
+
+
+def format_article(article: dict) -> str:
+    """One article as the bullet handed to the agent: title, snippet and link."""
+    title = article.get('title') or 'N/A'
+    link = article.get('link') or '#'
+    description = article.get('description') or article.get('content') or ''
+    snippet = (description[:200] + '...') if len(description) > 200 else description or "No description."
+    return f"- Title: {title}\n  Snippet: {snippet}\n  Link: {link}"
+
+
+def _format_results(data: dict) -> str:
+    """Formats a NewsData API response into the summary string handed to the agent."""
+    if data.get("status") == "success" and data.get("results"):
+        return "\n".join(["**Recent News:**"] + [format_article(article) for article in data["results"]])
+    else:
+        results = data.get('results')
+        error_msg = results.get('message', 'Unknown API error or no results') if isinstance(results, dict) else 'Unknown API error or no results'
+        print(f"NewsData API Warning: {error_msg}")
+        return f"No news results found or API error: {error_msg}"
+
+
+def _parse(response) -> dict:
+    data = response.json()
+    return _compact_response(data) if _is_success(data) else data
+
+
+def _is_success(data: dict) -> bool:
+    """Only successful responses are cached; API errors and quota messages never are."""
+    return data.get("status") == "success"
+
+
+def _error_message(e: Exception) -> str:
+    """Maps a request failure to the error string returned to the agent."""
+    import httpx
+
+    if isinstance(e, MissingAPIKeyError):
+        return MISSING_KEY_MESSAGE
+    if isinstance(e, httpx.HTTPStatusError):
         error_message = f"HTTP error calling NewsData API: {e.response.status_code} - {e.response.text}"
-        print(f"Error: {error_message}")
-        return error_message
-    except httpx.TimeoutException:
+    elif isinstance(e, httpx.TimeoutException):
         error_message = "Error: Request to NewsData API timed out."
-        print(error_message)
-        return error_message
-    except httpx.RequestError as e:
+    elif isinstance(e, httpx.RequestError):
         error_message = f"Network error calling NewsData API: {e}"
-        print(error_message)
-        return error_message
-    except json.JSONDecodeError:
+    elif isinstance(e, json.JSONDecodeError):
         error_message = "Error: Could not decode JSON response from NewsData API."
-        print(error_message)
-        return error_message
-    except Exception as e:
+    else:
         error_message = f"An unexpected error occurred with NewsData API: {e}"
-        print(error_message)
-        return error_message
+    print(error_message)
+    return error_message
+
+
+def _get(params: dict) -> dict:
+    return _parse(get_client().get(BASE_URL, params=params).raise_for_status())
+
+
+async def _get_async(params: dict) -> dict:
+    response = await get_async_client().get(BASE_URL, params=params)
+    return _parse(response.raise_for_status())
+
+
+def _params_or_raise(search_query: str) -> dict:
+    params = _build_params(search_query)
+    if params is None:
+        raise MissingAPIKeyError(MISSING_KEY_MESSAGE)
+    return params
+
+
+def fetch_news(search_query: str) -> dict:
+    """
+    Returns the NewsData response for `search_query` ({"status": ..., "results": [...]}),
+    served from the run memo or the cache when possible. Request errors and a missing
+    API key are raised to the caller.
+    """
+    params = _params_or_raise(search_query)
+    return cached_call("search_news", search_query, news_cache, _cache_key(params), lambda: _get(params),
+                       limiter="newsdata", service="NewsData", cacheable=_is_success)
+
+
+async def fetch_news_async(search_query: str) -> dict:
+    """Async variant of `fetch_news` using the pooled async client."""
+    params = _params_or_raise(search_query)
+    return await cached_call_async("search_news", search_query, news_cache, _cache_key(params), lambda: _get_async(params),
+                                   limiter="newsdata", service="NewsData", cacheable=_is_success)
+
+
+def _search_news(search_query: str) -> str:
+    """Searches for recent news articles on a given topic using the NewsData.io API. Input should be the search query (topic string)."""
+    try:
+        return _format_results(fetch_news(search_query))
+    except Exception as e:
+        return _error_message(e)
+
+
+async def search_news_async(search_query: str) -> str:
+    """Async variant of the `search_news` tool using the pooled async client. Returns the same strings."""
+    try:
+        return _format_results(await fetch_news_async(search_query))
+    except Exception as e:
+        return _error_message(e)
+
+
+def __getattr__(name):
+    # The crewai tool is built when the crew first asks for it, so importing the
+    # plain/async helpers does not load crewai.
+    if name == "search_news":
+        from crewai.tools import tool
+        globals()[name] = tool("News Search Tool")(_search_news)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
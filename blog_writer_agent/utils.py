@@ -1,20 +1,57 @@
 # src/blog_writer/utils.py
+import asyncio
+import contextlib
+import contextvars
+import functools
 import json
+import os
 import re
+import tempfile
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextvars import ContextVar
 from pathlib import Path
-import textstat
+from typing import Optional
+from .analytics import analyze
 
+# Created on the first save, so importing the package has no side effects.
 OUTPUT_DIR = Path().cwd() / "outputs"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CONFIG_DIR = Path(__file__).parent / "config"
+LLM_MODEL = "gemini/gemini-2.0-flash"
+
+# Executor for the blocking work (crew kickoffs, LLM calls, file I/O) of the current
+# batch or service worker; None means the event loop's default executor.
+_thread_pool: ContextVar[Optional[Executor]] = ContextVar("thread_pool", default=None)
+
+
+def set_thread_pool(pool: Optional[Executor]):
+    """Makes `run_in_thread` calls of the current task (and the tasks it starts) use `pool`."""
+    _thread_pool.set(pool)
+
+
+@contextlib.contextmanager
+def thread_pool(max_workers: int, thread_name_prefix: str):
+    """A dedicated ThreadPoolExecutor for the `run_in_thread` calls made in the block, shut down on exit."""
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix) as pool:
+        token = _thread_pool.set(pool)
+        try:
+            yield pool
+        finally:
+            _thread_pool.reset(token)
+
+
+async def run_in_thread(func, *args, **kwargs):
+    """Like asyncio.to_thread (the context is copied into the thread), on the current thread_pool if one is set."""
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_thread_pool.get(), call)
+
 
 def calculate_reading_time(text: str) -> int:
     """
-    Estimates reading time in minutes based on an average reading speed.
+    Estimates reading time in minutes from the prose words (see analytics.analyze).
     """
     if not text:
         return 0
-    word_count = len(re.findall(r'\w+', text))
-    return max(1, round(word_count / 200))
+    return analyze(text).reading_time_minutes
 
 def calculate_readability_score(text: str) -> float:
     """
@@ -23,35 +60,80 @@ def calculate_readability_score(text: str) -> float:
     """
     if not text:
         return 0.0
+    return analyze(text).flesch_reading_ease
+
+def strip_code_fences(text: str) -> str:
+    """
+    Removes a surrounding Markdown code fence (```json, ```markdown or bare ```) from LLM output.
+    """
+    text = (text or "").strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+def parse_topic_analysis(raw_output: str) -> dict:
+    """
+    Parses the topic analysis task output into a dict with "target_audience",
+    "key_takeaway" and "outline_headings". Returns an empty dict if it is not valid JSON.
+    """
     try:
-        return round(textstat.flesch_reading_ease(text), 2)
-    except Exception as e:
-        print(f"Warning: Could not calculate readability score. Error: {e}")
-        return 0.0
+        analysis = json.loads(strip_code_fences(raw_output))
+    except (json.JSONDecodeError, TypeError):
+        return {}
+    if not isinstance(analysis, dict):
+        return {}
+    headings = analysis.get("outline_headings") or []
+    analysis["outline_headings"] = [str(h).strip() for h in headings if str(h).strip()]
+    return analysis
 
-def save_markdown(filename: str, content: str):
+def atomic_write_text(filepath: Path, content: str):
     """
-    Saves the provided content to a Markdown file in the designated outputs directory.
+    Writes `content` to a temporary file next to `filepath` and renames it into place,
+    so readers never see a half-written file and a crash leaves the old version intact.
     """
-    filepath = OUTPUT_DIR / f"{filename}.md"
+    filepath = Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{filepath.name}.", suffix=".tmp", dir=filepath.parent)
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
             f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+def save_markdown(filename: str, content: str, directory: Optional[Path] = None) -> Optional[Path]:
+    """
+    Saves the provided content to a Markdown file in the designated outputs directory.
+    Returns the path, or None if saving failed.
+    """
+    filepath = (directory or OUTPUT_DIR) / f"{filename}.md"
+    try:
+        atomic_write_text(filepath, content)
         print(f"✅ Markdown content saved to: {filepath}")
+        return filepath
     except Exception as e:
         print(f"❌ Error saving Markdown file {filepath}: {e}")
+        return None
 
-def save_json(filename: str, data: dict):
+def save_json(filename: str, data: dict, directory: Optional[Path] = None) -> Optional[Path]:
     """
     Saves the provided dictionary data to a JSON file in the outputs directory.
+    Returns the path, or None if saving failed.
     """
-    filepath = OUTPUT_DIR / f"{filename}.json"
+    filepath = (directory or OUTPUT_DIR) / f"{filename}.json"
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        atomic_write_text(filepath, json.dumps(data, indent=2, ensure_ascii=False))
         print(f"✅ JSON metadata saved to: {filepath}")
+        return filepath
     except Exception as e:
         print(f"❌ Error saving JSON file {filepath}: {e}")
+        return None
 
 def sanitize_filename(topic: str) -> str:
     """
@@ -76,13 +158,3 @@ def print_cli_summary(blog_content, seo_metadata, filename_base):
     print(f"   Metadata saved to: outputs/{filename_base}_metadata.json")
     print(f"   Estimated Reading Time: {seo_metadata.get('estimated_reading_time_minutes', 'N/A')} minutes")
     print(f"   Readability Score (Flesch): {seo_metadata.get('flesch_reading_ease_score', 'N/A')}")
-
-def extract_blog_content(crew_instance):
-    # Extracts the writing task output from the crew instance
-    for task in crew_instance.crew().tasks:
-        if task == crew_instance.writing_task():
-            if task.output and hasattr(task.output, 'raw'):
-                return task.output.raw
-            elif task.output:
-                return str(task.output)
-    return None
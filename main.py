@@ -1,63 +1,277 @@
 import argparse
 import sys
 import asyncio
-import traceback
-from blog_writer_agent.crew import BlogWriterCrew, process_crew_output
-from blog_writer_agent.utils import save_markdown, save_json, sanitize_filename, print_cli_summary, extract_blog_content
+import time
+from functools import partial
+from blog_writer_agent.checkpoints import list_checkpoints
+from blog_writer_agent.ratelimit import rate_limit_stats
+from blog_writer_agent.pipeline import SEO_MODES, WRITER_MODES, PipelineOptions, generate_blog, resume_blog
+from blog_writer_agent.streaming import WriterStream
+from blog_writer_agent.telemetry import set_events_file
+from blog_writer_agent.refresh import refresh_posts
+from blog_writer_agent.batch import load_batch_items, run_batch, build_batch_report, print_batch_summary
+from blog_writer_agent.tools import aclose_async_client, set_api_cache_enabled, clear_api_caches, api_cache_stats
+from blog_writer_agent.store import get_output_store
+from blog_writer_agent.utils import save_markdown, save_json, sanitize_filename, print_cli_summary
 
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Autonomous Blog Writing Agent CLI",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
-    parser.add_argument("--topic", type=str, required=True, help="The main topic for the blog post.")
-    parser.add_argument("--tone", type=str, default="Educational", help="Desired tone (e.g., Formal, Creative, Technical).")
-    return parser.parse_args()
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--topic", type=str, help="The main topic for the blog post.")
+    source.add_argument("--batch", type=str, metavar="FILE", help="JSONL or CSV file of (topic, tone) pairs to generate in one run.")
+    source.add_argument("--resume", type=str, metavar="RUN_ID", help="Resume a failed or interrupted run from its checkpoint, re-running only the stages that did not complete.")
+    parser.add_argument("--tone", type=str, default="Educational", help="Desired tone (e.g., Formal, Creative, Technical). Used as the default tone in batch mode.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum number of blog posts generated at once in batch mode.")
+    parser.add_argument("--no-prefetch", action="store_true", help="Let the researcher agent call the news/keyword tools itself instead of prefetching them during topic analysis.")
+    parser.add_argument("--no-news-fanout", action="store_true", help="Prefetch news for the topic only, not also for each outline heading (see NEWS_FANOUT_ENABLED).")
+    parser.add_argument("--writer-mode", choices=WRITER_MODES, default="single", help="'single' writes the post in one generation; 'sections' drafts the intro, each H2 section and the conclusion concurrently and stitches them.")
+    parser.add_argument("--seo-mode", choices=SEO_MODES, default="llm", help="'llm' asks the SEO agent for metadata; 'fast' computes title, description, tags and slug locally (no LLM call); 'speculative' drafts them while the post is written and only asks the SEO agent if the draft does not match the post.")
+    parser.add_argument("--no-stream", action="store_true", help="Do not print the writer's output to the terminal while it is being generated (single-topic mode only).")
+    parser.add_argument("--timing", action="store_true", help="Embed the per-stage timing, LLM and tool call summary under \"timing\" in the saved _metadata.json.")
+    parser.add_argument("--telemetry-log", type=str, metavar="FILE", help="Append every telemetry event (stages, LLM calls, tool calls) as JSON lines to FILE. Defaults to TELEMETRY_EVENTS_FILE.")
+    parser.add_argument("--force-regenerate", action="store_true", help="Run the crew even if the same topic/tone was generated within RESULT_CACHE_TTL_SECONDS; the new post replaces the memoized one.")
+    parser.add_argument("--list-runs", action="store_true", help="List the checkpointed runs that can be resumed with --resume.")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the NewsData/Datamuse response cache for this run.")
+    parser.add_argument("--clear-cache", action="store_true", help="Delete all cached NewsData/Datamuse responses before running.")
+    parser.add_argument("--llm-cache", action=argparse.BooleanOptionalAction, default=None, help="Force the LLM completion cache on or off. By default only temperature-0 calls are cached (see LLM_CACHE).")
+    store = parser.add_argument_group("output store", "Query the index of generated posts in outputs/ instead of generating.")
+    store.add_argument("--list-posts", action="store_true", help="List indexed posts (newest first), optionally filtered by --tag/--slug.")
+    store.add_argument("--export", type=str, metavar="FILE", help="Export indexed posts (metadata and markdown), optionally filtered by --tag/--slug, as JSON lines to FILE.")
+    store.add_argument("--tag", type=str, help="Only posts with this SEO tag.")
+    store.add_argument("--slug", type=str, help="Only posts with this slug.")
+    store.add_argument("--reindex", action="store_true", help="Rebuild the index from the files in outputs/.")
+    store.add_argument("--refresh", action="store_true", help="Update indexed posts (optionally filtered by --tag/--slug/--topic) with news published since their last generation or refresh, re-drafting only the sections that have new articles. Uses --concurrency.")
+    store.add_argument("--rescore", action="store_true", help="Recompute reading time, readability, word count and tag density of indexed posts (optionally filtered by --tag/--slug) from their markdown.")
+    args = parser.parse_args()
+    if not (args.topic or args.batch or args.resume or args.clear_cache or args.list_runs or args.list_posts or args.export or args.reindex or args.rescore or args.refresh):
+        parser.error("one of the arguments --topic --batch --resume --refresh is required")
+    return args
 
-async def main():
-    args = parse_args()
-    topic, tone = args.topic, args.tone
-    print(f"🚀 Starting blog generation for topic: '{topic}'\n   Tone specified: '{tone}'")
+def save_run_outputs(result, verbose=True, include_timing=False):
+    """Saves and indexes the blog and metadata of a finished run, or saves the raw blog if processing failed."""
+    if result.ok:
+        metadata = {**result.metadata, "timing": result.timing} if include_timing else result.metadata
+        try:
+            record = get_output_store().save_post(result.topic, result.tone, result.blog_content, metadata)
+        except Exception as e:
+            print(f"❌ Error saving '{result.topic}' to the output store: {e}")
+            return
+        if verbose:
+            print_cli_summary(result.blog_content, result.metadata, record["file_base"])
+        return
 
-    inputs = {'topic': topic, 'tone': tone}
-    try:
+    if verbose:
+        print("\n❌ Error occurred during result processing.")
+        print(f"   Details: {result.error}")
+        if "raw_output" in result.metadata:
+            print(f"   Raw SEO Output: {result.metadata['raw_output']}")
+    if result.raw_blog_output:
+        print(f"\n💾 Attempting to save raw blog content for '{result.topic}' despite processing errors...")
+        save_markdown(f"{sanitize_filename(result.topic)}_blog_raw", result.raw_blog_output)
+
+def build_pipeline_options(args):
+    return PipelineOptions(prefetch=not args.no_prefetch, news_fanout=PipelineOptions.news_fanout and not args.no_news_fanout, writer_mode=args.writer_mode, seo_mode=args.seo_mode, force_regenerate=args.force_regenerate)
+
+def build_terminal_stream():
+    """Prints the writer's tokens to stdout as they arrive."""
+    started = False
+
+    def on_delta(delta):
+        nonlocal started
+        if not started:
+            started = True
+            print("\n✍️ Writer output (streaming):\n--------------------------------------------------", flush=True)
+        sys.stdout.write(delta)
+        sys.stdout.flush()
+
+    def on_reset(final_text):
+        print("\n\n🔁 The final post differs from the streamed draft. Final version:\n--------------------------------------------------")
+        print(final_text)
+
+    return WriterStream(on_delta=on_delta, on_reset=on_reset)
+
+async def run_single(topic, tone, options, stream_output=True, include_timing=False, resume_run_id=None):
+    stream = build_terminal_stream() if stream_output else None
+    if resume_run_id:
+        try:
+            result = await resume_blog(resume_run_id, stream=stream)
+        except ValueError as e:
+            print(f"❌ {e} Use --list-runs to see resumable runs.")
+            return 1
+    else:
+        print(f"🚀 Starting blog generation for topic: '{topic}'\n   Tone specified: '{tone}'")
         print("\n🤖 Instantiating the Blog Writer Crew...")
-        crew_instance = BlogWriterCrew()
         print("▶️ Kicking off the crew execution asynchronously... (This might take few minutes)")
-        result = await crew_instance.crew().kickoff_async(inputs=inputs)
-        print("\n🏁 Crew execution finished.\n--------------------------------------------------\n📊 Processing results...")
+        result = await generate_blog(topic, tone, options, stream=stream)
+    if stream and stream.text:
+        print()
+    print("\n🏁 Crew execution finished.\n--------------------------------------------------\n📊 Processing results...")
+
+    # --- Error Handling ---
+    if result.error_traceback:
+        print(f"\n❌ An unexpected error occurred:")
+        print(result.error_traceback)
+        print(f"\nError Summary: {result.error}")
+        print_resume_hint(result)
+        return 1
+    if not result.raw_blog_output:
+        print("❌ Critical Error: Could not retrieve final blog content from writing task.")
+        print_resume_hint(result)
+        return 1
 
-        blog_content_output = extract_blog_content(crew_instance)
-        seo_metadata_raw_output = getattr(result, 'raw', result) 
+    # --- Output Handling & Saving ---
+    save_run_outputs(result, include_timing=include_timing)
+    if not result.ok:
+        print_resume_hint(result)
+    print_llm_cache_stats(result.llm_cache)
+    print_timing_summary(result.timing)
+    return 0 if result.ok else 1
 
-        if not blog_content_output:
-            print("❌ Critical Error: Could not retrieve final blog content from writing task.")
-            return
+def print_resume_hint(result):
+    if result.run_id and not result.ok:
+        print(f"   🔖 Completed stages were checkpointed. Resume with: python main.py --resume {result.run_id}")
+
+def print_resumable_runs():
+    checkpoints = list_checkpoints()
+    print(f"🔖 {len(checkpoints)} resumable runs")
+    for checkpoint in checkpoints:
+        updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(checkpoint.updated_at))
+        done = ", ".join(name.replace("_task", "") for name in checkpoint.task_outputs) or "nothing"
+        print(f"   {checkpoint.run_id}  {updated}  [{checkpoint.status}] '{checkpoint.topic}' ({checkpoint.tone}) - done: {done}")
+        if checkpoint.error:
+            print(f"      last error: {checkpoint.error[:200]}")
+
+async def run_batch_mode(batch_file, default_tone, concurrency, options, include_timing=False):
+    try:
+        items = load_batch_items(batch_file, default_tone=default_tone)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not load batch file: {e}")
+        return 1
+    if not items:
+        print(f"❌ No valid (topic, tone) rows found in {batch_file}.")
+        return 1
+
+    print(f"🚀 Starting batch generation of {len(items)} blog posts (concurrency: {concurrency})")
+
+    def on_result(index, result):
+        status = "✅" if result.ok else "❌"
+        print(f"{status} [{index + 1}/{len(items)}] '{result.topic}' finished in {result.duration_seconds:.1f}s")
+        save_run_outputs(result, verbose=False, include_timing=include_timing)
+
+    start = time.perf_counter()
+    results = await run_batch(items, concurrency=concurrency, on_result=on_result, runner=partial(generate_blog, options=options))
+    report = build_batch_report(results, time.perf_counter() - start, concurrency)
 
-        blog_content, seo_metadata = process_crew_output(seo_metadata_raw_output, blog_content_output)
+    save_json(f"batch_report_{time.strftime('%Y%m%d_%H%M%S')}", report)
+    print_batch_summary(report)
+    return 0 if report["failed"] == 0 else 1
 
-        # --- Output Handling & Saving ---
-        if blog_content and seo_metadata and "error" not in seo_metadata:
-            safe_filename_base = sanitize_filename(topic)
-            save_markdown(f"{safe_filename_base}_blog", blog_content)
-            save_json(f"{safe_filename_base}_metadata", seo_metadata)
-            print_cli_summary(blog_content, seo_metadata, safe_filename_base)
+async def run_refresh_mode(tag, slug, topic, concurrency):
+    store = get_output_store()
+    posts = list(store.iter_posts(tag=tag, slug=slug, topic=topic))
+    if not posts:
+        print("❌ No indexed posts match. Use --list-posts (or --reindex) to check the index.")
+        return 1
+    print(f"🔄 Refreshing {len(posts)} posts with new news (concurrency: {concurrency})")
+
+    def on_result(index, result):
+        since = time.strftime("%Y-%m-%d %H:%M", time.localtime(result.since))
+        if not result.ok:
+            print(f"❌ [{index + 1}/{len(posts)}] '{result.topic}': {result.error}")
+        elif result.changed:
+            print(f"✅ [{index + 1}/{len(posts)}] '{result.topic}': {result.new_articles} new articles since {since}, re-drafted {', '.join(result.redrafted_sections)} in {result.duration_seconds:.1f}s")
         else:
-            print("\n❌ Error occurred during result processing.")
-            if seo_metadata and "error" in seo_metadata:
-                print(f"   Details: {seo_metadata.get('error')}")
-                if "raw_output" in seo_metadata:
-                    print(f"   Raw SEO Output: {seo_metadata['raw_output']}")
-            if blog_content_output:
-                print("\n💾 Attempting to save raw blog content despite processing errors...")
-                safe_filename_base = sanitize_filename(topic)
-                save_markdown(f"{safe_filename_base}_blog_raw", blog_content_output)
+            print(f"✅ [{index + 1}/{len(posts)}] '{result.topic}': no new articles since {since}")
 
-    # --- Error Handling ---
-    except Exception as e:
-        print(f"\n❌ An unexpected error occurred:")
-        traceback.print_exc() 
-        print(f"\nError Summary: {e}")
+    start = time.perf_counter()
+    results = await refresh_posts(posts, concurrency=concurrency, store=store, on_result=on_result)
+    changed = sum(result.changed for result in results)
+    failed = sum(not result.ok for result in results)
+    llm_calls = sum(result.timing.get("llm", {}).get("calls", 0) for result in results)
+    print(f"\n🔄 Refreshed {changed} of {len(posts)} posts in {time.perf_counter() - start:.1f}s ({llm_calls} LLM calls, {failed} failed)")
+    return 0 if failed == 0 else 1
+
+def print_llm_cache_stats(stats):
+    if stats.get("saved_calls"):
+        print(f"   🧠 LLM cache: {stats['saved_calls']} calls served from cache (~{stats['saved_seconds']}s saved), {stats['uncached_calls']} calls to the model ({stats['llm_seconds']}s)")
+
+def print_timing_summary(timing):
+    if not timing.get("stages"):
+        return
+    stages = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in timing["stages"].items())
+    llm = timing["llm"]
+    print(f"   ⏱️ Stages: {stages}")
+    print(f"   ⏱️ LLM: {llm['calls']} calls in {llm['seconds']:.1f}s ({llm['prompt_tokens']} prompt / {llm['completion_tokens']} completion tokens, {llm['cache_hits']} cache hits)")
+    if llm.get("models"):
+        routed = ", ".join(f"{model} x{calls}" for model, calls in llm["models"].items())
+        print(f"   ⏱️ Models: {routed}" + (f" ({llm['fallbacks']} fallbacks after a timeout)" if llm.get("fallbacks") else ""))
+    context = timing.get("context") or {}
+    if context.get("tokens_saved"):
+        print(f"   🗜️ Context: ~{context['tokens_saved']} input tokens saved by compacting {context['compactions']} task contexts (~{context['tokens_before']} → ~{context['tokens_after']})")
+    for tool, stats in timing["tools"].items():
+        print(f"   ⏱️ {tool}: {stats['calls']} calls in {stats['seconds']:.2f}s ({stats['cache_hits']} cached, {stats['memo_hits']} reused within the run, {stats['errors']} errors)")
+
+def print_cache_stats():
+    for stats in api_cache_stats():
+        if stats["hits"] or stats["misses"]:
+            print(f"   🗄️ {stats['namespace']} cache: {stats['hits']} hits / {stats['misses']} misses (hit rate {stats['hit_rate']:.0%})")
+    for stats in rate_limit_stats():
+        if stats["waits"] or stats["throttled"]:
+            print(f"   🚦 {stats['provider']} rate limit: {stats['waits']} of {stats['requests']} requests waited {stats['wait_seconds']}s, {stats['throttled']} throttled and retried")
+
+def run_store_commands(args):
+    """Handles --reindex, --rescore, --list-posts and --export against the output index."""
+    store = get_output_store()
+    if args.reindex:
+        print(f"🗂️ Indexed {store.reindex()} posts in {store.root}")
+    if args.rescore:
+        start = time.perf_counter()
+        count = store.rescore(tag=args.tag, slug=args.slug)
+        print(f"📊 Rescored {count} posts in {time.perf_counter() - start:.2f}s")
+    if args.list_posts:
+        posts = store.find(tag=args.tag, slug=args.slug, limit=None)
+        print(f"🗂️ {len(posts)} posts" + (f" tagged '{args.tag}'" if args.tag else "") + (f" with slug '{args.slug}'" if args.slug else ""))
+        for post in posts:
+            updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(post["updated_at"]))
+            print(f"   {updated}  {post['slug'] or '-'}  {post['title'] or post['topic']}  [{', '.join(post['tags'])}]")
+    if args.export:
+        count = store.export_jsonl(args.export, tag=args.tag, slug=args.slug)
+        print(f"✅ Exported {count} posts to: {args.export}")
+
+async def main():
+    args = parse_args()
+    if args.list_runs:
+        print_resumable_runs()
+    if args.reindex or args.rescore or args.list_posts or args.export:
+        run_store_commands(args)
+    if not (args.topic or args.batch or args.resume or args.clear_cache or args.refresh):
+        return 0
+    if args.clear_cache:
+        cleared = clear_api_caches()
+        print(f"🧹 Cleared API cache: {', '.join(f'{name}={count}' for name, count in cleared.items())}")
+        if not (args.topic or args.batch or args.resume or args.refresh):
+            return 0
+    if args.no_cache:
+        set_api_cache_enabled(False)
+    if args.llm_cache is not None:
+        from blog_writer_agent.llm import set_llm_cache_enabled
+        set_llm_cache_enabled(args.llm_cache)
+    if args.telemetry_log:
+        set_events_file(args.telemetry_log)
+
+    options = build_pipeline_options(args)
+    try:
+        if args.refresh:
+            return await run_refresh_mode(args.tag, args.slug, args.topic, args.concurrency)
+        if args.batch:
+            return await run_batch_mode(args.batch, args.tone, args.concurrency, options, include_timing=args.timing)
+        return await run_single(args.topic, args.tone, options, stream_output=not args.no_stream, include_timing=args.timing, resume_run_id=args.resume)
+    finally:
+        print_cache_stats()
+        await aclose_async_client()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
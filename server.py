@@ -0,0 +1,23 @@
+import argparse
+from blog_writer_agent.service import SERVICE_HOST, SERVICE_PORT, SERVICE_WORKERS, run_service
+from blog_writer_agent.telemetry import set_events_file
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Blog Writing Agent HTTP service: queue posts over HTTP and follow their progress",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--host", type=str, default=SERVICE_HOST, help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="Port to listen on.")
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="Maximum number of blog posts generated at once; further jobs wait in the queue.")
+    parser.add_argument("--telemetry-log", type=str, metavar="FILE", help="Append every telemetry event of every job as JSON lines to FILE. Defaults to TELEMETRY_EVENTS_FILE.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.telemetry_log:
+        set_events_file(args.telemetry_log)
+    run_service(host=args.host, port=args.port, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import pytest
+
+from blog_writer_agent.analytics import _syllable_heuristic, analyze, count_syllables, strip_markdown
+
+KNOWN_SYLLABLES = {
+    "created": 3, "needed": 2, "started": 2, "wanted": 2, "create": 2, "being": 2, "science": 2,
+    "poem": 2, "api": 3, "business": 2, "the": 1, "table": 2, "people": 2, "idea": 3, "every": 3,
+}
+
+
+@pytest.mark.parametrize("word, syllables", KNOWN_SYLLABLES.items())
+def test_count_syllables(word, syllables):
+    assert count_syllables(word) == syllables
+
+
+@pytest.mark.parametrize("word, syllables", {
+    "async": 2, "github": 2, "webhook": 2, "kubernetes": 4, "nginx": 1, "llm": 1, "fintech": 2,
+}.items())
+def test_syllable_heuristic(word, syllables):
+    assert _syllable_heuristic(word) == syllables
+
+
+def test_count_syllables_falls_back_for_unknown_words():
+    assert count_syllables("async") == 2
+    assert count_syllables("well-known") == 2
+
+
+def test_strip_markdown_matches_analyze():
+    text = "# Title **bold**\n\n> A [link](https://example.com) and `code`.\n\n- item\n\n```\nskipped = 1\n```\n"
+    plain = strip_markdown(text)
+    assert plain.split() == ["Title", "bold", "A", "link", "and", "code.", "item"]
+    assert analyze(text).word_count == len(plain.split())
@@ -0,0 +1,49 @@
+import contextvars
+
+import pytest
+
+from blog_writer_agent.cache import TTLCache
+from blog_writer_agent.tools.api_cache import cached_call, start_tool_memo
+
+
+def _new_run():
+    context = contextvars.copy_context()
+    context.run(start_tool_memo)
+    return context
+
+
+def test_errors_are_retried_and_results_memoized(tmp_path):
+    cache = TTLCache("test", ttl_seconds=60, db_path=tmp_path / "cache.sqlite3")
+    cache.enabled = False
+    answers = [ConnectionError("transient"), ["first"], ["second"]]
+
+    def fetch():
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    def call():
+        return cached_call("tool", "Query", cache, "key", fetch, limiter="test-api-cache", service="Test")
+
+    run = _new_run()
+    with pytest.raises(ConnectionError):
+        run.run(call)
+    assert run.run(call) == ["first"]
+    assert run.run(call) == ["first"]
+    assert answers == [["second"]]
+
+
+def test_uncacheable_results_are_not_memoized(tmp_path):
+    cache = TTLCache("test", ttl_seconds=60, db_path=tmp_path / "cache.sqlite3")
+    answers = [{"status": "error"}, {"status": "success"}]
+
+    def call():
+        return cached_call("tool", "query", cache, "key", lambda: answers.pop(0), limiter="test-api-cache",
+                           service="Test", cacheable=lambda data: data["status"] == "success")
+
+    run = _new_run()
+    assert run.run(call) == {"status": "error"}
+    assert run.run(call) == {"status": "success"}
+    assert run.run(call) == {"status": "success"}
+    assert cache.get("key") == {"status": "success"}
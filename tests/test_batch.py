@@ -0,0 +1,23 @@
+import asyncio
+import threading
+
+from blog_writer_agent.batch import run_batch
+from blog_writer_agent.pipeline import BlogRunResult
+from blog_writer_agent.utils import run_in_thread
+
+
+def test_run_batch_uses_its_own_pool_and_calls_on_result_off_the_loop():
+    result_threads = set()
+
+    async def runner(topic, tone):
+        await run_in_thread(lambda: None)
+        return BlogRunResult(topic=topic, tone=tone)
+
+    def on_result(index, result):
+        result_threads.add(threading.current_thread().name)
+
+    items = [{"topic": f"Topic {i}", "tone": "Formal"} for i in range(4)]
+    results = asyncio.run(run_batch(items, concurrency=2, on_result=on_result, runner=runner))
+    assert [result.topic for result in results] == [item["topic"] for item in items]
+    assert all(name.startswith("blog-batch") for name in result_threads)
+    assert not any(thread.name.startswith("blog-batch") for thread in threading.enumerate())
@@ -0,0 +1,19 @@
+import json
+
+import pytest
+
+from blog_writer_agent.crew import process_crew_output
+
+SEO = {"title": "T", "meta_description": "D", "tags": ["python"], "slug": "t"}
+
+
+@pytest.mark.parametrize("raw", [
+    json.dumps(SEO),
+    f"```json\n{json.dumps(SEO)}\n```",
+    f"```\n{json.dumps(SEO)}\n```",
+    f"```json\n{json.dumps(SEO)}\n```  \n",
+])
+def test_process_crew_output_parses_fenced_seo_json(raw):
+    content, metadata = process_crew_output(raw, "# Post\n\nSome python text.")
+    assert "error" not in metadata
+    assert metadata["slug"] == "t"
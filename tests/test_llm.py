@@ -0,0 +1,8 @@
+from blog_writer_agent.llm import _cache_enabled_by_default
+
+
+def test_completion_cache_defaults_on_only_for_temperature_zero():
+    assert _cache_enabled_by_default(0) is True
+    assert _cache_enabled_by_default(0.0) is True
+    assert _cache_enabled_by_default(None) is False
+    assert _cache_enabled_by_default(0.7) is False
@@ -0,0 +1,39 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Runs in a fresh interpreter: the pipeline reads its settings from the environment on import.
+SPECULATIVE_RUN = """
+import asyncio, json, sys, tempfile
+from pathlib import Path
+sys.path.insert(0, {root!r})
+from benchmarks.fake_llm import FakeLLM
+from benchmarks.run_benchmarks import configure_environment
+from benchmarks.stub_servers import StubAPIServer
+
+with tempfile.TemporaryDirectory() as workdir, StubAPIServer(latency=0.02) as stub:
+    configure_environment(stub, Path(workdir))
+    FakeLLM(latency=0.05).install()
+    from blog_writer_agent.pipeline import PipelineOptions, generate_blog
+    from blog_writer_agent.telemetry import RunTelemetry
+    telemetry = RunTelemetry()
+    result = asyncio.run(generate_blog("Edge computing", "Formal", PipelineOptions(seo_mode="speculative"), telemetry=telemetry))
+    print(json.dumps({{"error": result.error, "events": telemetry.events}}))
+"""
+
+
+def test_speculative_seo_llm_calls_are_attributed_to_their_stage():
+    completed = subprocess.run(
+        [sys.executable, "-c", SPECULATIVE_RUN.format(root=str(ROOT))], capture_output=True, text=True, timeout=300, cwd=ROOT
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    run = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert run["error"] is None
+    stages = [event["stage"] for event in run["events"] if event["event"] == "llm_call"]
+    # The SEO draft overlaps the writing; the accepted draft replaces the SEO agent's call.
+    assert sorted(stages) == ["research", "seo_draft", "topic_analysis", "writing"]
+    tools = [event for event in run["events"] if event["event"] == "tool_call"]
+    assert tools and all(event["stage"] in ("prefetch", "news_fanout") for event in tools)
@@ -0,0 +1,23 @@
+import pytest
+
+from blog_writer_agent.ratelimit import RateLimiter
+
+
+def test_release_refunds_only_what_was_deducted():
+    limiter = RateLimiter("test", tpm=600)
+    reserved = limiter.acquire(tokens=1000)
+    assert reserved == limiter.tokens.capacity == 60
+    limiter.release(False, reserved, used_tokens=10)
+    assert limiter.tokens.level == pytest.approx(50, abs=1)
+
+
+def test_failed_call_gives_its_reservation_back():
+    limiter = RateLimiter("test", tpm=600, max_retries=0)
+
+    def fail():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        limiter.run(fail, tokens=40)
+    assert limiter.tokens.level == pytest.approx(60, abs=1)
+    assert limiter.in_flight == 0
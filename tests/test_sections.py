@@ -0,0 +1,16 @@
+from blog_writer_agent.sections import stitch_sections
+
+
+def test_stitch_sections_puts_transitions_in_their_own_paragraph():
+    pieces = ["# Title\n\nIntro.", "## Basics\n\nBody text.", "## Details\n\n### Sub\n\nMore.", "## Conclusion\n\n- one\n- two"]
+    post = stitch_sections(pieces, ["First up.", "Next up.", "Finally."])
+    assert post == (
+        "# Title\n\nIntro.\n\n"
+        "## Basics\n\nFirst up.\n\nBody text.\n\n"
+        "## Details\n\nNext up.\n\n### Sub\n\nMore.\n\n"
+        "## Conclusion\n\nFinally.\n\n- one\n- two"
+    )
+
+
+def test_stitch_sections_without_transitions():
+    assert stitch_sections(["# Title", "## Basics\n\nBody."]) == "# Title\n\n## Basics\n\nBody."
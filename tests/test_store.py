@@ -0,0 +1,21 @@
+import json
+from pathlib import Path
+
+from blog_writer_agent.store import OutputStore
+
+
+def test_rescore_refreshes_the_index(tmp_path):
+    store = OutputStore(root=tmp_path, db_path=tmp_path / "index.sqlite3")
+    record = store.save_post("Python tips", "casual", "# Tips\n\nUse python daily.", {"title": "Old", "slug": "tips", "tags": ["python"]})
+    metadata_path = Path(record["metadata_path"])
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    metadata.update(title="New", tags=["coding"])
+    metadata_path.write_text(json.dumps(metadata), encoding="utf-8")
+
+    assert store.rescore(workers=1) == 1
+    assert store.find(tag="python") == []
+    [found] = store.find(tag="coding")
+    assert found["title"] == "New"
+    assert found["updated_at"] == record["updated_at"]
+    assert json.loads(metadata_path.read_text(encoding="utf-8"))["word_count"] > 0
+    store.close()
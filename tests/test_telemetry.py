@@ -0,0 +1,24 @@
+import asyncio
+
+from blog_writer_agent.telemetry import RunTelemetry
+
+
+def test_overlapping_stages_keep_their_own_events():
+    telemetry = RunTelemetry()
+    progress = []
+
+    async def in_stage(name, delay):
+        with telemetry.stage(name):
+            await asyncio.sleep(delay)
+            progress.append(list(telemetry.active_stages))
+            await asyncio.to_thread(telemetry.record_llm_call, "model", delay)
+
+    async def run():
+        await asyncio.gather(in_stage("topic_analysis", 0.05), in_stage("prefetch", 0.01))
+
+    asyncio.run(run())
+    calls = {event["seconds"]: event["stage"] for event in telemetry.events if event["event"] == "llm_call"}
+    assert calls == {0.05: "topic_analysis", 0.01: "prefetch"}
+    assert progress[0] == ["topic_analysis", "prefetch"]
+    assert telemetry.active_stages == [] and telemetry.current_stage is None
+    assert sorted(telemetry.completed_stages) == ["prefetch", "topic_analysis"]